@@ -1,492 +1,2150 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-from matplotlib.ticker import MaxNLocator
-from calendar import month_abbr
-import matplotlib.dates as mdates
-from datetime import datetime
-from scipy import stats
-import matplotlib.gridspec as gridspec
-from matplotlib.patches import Patch
-from matplotlib.lines import Line2D
-from matplotlib.table import Table
-
-# Configuración de estilo para los gráficos
-plt.style.use('ggplot')
-sns.set_context("talk")
-plt.rcParams['figure.figsize'] = (14, 8)
-plt.rcParams['axes.titlesize'] = 16
-plt.rcParams['axes.labelsize'] = 14
-plt.rcParams['xtick.labelsize'] = 12
-plt.rcParams['ytick.labelsize'] = 12
-
-# Crear directorio para guardar las figuras
-if not os.path.exists('figuras'):
-    os.makedirs('figuras')
+import sys
+import csv
+import time
+import inspect
+import json
+import hashlib
+import contextlib
+import functools
+from importlib.metadata import version
+
+# matplotlib y seaborn se importan dentro de las funciones que dibujan, para que
+# importar este módulo (por ejemplo, solo para las funciones de estadística) sea rápido
+
+# Contexto 'talk' de seaborn (equivale a sns.set_context("talk")), definido sin
+# importar seaborn: solo se carga cuando una figura lo necesita (ver _seaborn)
+CONTEXTO_TALK = {
+    'font.size': 18.0, 'axes.labelsize': 18.0, 'axes.titlesize': 18.0,
+    'xtick.labelsize': 16.5, 'ytick.labelsize': 16.5,
+    'legend.fontsize': 16.5, 'legend.title_fontsize': 18.0,
+    'axes.linewidth': 1.875, 'grid.linewidth': 1.5, 'lines.linewidth': 2.25,
+    'lines.markersize': 9.0, 'patch.linewidth': 1.5,
+    'xtick.major.width': 1.875, 'ytick.major.width': 1.875,
+    'xtick.minor.width': 1.5, 'ytick.minor.width': 1.5,
+    'xtick.major.size': 9.0, 'ytick.major.size': 9.0,
+    'xtick.minor.size': 6.0, 'ytick.minor.size': 6.0,
+}
+
+# Configuración de estilo para los gráficos: estilo 'ggplot' de matplotlib más
+# estos parámetros (ver tema_graficos)
+ESTILO_GRAFICOS = {
+    **CONTEXTO_TALK,
+    'figure.figsize': (14, 8),
+    'axes.titlesize': 16,
+    'axes.labelsize': 14,
+    'xtick.labelsize': 12,
+    'ytick.labelsize': 12,
+}
+
+@contextlib.contextmanager
+def tema_graficos():
+    """
+    Aplica el estilo de las figuras solo dentro del bloque, sin modificar la
+    configuración global de matplotlib.
+    """
+    import matplotlib.pyplot as plt
+    with plt.style.context('ggplot'), plt.rc_context(ESTILO_GRAFICOS):
+        yield
+
+def figura_con_tema(funcion):
+    """
+    Decorador de las funciones que dibujan y guardan una figura en
+    `ruta_guardado`: crea la carpeta de destino al escribir y dibuja dentro
+    de tema_graficos().
+    """
+    firma = inspect.signature(funcion)
+    
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        carpeta = os.path.dirname(firma.bind(*args, **kwargs).arguments['ruta_guardado'])
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with tema_graficos():
+            return funcion(*args, **kwargs)
+    return envoltura
 
 # Nombres de los meses en español
 meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
 trimestres = ['Ene-Mar', 'Abr-Jun', 'Jul-Sep', 'Oct-Dic']
 
-# Función para agregar por periodos (mensual, trimestral, anual)
-def agregar_por_periodo(df, fecha_col, valor_col, periodo):
-    df = df.copy()
-    if isinstance(df[fecha_col].iloc[0], str):
-        df[fecha_col] = pd.to_datetime(df[fecha_col])
+# Resolución y formato (extensión) de las figuras guardadas
+DPI_FIGURAS = 300
+FORMATO_FIGURAS = 'png'
+
+# Carpeta de salida de las figuras y carpeta base de las rutas de datos relativas
+DIR_FIGURAS = 'figuras'
+DIR_DATOS = ''
+
+# Manifiesto de la caché de renderizado (ruta de la figura -> huella de sus datos)
+RUTA_MANIFIESTO_CACHE = os.path.join(DIR_FIGURAS, '.cache_render.json')
+
+# Directorio con los acumulados del modo incremental (uno por variable)
+DIR_ESTADO_INCREMENTAL = os.path.join(DIR_FIGURAS, '.incremental')
+
+# Directorio con la caché binaria de las series parseadas (una carpeta por fuente)
+DIR_CACHE_SERIES = os.path.join(DIR_FIGURAS, '.series')
+
+# Estado de cada nodo del grafo de tareas en la última ejecución (ver ejecutar_grafo)
+RUTA_ESTADO_TAREAS = os.path.join(DIR_FIGURAS, '.estado_tareas.json')
+
+# Perfiles de salida: resolución, formato, nivel de compresión de los PNG (0-9),
+# rasterización de los artistas densos (por ejemplo, los puntos atípicos de los
+# diagramas de cajas) en formatos vectoriales y layout rápido (ver crear_grafico)
+PERFILES_SALIDA = {
+    'borrador': {'dpi': 100, 'formato': 'png', 'compresion_png': 1, 'rasterizar': False, 'layout_rapido': True},
+    'pantalla': {'dpi': 150, 'formato': 'png', 'compresion_png': 6, 'rasterizar': False, 'layout_rapido': False},
+    'impresion': {'dpi': 300, 'formato': 'pdf', 'compresion_png': 6, 'rasterizar': True, 'layout_rapido': False},
+}
+COMPRESION_PNG = 6
+RASTERIZAR_DENSOS = False
+
+def configurar_salida(dir_figuras=None, dir_datos=None, dpi=None, formato=None, perfil=None,
+                      compresion_png=None, rasterizar=None):
+    """
+    Cambia la carpeta de salida (y con ella las de las cachés), la carpeta de
+    datos, la resolución o el formato de las figuras.
     
-    df['año'] = df[fecha_col].dt.year
-    df['mes'] = df[fecha_col].dt.month
+    Con `perfil` (una clave de PERFILES_SALIDA) se aplican sus opciones; las
+    que se pasen explícitamente tienen prioridad sobre las del perfil.
+    """
+    global DIR_FIGURAS, DIR_DATOS, DPI_FIGURAS, FORMATO_FIGURAS, COMPRESION_PNG, RASTERIZAR_DENSOS
+    global RUTA_MANIFIESTO_CACHE, DIR_ESTADO_INCREMENTAL, DIR_CACHE_SERIES, RUTA_ESTADO_TAREAS
+    if perfil is not None:
+        opciones = PERFILES_SALIDA[perfil]
+        dpi = opciones['dpi'] if dpi is None else dpi
+        formato = opciones['formato'] if formato is None else formato
+        compresion_png = opciones['compresion_png'] if compresion_png is None else compresion_png
+        rasterizar = opciones['rasterizar'] if rasterizar is None else rasterizar
+        _layout_rapido['activo'] = opciones['layout_rapido']
+    if dir_figuras is not None:
+        DIR_FIGURAS = dir_figuras
+        RUTA_MANIFIESTO_CACHE = os.path.join(DIR_FIGURAS, '.cache_render.json')
+        DIR_ESTADO_INCREMENTAL = os.path.join(DIR_FIGURAS, '.incremental')
+        DIR_CACHE_SERIES = os.path.join(DIR_FIGURAS, '.series')
+        RUTA_ESTADO_TAREAS = os.path.join(DIR_FIGURAS, '.estado_tareas.json')
+    if dir_datos is not None:
+        DIR_DATOS = dir_datos
+    if dpi is not None:
+        DPI_FIGURAS = dpi
+    if formato is not None:
+        FORMATO_FIGURAS = formato
+    if compresion_png is not None:
+        COMPRESION_PNG = compresion_png
+    if rasterizar is not None:
+        RASTERIZAR_DENSOS = rasterizar
+
+def ruta_figura(prefijo, nombre):
+    """
+    Ruta de una figura: '<prefijo>_<nombre>.<formato>'.
+    """
+    return f'{prefijo}_{nombre}.{FORMATO_FIGURAS}'
+
+def guardar_figura(figura, ruta_guardado, recortar=True):
+    """
+    Guarda una figura con las opciones de salida actuales: resolución,
+    recorte al contenido, compresión de los PNG y, en formatos vectoriales,
+    rasterización de los artistas densos (líneas de solo marcadores, como
+    los puntos atípicos, o de más de 1000 puntos).
+    """
+    opciones = {'dpi': DPI_FIGURAS, 'bbox_inches': 'tight' if recortar else None}
+    if ruta_guardado.lower().endswith('.png'):
+        opciones['pil_kwargs'] = {'compress_level': COMPRESION_PNG}
+    if RASTERIZAR_DENSOS:
+        for ax in figura.axes:
+            for linea in ax.lines:
+                if linea.get_linestyle() == 'None' or len(linea.get_xdata()) > 1000:
+                    linea.set_rasterized(True)
+    with etapa('guardado', archivo=os.path.basename(ruta_guardado)) as registro:
+        figura.savefig(ruta_guardado, **opciones)
+        registro['bytes'] = os.path.getsize(ruta_guardado)
+
+def _seaborn():
+    """
+    Importa seaborn la primera vez que una figura lo necesita.
+    """
+    import seaborn
+    return seaborn
+
+# Instrumentación de etapas: con 'activo' en False, etapa() no mide nada.
+# 'pila' guarda, por cada etapa abierta, su nombre y el tiempo de sus subetapas
+_instrumentacion = {'activo': False, 'registros': [], 'pila': [], 'inicio': None}
+
+def activar_instrumentacion():
+    """
+    Activa la medición de etapas (ver etapa()) para el reporte de ejecución.
+    """
+    _instrumentacion.update(activo=True, registros=[], pila=[],
+                            inicio=(time.time(), time.perf_counter(), time.process_time()))
+
+def _rss_maximo_mb():
+    """
+    Memoria residente máxima del proceso hasta el momento, en MB (None si el
+    sistema no la informa).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 2**20 if sys.platform == 'darwin' else maximo / 2**10
+
+@contextlib.contextmanager
+def etapa(nombre, **detalles):
+    """
+    Mide una etapa del proceso: tiempo de reloj y de CPU, tiempo propio (sin
+    sus subetapas) y memoria residente máxima al terminar. Las etapas se
+    anidan y cada registro guarda la pila completa ('carga;fechas').
     
-    # Agregar trimestre
-    df['trimestre'] = ((df['mes'] - 1) // 3) + 1
+    El bloque recibe el diccionario del registro, donde puede anotar 'filas'
+    procesadas y 'bytes' escritos.
+    """
+    registro = dict(detalles)
+    if not _instrumentacion['activo']:
+        yield registro
+        return
     
-    if periodo == 'mensual':
-        agregado = df.groupby(['año', 'mes'])[valor_col].mean().reset_index()
-        # Calcular el promedio por mes a lo largo de todos los años
-        promedio_mensual = agregado.groupby('mes')[valor_col].mean().reset_index()
-        return promedio_mensual
+    pila = _instrumentacion['pila']
+    nivel = [nombre, 0.0]
+    pila.append(nivel)
+    registro.update(etapa=nombre, pila=';'.join(nombre for nombre, _ in pila))
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield registro
+    except Exception as e:
+        registro['error'] = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        tiempo = time.perf_counter() - inicio
+        pila.pop()
+        if pila:
+            pila[-1][1] += tiempo
+        registro.update(tiempo_s=tiempo, cpu_s=time.process_time() - inicio_cpu,
+                        propio_s=max(tiempo - nivel[1], 0.0), rss_max_mb=_rss_maximo_mb())
+        _instrumentacion['registros'].append(registro)
+
+def reporte_ejecucion():
+    """
+    Reporte de la ejecución: totales del proceso, los registros de todas las
+    etapas en orden de finalización y un resumen por pila de etapas (número de
+    veces, tiempo total, tiempo propio, filas y bytes), ordenado por tiempo propio.
+    """
+    inicio, inicio_reloj, inicio_cpu = _instrumentacion['inicio']
+    registros = _instrumentacion['registros']
+    resumen = {}
+    for registro in registros:
+        total = resumen.setdefault(registro['pila'], {'pila': registro['pila'], 'veces': 0, 'tiempo_s': 0.0,
+                                                      'propio_s': 0.0, 'cpu_s': 0.0, 'filas': 0, 'bytes': 0})
+        total['veces'] += 1
+        for clave in ('tiempo_s', 'propio_s', 'cpu_s', 'filas', 'bytes'):
+            total[clave] += registro.get(clave, 0)
+    return {
+        'inicio': pd.Timestamp(inicio, unit='s').isoformat(timespec='seconds'),
+        'argumentos': sys.argv[1:],
+        'tiempo_s': time.perf_counter() - inicio_reloj,
+        'cpu_s': time.process_time() - inicio_cpu,
+        'rss_max_mb': _rss_maximo_mb(),
+        'errores': sum(1 for registro in registros if 'error' in registro),
+        'resumen': sorted(resumen.values(), key=lambda total: -total['propio_s']),
+        'etapas': registros,
+    }
+
+def guardar_reporte_ejecucion(ruta, ruta_flamegraph=None):
+    """
+    Escribe el reporte de ejecución en JSON y, con `ruta_flamegraph`, el
+    tiempo propio de cada pila de etapas en formato de pilas colapsadas
+    ('carga;fechas 1234', en microsegundos), que leen flamegraph.pl,
+    speedscope o inferno.
+    """
+    reporte = reporte_ejecucion()
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2, default=str)
     
-    elif periodo == 'trimestral':
-        agregado = df.groupby(['año', 'trimestre'])[valor_col].mean().reset_index()
-        # Calcular el promedio por trimestre a lo largo de todos los años
-        promedio_trimestral = agregado.groupby('trimestre')[valor_col].mean().reset_index()
-        return promedio_trimestral
+    if ruta_flamegraph:
+        with open(ruta_flamegraph, 'w', encoding='utf-8') as f:
+            for total in sorted(reporte['resumen'], key=lambda total: total['pila']):
+                microsegundos = round(total['propio_s'] * 1e6)
+                if microsegundos > 0:
+                    f.write(f"{total['pila'].replace(' ', '_')} {microsegundos}\n")
     
-    elif periodo == 'anual':
-        promedio_anual = df.groupby('año')[valor_col].mean().reset_index()
-        return promedio_anual
+    print(f"Reporte de ejecución: {ruta} ({reporte['tiempo_s']:.1f} s, {len(reporte['etapas'])} etapas)")
+    for total in reporte['resumen'][:5]:
+        print(f"  {total['propio_s']:8.2f} s  {total['pila']}")
+    return reporte
+
+# Etapas del análisis que se pueden seleccionar
+ETAPAS = ('regimenes', 'comparativo', 'descriptivas', 'intervalos', 'cajas', 'frecuencia')
+
+# Registro de variables. Cada variable se describe solo con datos:
+#   ruta, formato ('csv' o 'ideam'), col_fecha, col_valor: fuente y columnas
+#   conversion: nombre de una función de CONVERSIONES aplicada a los valores (opcional)
+#   nombre: nombre en los mensajes; regimen y titulo: textos de los títulos
+#   ylabel: etiqueta con unidades; color y colores_tabla: paleta de la variable
+#   prefijo: prefijo de los archivos de sus figuras (dentro de DIR_FIGURAS)
+#   promedio_de_promedios: cómo se promedian los regímenes (ver calcular_regimenes)
+#   regimenes / comparativo: si se generan sus regímenes y si entra en el gráfico comparativo
+VARIABLES = {
+    'caudal': {
+        'ruta': 'Caudal medio mensual/Caudal medio mensual.csv',
+        'formato': 'csv', 'col_fecha': 'Fecha', 'col_valor': 'Valor',
+        'nombre': 'caudal', 'regimen': 'Caudal', 'titulo': 'Caudal Medio Mensual',
+        'ylabel': 'Caudal (m³/s)', 'color': '#4472C4',
+        'colores_tabla': ('#4472C4', '#D9E1F2', '#E9EDF4', '#D9E1F2'),
+        'prefijo': 'caudal', 'promedio_de_promedios': True,
+        'regimenes': False, 'comparativo': True
+    },
+    'temperatura': {
+        'ruta': 'Temperatura Mensual/Temperatura Minima Mensual/Temperatura Minima Mensual.csv',
+        'formato': 'ideam', 'col_fecha': 'Fecha', 'col_valor': 'Valor',
+        'nombre': 'temperatura', 'regimen': 'Temperatura Mínima', 'titulo': 'Temperatura Mínima Mensual',
+        'ylabel': 'Temperatura (°C)', 'color': '#ED7D31',
+        'colores_tabla': ('#ED7D31', '#FBE5D6', '#FDF1E9', '#FBE5D6'),
+        'prefijo': 'temperatura', 'promedio_de_promedios': True,
+        'regimenes': True, 'comparativo': True
+    },
+    'humedad': {
+        'ruta': 'Húmeda relativa calculada máxima diaria/Húmeda relativa calculada máxima diaria.csv',
+        'formato': 'csv', 'col_fecha': 'Fecha', 'col_valor': 'Valor',
+        'nombre': 'humedad', 'regimen': 'Humedad Relativa Máxima', 'titulo': 'Humedad Relativa Máxima Diaria',
+        'ylabel': 'Humedad Relativa (%)', 'color': '#70AD47',
+        'colores_tabla': ('#70AD47', '#E2F0D9', '#F0F7EC', '#E2F0D9'),
+        'prefijo': 'humedad', 'promedio_de_promedios': True,
+        'regimenes': True, 'comparativo': True
+    },
+    'evaporacion': {
+        'ruta': 'Evaporación total diaria SUM [EVTE_CON]/Evaporación total diaria SUM.csv',
+        'formato': 'csv', 'col_fecha': 'Fecha', 'col_valor': 'Valor',
+        'nombre': 'evaporación', 'regimen': 'Evaporación', 'titulo': 'Evaporación Total Diaria',
+        'ylabel': 'Evaporación (mm)', 'color': '#5B9BD5',
+        'colores_tabla': ('#5B9BD5', '#DEEAF6', '#EFF4FB', '#DEEAF6'),
+        'prefijo': 'evaporacion', 'promedio_de_promedios': False,
+        'regimenes': True, 'comparativo': True
+    },
+    'precipitacion': {
+        'ruta': 'Datos/Precipitacion Mensual.csv',
+        'formato': 'csv', 'col_fecha': 'system:time_start', 'col_valor': 'precipitation',
+        'nombre': 'precipitación', 'regimen': 'Precipitación', 'titulo': 'Precipitación Mensual',
+        'ylabel': 'Precipitación (mm)', 'color': '#9B59B6',
+        'colores_tabla': ('#9B59B6', '#E8DAEF', '#F4ECF7', '#E8DAEF'),
+        'prefijo': 'precipitacion', 'promedio_de_promedios': True,
+        'regimenes': True, 'comparativo': True
+    },
+    'temperatura_suelo': {
+        'ruta': 'Datos/Temperatura Mensual.csv',
+        'formato': 'csv', 'col_fecha': 'system:time_start', 'col_valor': 'SoilTemp00_10cm_tavg',
+        'conversion': 'kelvin_a_celsius',
+        'nombre': 'temperatura del suelo', 'regimen': 'Temperatura del Suelo (0-10 cm)',
+        'titulo': 'Temperatura del Suelo Mensual (0-10 cm)',
+        'ylabel': 'Temperatura (°C)', 'color': '#C0504D',
+        'colores_tabla': ('#C0504D', '#F2DCDB', '#F9EDED', '#F2DCDB'),
+        'prefijo': 'temperatura_suelo', 'promedio_de_promedios': True,
+        'regimenes': True, 'comparativo': False
+    },
+    'humedad_suelo': {
+        'ruta': 'Datos/Humedad Mensual.csv',
+        'formato': 'csv', 'col_fecha': 'system:time_start', 'col_valor': 'SoilMoi00_10cm_tavg',
+        'conversion': 'fraccion_a_porcentaje',
+        'nombre': 'humedad del suelo', 'regimen': 'Humedad del Suelo (0-10 cm)',
+        'titulo': 'Humedad del Suelo Mensual (0-10 cm)',
+        'ylabel': 'Humedad Volumétrica (%)', 'color': '#4BACC6',
+        'colores_tabla': ('#4BACC6', '#DAEEF3', '#EDF6F9', '#DAEEF3'),
+        'prefijo': 'humedad_suelo', 'promedio_de_promedios': True,
+        'regimenes': True, 'comparativo': False
+    },
+}
+
+# Conversiones de unidades que una variable puede pedir con la clave 'conversion'
+CONVERSIONES = {
+    'kelvin_a_celsius': lambda valores: valores - 273.15,
+    'fraccion_a_porcentaje': lambda valores: valores * 100,
+}
+
+def _convertir_valores(fuente, valores):
+    conversion = fuente.get('conversion')
+    return CONVERSIONES[conversion](valores) if conversion else valores
+
+# Registro en memoria de las series ya cargadas, para leer cada fuente una sola vez
+_series_cargadas = {}
+
+# Formatos de fecha que se prueban, en orden, al detectar el formato de un archivo.
+# 'epoch_ms' son milisegundos desde 1970 (system:time_start de Google Earth Engine).
+# Los que empiezan por el día solo se aceptan si la muestra tiene algún día
+# mayor que 12 (ver detectar_formato_fecha)
+FORMATOS_FECHA = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y/%m/%d',
+    '%b %d, %Y', '%d/%m/%Y', '%d/%m/%Y %H:%M', '%d-%m-%Y',
+]
+
+def detectar_formato_fecha(fechas, tamano_muestra=50):
+    """
+    Detecta el formato de una columna de fechas a partir de sus primeros
+    valores no vacíos. Devuelve 'epoch_ms' para valores numéricos, uno de
+    FORMATOS_FECHA, o None si ninguno sirve para toda la muestra.
     
+    Un formato con el día primero (como '%d/%m/%Y') solo se acepta si algún
+    día de la muestra es mayor que 12: con fechas ambiguas ('01/02/2000') se
+    devuelve None y se conserva la interpretación de pandas, con el mes primero.
+    """
+    fechas = pd.Series(fechas)
+    if pd.api.types.is_numeric_dtype(fechas):
+        return 'epoch_ms'
+    muestra = fechas.head(20 * tamano_muestra).dropna().astype(str).str.strip()
+    muestra = muestra[muestra.str.len() > 0].head(tamano_muestra)
+    if muestra.empty:
+        return None
+    if muestra.str.fullmatch(r'-?\d+').all():
+        return 'epoch_ms'
+    for formato in FORMATOS_FECHA:
+        if formato.startswith('%d') and not (muestra.str.extract(r'^(\d+)')[0].astype(float) > 12).any():
+            continue
+        try:
+            pd.to_datetime(muestra, format=formato)
+        except (ValueError, TypeError):
+            continue
+        return formato
     return None
 
-# Función para crear gráficos
-def crear_grafico(df, x_col, y_col, titulo, xlabel, ylabel, ruta_guardado, tipo='barras', color='#4472C4'):
-    plt.figure(figsize=(14, 8))
+# Interpretación fecha a fecha cuando no hay un formato común: pandas >= 2.0
+# lo pide con format='mixed'; las versiones anteriores lo hacen por defecto
+_FORMATO_MIXTO = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+def parsear_fechas(fechas, formato=None):
+    """
+    Convierte una columna de fechas a datetime64 en una sola llamada
+    vectorizada con formato fijo. Sin `formato`, se detecta con
+    detectar_formato_fecha; si el formato no sirve para todas las filas se
+    interpreta cada fecha por separado (más lento).
+    """
+    with etapa('fechas', filas=len(fechas)):
+        if formato is None:
+            formato = detectar_formato_fecha(fechas)
+        if formato == 'epoch_ms':
+            return pd.to_datetime(pd.to_numeric(fechas), unit='ms').to_numpy()
+        if formato is not None:
+            try:
+                return pd.to_datetime(fechas, format=formato).to_numpy()
+            except (ValueError, TypeError):
+                pass
+        return pd.to_datetime(fechas, **_FORMATO_MIXTO).to_numpy()
+
+def _bloques_archivo_ideam(ruta, col_fecha='Fecha', col_valor='Valor', tamano_bloque=100000):
+    """
+    Recorre por bloques un archivo con filas iniciales de metadatos (formato
+    IDEAM), entregando en cada paso los arreglos de fechas (datetime64) y
+    valores (float64) de un bloque.
+
+    El encabezado se localiza buscando la fila que comienza con la columna de
+    fecha; la columna de valores se elige por nombre (si no existe se usa la
+    3ra columna). Las filas vacías, sin fecha o con valores no numéricos se
+    descartan.
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        # Saltar el preámbulo de metadatos hasta la fila de encabezado
+        for linea in f:
+            if linea.startswith(col_fecha):
+                break
+        else:
+            raise ValueError(f"No se encontró el encabezado '{col_fecha}' en el archivo {ruta}")
+
+        columnas = [c.strip() for c in linea.split(',')]
+        idx_valor = columnas.index(col_valor) if col_valor in columnas else 2
+
+        # Leer el resto del archivo por bloques, sin cargarlo completo en memoria
+        lector = pd.read_csv(f, header=None, usecols=[0, idx_valor], dtype=str,
+                             quoting=csv.QUOTE_NONE, skip_blank_lines=True,
+                             chunksize=tamano_bloque)
+        formato = None
+        for bloque in lector:
+            fechas = bloque[0].str.strip()
+            valores = pd.to_numeric(bloque[idx_valor].str.strip(), errors='coerce')
+            validos = (fechas.str.len() > 0) & valores.notna()
+            if validos.any():
+                # El formato de fecha se detecta una sola vez, con el primer bloque
+                if formato is None:
+                    formato = detectar_formato_fecha(fechas[validos])
+                yield (parsear_fechas(fechas[validos], formato),
+                       valores[validos].to_numpy(dtype='float64'))
+
+def _leer_archivo_ideam(ruta, col_fecha='Fecha', col_valor='Valor', tamano_bloque=100000):
+    """
+    Lee un archivo en formato IDEAM y devuelve los arreglos de fechas
+    (datetime64) y valores (float64).
+    """
+    bloques = list(_bloques_archivo_ideam(ruta, col_fecha, col_valor, tamano_bloque))
+    if not bloques:
+        raise ValueError(f"No se pudieron extraer datos del archivo {ruta}")
+
+    return (np.concatenate([fechas for fechas, _ in bloques]),
+            np.concatenate([valores for _, valores in bloques]))
+
+def iterar_bloques_serie(fuente, tamano_bloque=100000):
+    """
+    Recorre una fuente de datos por bloques de a lo sumo `tamano_bloque`
+    filas, entregando pares (fechas, valores) sin cargar el archivo completo.
+    """
+    if fuente['formato'] == 'ideam':
+        for fechas, valores in _bloques_archivo_ideam(fuente['ruta'], fuente['col_fecha'],
+                                                      fuente['col_valor'], tamano_bloque):
+            yield fechas, _convertir_valores(fuente, valores)
+        return
+
+    lector = pd.read_csv(fuente['ruta'], usecols=[fuente['col_fecha'], fuente['col_valor']],
+                         chunksize=tamano_bloque)
+    formato = None
+    for bloque in lector:
+        valores = pd.to_numeric(bloque[fuente['col_valor']], errors='coerce')
+        validos = valores.notna()
+        if validos.any():
+            fechas = bloque.loc[validos, fuente['col_fecha']]
+            if formato is None:
+                formato = detectar_formato_fecha(fechas)
+            yield (parsear_fechas(fechas, formato),
+                   _convertir_valores(fuente, valores[validos].to_numpy(dtype='float64')))
+
+def _parsear_fuente(fuente):
+    """
+    Lee y parsea el archivo de una fuente, devolviendo los arreglos de
+    fechas (datetime64) y valores (float64) sin conversión de unidades.
+    """
+    if fuente['formato'] == 'ideam':
+        return _leer_archivo_ideam(fuente['ruta'], fuente['col_fecha'], fuente['col_valor'])
+
+    df = pd.read_csv(fuente['ruta'], usecols=[fuente['col_fecha'], fuente['col_valor']])
+    return (parsear_fechas(df[fuente['col_fecha']]),
+            df[fuente['col_valor']].to_numpy(dtype='float64'))
+
+_cache_series = {'activa': True}
+
+def desactivar_cache_series():
+    """
+    Parsea siempre los archivos de datos, sin leer ni escribir la caché binaria.
+    """
+    _cache_series['activa'] = False
+
+def _huella_archivo(ruta, tamano_bloque=1 << 20):
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _guardar_atomico(ruta, escribir):
+    # Se escribe en un archivo temporal y se reemplaza, para no alterar un
+    # archivo que otro proceso pueda tener mapeado en memoria
+    temporal = ruta + '.tmp'
+    with etapa('guardado', archivo=os.path.basename(ruta)) as registro:
+        with open(temporal, 'wb') as f:
+            escribir(f)
+            registro['bytes'] = f.tell()
+        os.replace(temporal, ruta)
+
+def leer_columnas(fuente):
+    """
+    Devuelve los arreglos de fechas y valores parseados de una fuente.
     
-    if tipo == 'barras':
-        ax = sns.barplot(x=x_col, y=y_col, data=df, color=color)
-        
-        # Para mensual, cambiar los nombres de los meses a español
-        if x_col == 'mes':
-            plt.xticks(range(len(meses)), meses)
-        
-        # Para trimestral, cambiar a nombres de trimestres
-        elif x_col == 'trimestre':
-            plt.xticks(range(len(trimestres)), trimestres)
+    La primera vez que se parsea un archivo se guardan sus columnas como
+    arreglos .npy en DIR_CACHE_SERIES; en las siguientes ejecuciones se
+    mapean en memoria sin volver a parsear el texto. La caché se invalida si
+    cambia el tamaño del archivo, o si cambia su fecha de modificación y
+    también su contenido (hash).
+    """
+    if not _cache_series['activa']:
+        return _parsear_fuente(fuente)
+    
+    clave = repr((fuente['ruta'], fuente['formato'], fuente['col_fecha'], fuente['col_valor']))
+    directorio = os.path.join(DIR_CACHE_SERIES, hashlib.sha1(clave.encode()).hexdigest()[:16])
+    ruta_meta = os.path.join(directorio, 'meta.json')
+    ruta_fechas = os.path.join(directorio, 'fechas.npy')
+    ruta_valores = os.path.join(directorio, 'valores.npy')
+    info = os.stat(fuente['ruta'])
+    
+    meta = None
+    if os.path.exists(ruta_meta):
+        with open(ruta_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    
+    if meta is not None and meta['tamano'] == info.st_size:
+        vigente = meta['mtime_ns'] == info.st_mtime_ns
+        if not vigente and meta['huella'] == _huella_archivo(fuente['ruta']):
+            # Mismo contenido con otra fecha de modificación: basta con actualizarla
+            meta['mtime_ns'] = info.st_mtime_ns
+            _guardar_atomico(ruta_meta, lambda f: f.write(json.dumps(meta).encode()))
+            vigente = True
+        if vigente:
+            try:
+                return np.load(ruta_fechas, mmap_mode='r'), np.load(ruta_valores, mmap_mode='r')
+            except (OSError, ValueError):
+                pass  # Caché incompleta o dañada: se vuelve a parsear
+    
+    huella = _huella_archivo(fuente['ruta'])
+    fechas, valores = _parsear_fuente(fuente)
+    
+    # El meta se escribe al final: sin él, la caché no se considera válida
+    os.makedirs(directorio, exist_ok=True)
+    if os.path.exists(ruta_meta):
+        os.remove(ruta_meta)
+    _guardar_atomico(ruta_fechas, lambda f: np.save(f, fechas))
+    _guardar_atomico(ruta_valores, lambda f: np.save(f, valores))
+    meta = {'ruta': fuente['ruta'], 'tamano': info.st_size,
+            'mtime_ns': info.st_mtime_ns, 'huella': huella}
+    _guardar_atomico(ruta_meta, lambda f: f.write(json.dumps(meta).encode()))
+    return fechas, valores
+
+def leer_serie(fuente):
+    """
+    Lee una fuente de datos como una serie de valores float64 indexada por
+    fecha (datetime64), aplicando la conversión de unidades de la fuente si
+    la tiene.
+    """
+    fechas, valores = leer_columnas(fuente)
+    indice = pd.DatetimeIndex(fechas, name='Fecha')
+    valores = _convertir_valores(fuente, np.asarray(valores, dtype='float64'))
+    return pd.Series(valores, index=indice, name='Valor')
+
+def cargar_serie(variable):
+    """
+    Devuelve la serie de una variable. El archivo se lee y se parsea solo la
+    primera vez; las llamadas siguientes reutilizan la serie registrada.
+    """
+    if variable not in _series_cargadas:
+        with etapa('carga', variable=variable) as registro:
+            _series_cargadas[variable] = leer_serie(fuente_variable(variable))
+            registro['filas'] = len(_series_cargadas[variable])
+    return _series_cargadas[variable]
+
+def fuente_variable(variable):
+    """
+    Fuente de datos de una variable registrada, con la ruta dentro de DIR_DATOS.
+    """
+    fuente = dict(VARIABLES[variable])
+    fuente['ruta'] = os.path.join(DIR_DATOS, fuente['ruta'])
+    return fuente
+
+def obtener_datos(variable):
+    """
+    Devuelve los datos de una variable como DataFrame con columnas 'Fecha' y 'Valor'.
+    """
+    return cargar_serie(variable).reset_index()
+
+def limpiar_series_cargadas():
+    """
+    Vacía el registro de series, forzando una nueva lectura de los archivos.
+    """
+    _series_cargadas.clear()
+
+def _con_grupo(tabla, por, etiquetas, grupos):
+    """
+    Añade a `tabla` (como primera columna) la etiqueta del grupo de cada fila.
+    """
+    if por is not None:
+        tabla.insert(0, por, np.asarray(etiquetas)[grupos])
+    return tabla
+
+def _tabla_por_periodo(presentes, suma, conteo, suma_cuadrados, año_inicial, periodo_col, valor_col,
+                       por=None, etiquetas=None):
+    """
+    Convierte las matrices (grupos x años x periodos) de una reducción en una
+    tabla larga con una fila por cada (grupo, año, periodo) presente en los datos.
+    """
+    n_años, n_periodos = presentes.shape[1:]
+    filas = np.flatnonzero(presentes.ravel())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = suma.ravel()[filas] / conteo.ravel()[filas]
+    tabla = pd.DataFrame({
+        'año': año_inicial + filas // n_periodos % n_años,
+        periodo_col: filas % n_periodos + 1,
+        'suma': suma.ravel()[filas],
+        'conteo': conteo.ravel()[filas],
+        'suma_cuadrados': suma_cuadrados.ravel()[filas],
+        valor_col: promedio,
+    })
+    return _con_grupo(tabla, por, etiquetas, filas // (n_años * n_periodos))
+
+def _promedio_entre_años(presentes, suma, conteo, periodo_col, valor_col, por=None, etiquetas=None):
+    """
+    Promedio entre años de los promedios de cada (año, periodo), ignorando
+    los periodos sin valores válidos; uno por cada grupo.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedios = suma / conteo
+    validos = conteo > 0
+    n_validos = validos.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        regimen = np.where(validos, promedios, 0.0).sum(axis=1) / n_validos
+    grupos, periodos = np.nonzero(presentes.any(axis=1))
+    tabla = pd.DataFrame({periodo_col: periodos + 1, valor_col: regimen[grupos, periodos]})
+    return _con_grupo(tabla, por, etiquetas, grupos)
+
+def agregar_multiresolucion(df, fecha_col, valor_col, por=None):
+    """
+    Calcula en una sola pasada los regímenes mensual, trimestral y anual, y
+    las tablas intermedias por (año, mes) y (año, trimestre).
+    
+    Cada observación recibe un código entero de periodo
+    ((grupo * años + año - año inicial) * 12 + mes - 1) y las sumas, conteos
+    y sumas de cuadrados se reducen con np.bincount; trimestres y años se
+    obtienen sumando esas celdas.
+    
+    por: columna de agrupación opcional (por ejemplo 'estacion'). Todos los
+    grupos se reducen en la misma pasada y cada tabla resultante lleva esa
+    columna al inicio.
+    
+    Devuelve un diccionario con las claves 'mensual', 'trimestral' y 'anual'
+    (mismo formato que agregar_por_periodo) y 'año_mes' y 'año_trimestre'
+    (columnas año, mes/trimestre, suma, conteo, suma_cuadrados y valor_col).
+    """
+    with etapa('agregacion', filas=len(df)):
+        return _agregar_multiresolucion(df, fecha_col, valor_col, por)
+
+def _agregar_multiresolucion(df, fecha_col, valor_col, por=None):
+    fechas = df[fecha_col]
+    if len(fechas) > 0 and isinstance(fechas.iloc[0], str):
+        fechas = parsear_fechas(fechas)
+    fechas = pd.DatetimeIndex(fechas)
+    valores = df[valor_col].to_numpy(dtype='float64')
+    
+    if por is None:
+        grupos, etiquetas = np.zeros(len(df), dtype='int64'), None
+        n_grupos = 1
+    else:
+        grupos, etiquetas = pd.factorize(df[por], sort=True)
+        n_grupos = len(etiquetas)
+    
+    años = fechas.year.to_numpy(dtype='int64')
+    año_inicial = int(años.min()) if len(años) > 0 else 0
+    n_años = int(años.max()) - año_inicial + 1 if len(años) > 0 else 0
+    codigos = (grupos * n_años + años - año_inicial) * 12 + fechas.month.to_numpy(dtype='int64') - 1
+    
+    # Reducción por (grupo, año, mes)
+    forma = (n_grupos, n_años, 12)
+    tamaño = n_grupos * n_años * 12
+    validos = ~np.isnan(valores)
+    presentes = np.bincount(codigos, minlength=tamaño).reshape(forma) > 0
+    conteo = np.bincount(codigos[validos], minlength=tamaño).astype('float64').reshape(forma)
+    suma = np.bincount(codigos[validos], weights=valores[validos],
+                       minlength=tamaño).reshape(forma)
+    suma_cuadrados = np.bincount(codigos[validos], weights=valores[validos] ** 2,
+                                 minlength=tamaño).reshape(forma)
+    
+    # Trimestres y años a partir de las celdas mensuales
+    def por_trimestre(m):
+        return m.reshape(n_grupos, n_años, 4, 3).sum(axis=3)
+    presentes_t = presentes.reshape(n_grupos, n_años, 4, 3).any(axis=3)
+    conteo_t, suma_t, suma_cuadrados_t = por_trimestre(conteo), por_trimestre(suma), por_trimestre(suma_cuadrados)
+    
+    grupos_a, años_presentes = np.nonzero(presentes.any(axis=2))
+    conteo_a = conteo.sum(axis=2)[grupos_a, años_presentes]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio_anual = suma.sum(axis=2)[grupos_a, años_presentes] / conteo_a
+    anual = pd.DataFrame({'año': año_inicial + años_presentes, valor_col: promedio_anual})
+    
+    return {
+        'mensual': _promedio_entre_años(presentes, suma, conteo, 'mes', valor_col, por, etiquetas),
+        'trimestral': _promedio_entre_años(presentes_t, suma_t, conteo_t, 'trimestre', valor_col,
+                                           por, etiquetas),
+        'anual': _con_grupo(anual, por, etiquetas, grupos_a),
+        'año_mes': _tabla_por_periodo(presentes, suma, conteo, suma_cuadrados,
+                                      año_inicial, 'mes', valor_col, por, etiquetas),
+        'año_trimestre': _tabla_por_periodo(presentes_t, suma_t, conteo_t, suma_cuadrados_t,
+                                            año_inicial, 'trimestre', valor_col, por, etiquetas),
+    }
+
+# Función para agregar por periodos (mensual, trimestral, anual)
+def agregar_por_periodo(df, fecha_col, valor_col, periodo, por=None):
+    """
+    Devuelve un solo régimen ('mensual', 'trimestral' o 'anual'), por grupo
+    si se indica `por`. Para obtener varios a la vez use agregar_multiresolucion().
+    """
+    if periodo not in ('mensual', 'trimestral', 'anual'):
+        return None
+    return agregar_multiresolucion(df, fecha_col, valor_col, por)[periodo]
+
+# Estado del modo incremental: acumulados ya actualizados en esta ejecución
+_modo_incremental = {'activo': False, 'estados': {}}
+
+# Filas finales ya procesadas que se comparan para detectar cambios en los datos
+FILAS_HUELLA_INCREMENTAL = 1024
+
+def activar_modo_incremental():
+    """
+    Activa el modo incremental: los regímenes y los momentos de las
+    estadísticas descriptivas se calculan a partir de los acumulados
+    guardados, procesando solo las filas nuevas de cada archivo.
+    """
+    _modo_incremental['activo'] = True
+
+def calcular_regimenes(variable, df, promedio_de_promedios=True):
+    """
+    Calcula los regímenes mensual, trimestral y anual de una variable.
+    
+    Con promedio_de_promedios=True, el régimen mensual (trimestral) es el
+    promedio entre años de los promedios de cada (año, mes) ((año, trimestre));
+    con False es el promedio directo de todas las observaciones del periodo.
+    En modo incremental se obtienen de los acumulados de la variable.
+    """
+    if _modo_incremental['activo']:
+        return regimenes_desde_acumulados(actualizar_estado_incremental(variable, df), promedio_de_promedios)
+    
+    return regimenes_desde_agregados(agregar_multiresolucion(df, 'Fecha', 'Valor'), promedio_de_promedios)
+
+def regimenes_desde_agregados(agregados, promedio_de_promedios=True, por=None):
+    """
+    Regímenes (mensual, trimestral, anual) a partir del resultado de
+    agregar_multiresolucion (agrupado por `por`, si se indica).
+    """
+    if promedio_de_promedios:
+        return agregados['mensual'], agregados['trimestral'], agregados['anual']
+    
+    claves = [] if por is None else [por]
+    regimenes = []
+    for tabla, periodo_col in ((agregados['año_mes'], 'mes'), (agregados['año_trimestre'], 'trimestre')):
+        totales = tabla.groupby(claves + [periodo_col])[['suma', 'conteo']].sum()
+        regimenes.append((totales['suma'] / totales['conteo']).rename('Valor').reset_index())
+    regimenes.append(agregados['anual'])
+    return tuple(regimenes)
+
+def _acumular_celdas(fechas, valores, periodo_col):
+    """
+    Suma, conteo y suma de cuadrados de los valores por (año, periodo_col).
+    """
+    df = pd.DataFrame({'Fecha': fechas, 'Valor': valores})
+    tabla = agregar_multiresolucion(df, 'Fecha', 'Valor')['año_' + periodo_col]
+    tabla = tabla[tabla['conteo'] > 0]
+    return tabla.set_index(['año', periodo_col])[['suma', 'conteo', 'suma_cuadrados']].astype('float64')
+
+def _huella_filas(fechas, valores, n):
+    # Solo la primera fila y las últimas de las `n` procesadas: comprobarla no
+    # depende del largo del historial
+    h = hashlib.sha256()
+    for inicio, fin in ((0, min(n, 1)), (max(n - FILAS_HUELLA_INCREMENTAL, 0), n)):
+        h.update(np.ascontiguousarray(fechas[inicio:fin].asi8).tobytes())
+        h.update(np.ascontiguousarray(valores[inicio:fin]).tobytes())
+    return h.hexdigest()
+
+def _celdas_a_json(celdas):
+    return celdas.reset_index().to_dict(orient='list')
+
+def _celdas_desde_json(datos, periodo_col):
+    return pd.DataFrame(datos).set_index(['año', periodo_col]).astype('float64')
+
+def actualizar_estado_incremental(variable, df):
+    """
+    Actualiza y guarda los acumulados por (año, mes) y (año, trimestre) de una
+    variable con las filas de `df` que aún no se habían procesado.
+    
+    Si las filas ya procesadas cambiaron (por ejemplo, por una corrección de
+    datos), los acumulados se recalculan desde cero. Para no recorrer todo el
+    historial solo se comparan la primera fila y las últimas
+    FILAS_HUELLA_INCREMENTAL ya procesadas; una corrección anterior a ellas
+    requiere borrar DIR_ESTADO_INCREMENTAL.
+    """
+    ruta = os.path.join(DIR_ESTADO_INCREMENTAL, f'{variable}.json')
+    fechas = pd.DatetimeIndex(df['Fecha'])
+    valores = df['Valor'].to_numpy(dtype='float64')
+    
+    # Los regímenes y las estadísticas de una variable comparten los acumulados
+    estado = _modo_incremental['estados'].get(variable)
+    if estado is not None and estado['n_filas'] == len(valores):
+        return estado
+    
+    estado = None
+    if os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            estado = json.load(f)
+        n = estado['n_filas']
+        if ('minimo' not in estado or n > len(valores)
+                or _huella_filas(fechas, valores, n) != estado['huella']):
+            print(f"  Los datos ya procesados de {variable} cambiaron; se recalculan los acumulados")
+            estado = None
+    
+    if estado is None:
+        n = 0
+        minimo, maximo = np.inf, -np.inf
+        celdas_mes = _acumular_celdas(fechas[:0], valores[:0], 'mes')
+        celdas_trimestre = _acumular_celdas(fechas[:0], valores[:0], 'trimestre')
+    else:
+        minimo, maximo = estado['minimo'], estado['maximo']
+        celdas_mes = _celdas_desde_json(estado['celdas_mes'], 'mes')
+        celdas_trimestre = _celdas_desde_json(estado['celdas_trimestre'], 'trimestre')
+    
+    # Solo se procesan las filas nuevas
+    nuevas_fechas, nuevos_valores = fechas[n:], valores[n:]
+    if len(nuevos_valores) > 0 or estado is None:
+        celdas_mes = celdas_mes.add(_acumular_celdas(nuevas_fechas, nuevos_valores, 'mes'),
+                                    fill_value=0)
+        celdas_trimestre = celdas_trimestre.add(
+            _acumular_celdas(nuevas_fechas, nuevos_valores, 'trimestre'), fill_value=0)
+        validos = nuevos_valores[~np.isnan(nuevos_valores)]
+        if len(validos) > 0:
+            minimo, maximo = min(minimo, float(validos.min())), max(maximo, float(validos.max()))
+        estado = {
+            'n_filas': len(valores),
+            'huella': _huella_filas(fechas, valores, len(valores)),
+            'minimo': minimo,
+            'maximo': maximo,
+            'celdas_mes': _celdas_a_json(celdas_mes),
+            'celdas_trimestre': _celdas_a_json(celdas_trimestre),
+        }
+        os.makedirs(DIR_ESTADO_INCREMENTAL, exist_ok=True)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(estado, f)
+    
+    print(f"  Acumulados de {variable}: {len(nuevos_valores)} filas nuevas de {len(valores)}")
+    _modo_incremental['estados'][variable] = estado
+    return estado
+
+def regimenes_desde_acumulados(estado, promedio_de_promedios=True):
+    """
+    Calcula los regímenes mensual, trimestral y anual a partir de los acumulados.
+    """
+    celdas_mes = _celdas_desde_json(estado['celdas_mes'], 'mes')
+    celdas_trimestre = _celdas_desde_json(estado['celdas_trimestre'], 'trimestre')
+    
+    regimenes = []
+    for celdas, periodo_col in ((celdas_mes, 'mes'), (celdas_trimestre, 'trimestre')):
+        if promedio_de_promedios:
+            promedios = celdas['suma'] / celdas['conteo']
+            regimen = promedios.groupby(level=periodo_col).mean()
+        else:
+            totales = celdas.groupby(level=periodo_col)[['suma', 'conteo']].sum()
+            regimen = totales['suma'] / totales['conteo']
+        regimenes.append(regimen.rename('Valor').reset_index())
+    
+    totales_anuales = celdas_mes.groupby(level='año')[['suma', 'conteo']].sum()
+    anual = (totales_anuales['suma'] / totales_anuales['conteo']).rename('Valor').reset_index()
+    regimenes.append(anual)
+    return tuple(regimenes)
+
+def momentos_desde_acumulados(estado):
+    """
+    Calcula n, mínimo, máximo, media, varianza, desviación estándar y
+    coeficiente de variación a partir de los acumulados, sin volver a
+    recorrer los datos.
+    """
+    celdas = _celdas_desde_json(estado['celdas_mes'], 'mes')
+    n = celdas['conteo'].sum()
+    suma = celdas['suma'].sum()
+    media = suma / n if n > 0 else np.nan
+    varianza = (celdas['suma_cuadrados'].sum() - suma * media) / (n - 1) if n > 1 else np.nan
+    desviacion_estandar = np.sqrt(varianza)
+    coef_variacion = (desviacion_estandar / media) * 100 if media != 0 else 0
+    return {
+        'n': int(n),
+        'minimo': estado['minimo'] if n > 0 else np.nan,
+        'maximo': estado['maximo'] if n > 0 else np.nan,
+        'media': media,
+        'varianza': varianza,
+        'desviacion_estandar': desviacion_estandar,
+        'coef_variacion': coef_variacion
+    }
+
+def estadisticas_incrementales(variable, df, valor_col='Valor'):
+    """
+    Estadísticas descriptivas en modo incremental, con las mismas claves que
+    calcular_estadisticas. Los momentos, el mínimo y el máximo salen de los
+    acumulados de la variable (ver momentos_desde_acumulados), que solo se
+    actualizan con las filas nuevas; la mediana y la moda, que no se pueden
+    acumular, se calculan sobre los valores.
+    """
+    momentos = momentos_desde_acumulados(actualizar_estado_incremental(variable, df))
+    if momentos['n'] == 0:
+        return calcular_estadisticas(df, valor_col)
+    
+    valores = df[valor_col].dropna()
+    conteos = valores.value_counts()
+    rango = momentos['maximo'] - momentos['minimo']
+    num_clases = int(1 + 3.322 * np.log10(momentos['n']))
+    return {
+        'n': momentos['n'], 'minimo': momentos['minimo'], 'maximo': momentos['maximo'], 'rango': rango,
+        'media': momentos['media'], 'mediana': valores.median(),
+        'moda': conteos.index[conteos == conteos.max()].min(),
+        'varianza': momentos['varianza'], 'desviacion_estandar': momentos['desviacion_estandar'],
+        'coef_variacion': momentos['coef_variacion'],
+        'num_clases': num_clases, 'ancho_clase': rango / num_clases if num_clases > 0 else 0
+    }
+
+# Tareas de renderizado pendientes. Con None (modo secuencial) cada figura se
+# genera en el momento en que se programa.
+_tareas_render = None
+
+# Estado de la caché de renderizado
+_cache_render = {
+    'activa': True,
+    'manifiesto': None,
+    'pendientes': {},
+    'huella_codigo': None,
+    'aciertos': 0,
+    'fallos': 0,
+}
+
+def _actualizar_huella(h, obj):
+    """
+    Añade al hash `h` una representación estable de `obj` (DataFrames,
+    arreglos, sketches, diccionarios, secuencias y escalares).
+    """
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(repr((obj.dtype.str, obj.shape)).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, SketchCuantiles):
+        _actualizar_huella(h, obj.estado())
+    elif isinstance(obj, dict):
+        h.update(b'{')
+        for clave in sorted(obj, key=repr):
+            _actualizar_huella(h, clave)
+            _actualizar_huella(h, obj[clave])
+        h.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for elemento in obj:
+            _actualizar_huella(h, elemento)
+        h.update(b']')
+    else:
+        h.update(repr(obj).encode())
+        h.update(b';')
+
+def _huella_codigo():
+    """
+    Hash del código de este módulo: si cambia la forma de dibujar, cambian las claves.
+    """
+    if _cache_render['huella_codigo'] is None:
+        with open(__file__, 'rb') as f:
+            _cache_render['huella_codigo'] = hashlib.sha256(f.read()).hexdigest()
+    return _cache_render['huella_codigo']
+
+def _clave_render(funcion, args, kwargs):
+    """
+    Clave de caché de una figura: datos de entrada, función, textos y colores,
+    opciones de salida (resolución, compresión, rasterización y layout) y
+    versiones de las librerías de gráficos.
+    """
+    h = hashlib.sha256()
+    versiones = (pd.__version__, np.__version__, version('matplotlib'), version('seaborn'))
+    salida = (DPI_FIGURAS, COMPRESION_PNG, RASTERIZAR_DENSOS, _layout_rapido['activo'])
+    _actualizar_huella(h, (funcion.__name__, args, kwargs, salida, versiones, _huella_codigo()))
+    return h.hexdigest()
+
+def _manifiesto_cache():
+    if _cache_render['manifiesto'] is None:
+        try:
+            with open(RUTA_MANIFIESTO_CACHE, 'r', encoding='utf-8') as f:
+                _cache_render['manifiesto'] = json.load(f)
+        except (OSError, ValueError):
+            _cache_render['manifiesto'] = {}
+    return _cache_render['manifiesto']
+
+def _registrar_en_cache(ruta, clave):
+    if clave is not None:
+        _manifiesto_cache()[ruta] = clave
+
+def desactivar_cache_render():
+    """
+    Fuerza a regenerar todas las figuras aunque sus datos no hayan cambiado.
+    """
+    _cache_render['activa'] = False
+
+def guardar_cache_render():
+    """
+    Escribe el manifiesto de la caché y reporta los aciertos y fallos (si se
+    programó alguna figura).
+    """
+    if _cache_render['manifiesto'] is not None:
+        os.makedirs(os.path.dirname(RUTA_MANIFIESTO_CACHE) or '.', exist_ok=True)
+        with open(RUTA_MANIFIESTO_CACHE, 'w', encoding='utf-8') as f:
+            json.dump(_cache_render['manifiesto'], f, indent=1, sort_keys=True)
+    if _cache_render['activa'] and _cache_render['aciertos'] + _cache_render['fallos'] > 0:
+        print(f"Caché de figuras: {_cache_render['aciertos']} sin cambios, "
+              f"{_cache_render['fallos']} regeneradas")
+
+def _ruta_de_tarea(funcion, args, kwargs):
+    """
+    Devuelve la ruta de salida de una tarea de renderizado.
+    """
+    argumentos = inspect.signature(funcion).bind(*args, **kwargs).arguments
+    return argumentos.get('ruta_guardado', funcion.__name__)
+
+def _dibujar(funcion, args, kwargs):
+    """
+    Genera una figura dentro de su etapa 'render:<archivo>', con las filas
+    de la tabla que recibe como primer argumento.
+    """
+    ruta = _ruta_de_tarea(funcion, args, kwargs)
+    with etapa(f'render:{os.path.basename(ruta)}', funcion=funcion.__name__) as registro:
+        if args and isinstance(args[0], pd.DataFrame):
+            registro['filas'] = len(args[0])
+        funcion(*args, **kwargs)
+
+def programar_render(funcion, *args, **kwargs):
+    """
+    Genera una figura llamando a `funcion`, o bien la deja pendiente como
+    tarea independiente si está activo el modo paralelo.
+
+    Si la figura ya existe y fue generada con los mismos datos y parámetros
+    (según el manifiesto de la caché), no se vuelve a dibujar.
+    """
+    ruta = _ruta_de_tarea(funcion, args, kwargs)
+    clave = None
+    if _cache_render['activa']:
+        clave = _clave_render(funcion, args, kwargs)
+        if _manifiesto_cache().get(ruta) == clave and os.path.exists(ruta):
+            _cache_render['aciertos'] += 1
+            return
+        _cache_render['fallos'] += 1
+
+    if _tareas_render is None:
+        _dibujar(funcion, args, kwargs)
+        _registrar_en_cache(ruta, clave)
+    else:
+        # La tarea lleva la pila de etapas actual, para ubicar su medición en el reporte
+        pila = tuple(nombre for nombre, _ in _instrumentacion['pila'])
+        _tareas_render.append((funcion, args, kwargs, pila))
+        _cache_render['pendientes'][ruta] = clave
+
+def iniciar_modo_paralelo():
+    """
+    Activa el modo paralelo: a partir de aquí las figuras se acumulan como
+    tareas hasta llamar a ejecutar_renders_en_paralelo().
+    """
+    global _tareas_render
+    _tareas_render = []
+
+def _inicializar_trabajador(dpi, compresion_png, rasterizar, layout_rapido, instrumentar=False):
+    """
+    Prepara un proceso del pool: backend sin pantalla, renderizado inmediato
+    y las mismas opciones de salida e instrumentación que el proceso principal.
+    """
+    import matplotlib.pyplot as plt
+    global _tareas_render
+    _tareas_render = None
+    configurar_salida(dpi=dpi, compresion_png=compresion_png, rasterizar=rasterizar)
+    _layout_rapido['activo'] = layout_rapido
+    if instrumentar:
+        activar_instrumentacion()
+    plt.switch_backend('Agg')
+
+def _ejecutar_tarea_render(funcion, args, kwargs, pila=()):
+    """
+    Genera una figura en un proceso del pool y devuelve los registros de
+    instrumentación de la tarea, con la pila de etapas del proceso principal.
+    """
+    import matplotlib.pyplot as plt
+    _instrumentacion.update(registros=[], pila=[[nombre, 0.0] for nombre in pila])
+    _dibujar(funcion, args, kwargs)
+    plt.close('all')
+    for registro in _instrumentacion['registros']:
+        registro['pid'] = os.getpid()
+    return _instrumentacion['registros']
+
+def ejecutar_renders_en_paralelo(jobs):
+    """
+    Ejecuta las tareas de renderizado pendientes en un pool de `jobs` procesos.
+    Los errores se reportan por tarea sin detener el resto.
+
+    Devuelve las figuras que fallaron: ruta -> mensaje de error.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    global _tareas_render
+
+    tareas, _tareas_render = _tareas_render or [], None
+    print(f"Generando {len(tareas)} figuras con {jobs} procesos...")
+
+    errores = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_inicializar_trabajador,
+                             initargs=(DPI_FIGURAS, COMPRESION_PNG, RASTERIZAR_DENSOS,
+                                       _layout_rapido['activo'], _instrumentacion['activo'])) as pool:
+        futuros = {pool.submit(_ejecutar_tarea_render, *tarea): _ruta_de_tarea(*tarea[:3])
+                   for tarea in tareas}
+        for futuro in as_completed(futuros):
+            ruta = futuros[futuro]
+            try:
+                _instrumentacion['registros'].extend(futuro.result())
+                _registrar_en_cache(ruta, _cache_render['pendientes'].pop(ruta, None))
+            except Exception as e:
+                errores[ruta] = f'{type(e).__name__}: {e}'
+                print(f"  Error al generar {ruta}: {e}")
+
+    print(f"Figuras generadas: {len(tareas) - len(errores)}, con error: {len(errores)}")
+    return errores
+
+# Modo de solo datos: las tablas de resultados se escriben como archivos de datos
+# (CSV, JSON o Parquet) en lugar de dibujarse, sin importar matplotlib ni seaborn
+_modo_datos = {'activo': False, 'formato': 'csv'}
+FORMATOS_DATOS = ('csv', 'json', 'parquet')
+
+def activar_modo_datos(formato='csv'):
+    """
+    Activa el modo de solo datos: regímenes, estadísticas, intervalos de clase,
+    cajas y frecuencias se exportan en `formato` y no se genera ninguna figura.
+    """
+    from importlib.util import find_spec
+    if formato == 'parquet' and find_spec('pyarrow') is None and find_spec('fastparquet') is None:
+        raise ImportError("El formato parquet requiere pyarrow o fastparquet")
+    _modo_datos.update(activo=True, formato=formato)
+
+def exportar_tabla(tabla, prefijo, nombre):
+    """
+    Escribe una tabla de resultados (DataFrame, o diccionario de una fila) en
+    <prefijo>_<nombre>.<formato> y devuelve la ruta.
+    """
+    if isinstance(tabla, dict):
+        tabla = pd.DataFrame([tabla])
+    formato = _modo_datos['formato']
+    ruta = f'{prefijo}_{nombre}.{formato}'
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    with etapa('guardado', archivo=os.path.basename(ruta), filas=len(tabla)) as registro:
+        if formato == 'csv':
+            tabla.to_csv(ruta, index=False)
+        elif formato == 'json':
+            tabla.to_json(ruta, orient='records', force_ascii=False, indent=2, date_format='iso')
+        else:
+            tabla.to_parquet(ruta, index=False)
+        registro['bytes'] = os.path.getsize(ruta)
+    return ruta
+
+# Plantillas de figura reutilizables para crear_grafico
+
+# Máximo de valores anotados y de etiquetas del eje x (en categorías que no son
+# meses ni trimestres) por gráfico: en series más largas se anota uno de cada k
+# puntos, de modo que el número de textos no crece con la longitud de la serie
+MAX_ANOTACIONES = 40
+MAX_ETIQUETAS_EJE_X = 20
+
+# Layout rápido: márgenes fijos en lugar de tight_layout y bbox_inches='tight',
+# que recalculan el tamaño de todos los textos en cada gráfico
+_layout_rapido = {'activo': False}
+MARGENES_RAPIDOS = {'left': 0.07, 'right': 0.98, 'bottom': 0.1, 'top': 0.9}
+
+def activar_layout_rapido():
+    """
+    Guarda los gráficos de crear_grafico con márgenes fijos, sin recortar la
+    figura a su contenido (más rápido; la imagen conserva el tamaño de 14x8).
+    """
+    _layout_rapido['activo'] = True
+
+def _desaturar(color, proporcion=0.75):
+    # Misma saturación que aplica seaborn.barplot a un color fijo
+    import colorsys
+    from matplotlib.colors import to_rgb
+    h, l, s = colorsys.rgb_to_hls(*to_rgb(color))
+    return colorsys.hls_to_rgb(h, l, s * proporcion)
+
+class PlantillaGrafico:
+    """
+    Figura de crear_grafico que se reutiliza entre gráficos del mismo tipo
+    ('barras' o 'lineas') y número de puntos. En cada gráfico solo se
+    actualizan las alturas de las barras o los datos de la línea, las
+    anotaciones y los textos, con la API orientada a objetos de matplotlib
+    (sin el estado global de pyplot).
+    
+    Las anotaciones se crean una sola vez, para uno de cada `paso` puntos
+    (ver MAX_ANOTACIONES y MAX_ETIQUETAS_EJE_X).
+    """
+    
+    def __init__(self, tipo, n):
+        from matplotlib.figure import Figure
+        
+        self.tipo = tipo
+        self.paso = -(-n // MAX_ANOTACIONES)
+        self.paso_etiquetas = -(-n // MAX_ETIQUETAS_EJE_X)
+        self.figura = Figure(figsize=(14, 8))
+        self.ax = self.figura.add_subplot()
+        self.margenes_iniciales = {lado: getattr(self.figura.subplotpars, lado)
+                                   for lado in ('left', 'right', 'bottom', 'top')}
+        if tipo == 'barras':
+            # Barras centradas en 0..n-1, como las de seaborn.barplot
+            self.barras = self.ax.bar(np.arange(n) - 0.4, np.zeros(n), width=0.8, align='edge')
+            self.ax.xaxis.grid(False)
+            self.ax.set_xlim(-0.5, n - 0.5)
+            self.anotaciones = [self.ax.annotate('', (i, 0), xytext=(0, 5), textcoords='offset points',
+                                                 ha='center', va='bottom') for i in range(0, n, self.paso)]
+        else:
+            self.linea, = self.ax.plot(np.arange(n), np.zeros(n), marker='o', linewidth=2.5)
+            self.anotaciones = [self.ax.annotate('', (i, 0), xytext=(0, 10), textcoords='offset points',
+                                                 ha='center') for i in range(0, n, self.paso)]
+        self.titulo = self.ax.set_title('', fontsize=18, pad=20)
+        self.ax.set_xlabel('', fontsize=14)
+        self.ax.set_ylabel('', fontsize=14)
+    
+    def actualizar(self, x, y, x_col, titulo, xlabel, ylabel, color):
+        """
+        Cambia los datos y textos de la figura para un nuevo gráfico.
+        """
+        from matplotlib.ticker import AutoLocator, MaxNLocator
+        
+        ax = self.ax
+        self.años_rotados = self.tipo == 'lineas' and x_col == 'año'
+        if self.tipo == 'barras':
+            color = _desaturar(color)
+            for barra, altura in zip(self.barras, y):
+                barra.set_height(altura)
+                barra.set_facecolor(color)
+            posiciones = np.arange(len(y))
             
-        # Añadir valores sobre las barras
-        for p in ax.patches:
-            ax.annotate(f'{p.get_height():.2f}', 
-                       (p.get_x() + p.get_width() / 2., p.get_height()), 
-                       ha = 'center', va = 'bottom', 
-                       xytext = (0, 5), 
-                       textcoords = 'offset points')
-    
-    elif tipo == 'lineas':
-        plt.plot(df[x_col], df[y_col], marker='o', linewidth=2.5, color=color)
-        
-        # Para series anuales, limitar el número de años mostrados
-        if x_col == 'año':
-            plt.gca().xaxis.set_major_locator(MaxNLocator(integer=True, nbins=10))
-            plt.xticks(rotation=45)
-        
-        # Añadir puntos y valores
-        for i, txt in enumerate(df[y_col]):
-            plt.annotate(f'{txt:.2f}', 
-                        (df[x_col].iloc[i], df[y_col].iloc[i]), 
-                        xytext=(0, 10),
-                        textcoords='offset points',
-                        ha='center')
-    
-    # Configuración adicional del gráfico
-    plt.title(titulo, fontsize=18, pad=20)
-    plt.xlabel(xlabel, fontsize=14)
-    plt.ylabel(ylabel, fontsize=14)
-    plt.tight_layout()
+            # Nombres de meses o trimestres en español en el eje x; en otras
+            # categorías, como máximo MAX_ETIQUETAS_EJE_X etiquetas
+            if x_col in ('mes', 'trimestre'):
+                etiquetas = meses if x_col == 'mes' else trimestres
+                ax.set_xticks(range(len(etiquetas)), etiquetas)
+            else:
+                paso = self.paso_etiquetas
+                ax.set_xticks(posiciones[::paso], [str(v) for v in x[::paso]])
+        else:
+            self.linea.set_data(x, y)
+            self.linea.set_color(color)
+            posiciones = x
+            
+            # Para series anuales, limitar el número de años mostrados
+            if self.años_rotados:
+                ax.xaxis.set_major_locator(MaxNLocator(integer=True, nbins=10))
+                ax.tick_params(axis='x', labelrotation=45)
+            else:
+                ax.xaxis.set_major_locator(AutoLocator())
+                ax.tick_params(axis='x', labelrotation=0)
+        
+        # Valores sobre las barras o los puntos
+        for anotacion, posicion, valor in zip(self.anotaciones, posiciones[::self.paso], y[::self.paso]):
+            anotacion.xy = (posicion, valor)
+            anotacion.set_text(f'{valor:.2f}')
+        
+        ax.relim()
+        ax.autoscale_view()
+        self.titulo.set_text(titulo)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+    
+    def ajustar_margenes(self):
+        """
+        tight_layout desde los márgenes iniciales de la figura, para que el
+        resultado no dependa del gráfico anterior dibujado en la plantilla, o
+        los márgenes fijos del layout rápido.
+        """
+        if _layout_rapido['activo']:
+            # Más espacio abajo para los años rotados
+            abajo = 0.14 if self.años_rotados else MARGENES_RAPIDOS['bottom']
+            self.figura.subplots_adjust(**{**MARGENES_RAPIDOS, 'bottom': abajo})
+            return
+        self.figura.subplots_adjust(**self.margenes_iniciales)
+        self.figura.tight_layout()
+
+# Plantillas creadas en este proceso: (tipo, número de puntos) -> PlantillaGrafico
+_plantillas_graficos = {}
+
+def plantilla_grafico(tipo, n):
+    """
+    Devuelve (creándola la primera vez) la plantilla de figura para
+    gráficos de `tipo` con `n` puntos.
+    """
+    if (tipo, n) not in _plantillas_graficos:
+        _plantillas_graficos[(tipo, n)] = PlantillaGrafico(tipo, n)
+    return _plantillas_graficos[(tipo, n)]
+
+# Función para crear gráficos
+@figura_con_tema
+def crear_grafico(df, x_col, y_col, titulo, xlabel, ylabel, ruta_guardado, tipo='barras', color='#4472C4'):
+    """
+    Dibuja un gráfico de barras o de líneas con los valores anotados, sobre
+    una plantilla de figura reutilizable (ver PlantillaGrafico).
+    """
+    plantilla = plantilla_grafico(tipo, len(df))
+    plantilla.actualizar(df[x_col].to_numpy(), df[y_col].to_numpy(dtype=float), x_col,
+                         titulo, xlabel, ylabel, color)
     
     # Guardar la figura
-    plt.savefig(ruta_guardado, dpi=300, bbox_inches='tight')
-    plt.close()
+    plantilla.ajustar_margenes()
+    guardar_figura(plantilla.figura, ruta_guardado, recortar=not _layout_rapido['activo'])
 
-# Cargar los datos de caudal
-def analizar_caudal():
-    print("Analizando datos de caudal...")
-    try:
-        caudal_df = pd.read_csv('Caudal medio mensual/Caudal medio mensual.csv')
-        caudal_df['Fecha'] = pd.to_datetime(caudal_df['Fecha'])
-        
-        # Análisis mensual
-        caudal_mensual = agregar_por_periodo(caudal_df, 'Fecha', 'Valor', 'mensual')
-        crear_grafico(caudal_mensual, 'mes', 'Valor', 
-                     'Régimen Mensual de Caudal', 
-                     'Mes', 'Caudal (m³/s)', 
-                     'figuras/caudal_mensual.png', 'barras', '#4472C4')
-        
-        # Análisis trimestral
-        caudal_trimestral = agregar_por_periodo(caudal_df, 'Fecha', 'Valor', 'trimestral')
-        crear_grafico(caudal_trimestral, 'trimestre', 'Valor', 
-                     'Régimen Trimestral de Caudal', 
-                     'Trimestre', 'Caudal (m³/s)', 
-                     'figuras/caudal_trimestral.png', 'barras', '#4472C4')
-        
-        # Análisis anual
-        caudal_anual = agregar_por_periodo(caudal_df, 'Fecha', 'Valor', 'anual')
-        crear_grafico(caudal_anual, 'año', 'Valor', 
-                     'Régimen Anual de Caudal', 
-                     'Año', 'Caudal (m³/s)', 
-                     'figuras/caudal_anual.png', 'lineas', '#4472C4')
-        
-        print("Análisis de caudal completado.")
-    except Exception as e:
-        print(f"Error en el análisis de caudal: {e}")
+# Gráficos interactivos: en lugar de dibujarse, los gráficos de barras, líneas y
+# cajas se guardan como especificaciones compactas (un paquete JSON por variable)
+# que script.js dibuja en el navegador. paquetes: prefijo -> {nombre: gráfico}
+_graficos_interactivos = {'activo': False, 'paquetes': {}}
 
-# Cargar los datos de temperatura
-def analizar_temperatura():
-    print("Analizando datos de temperatura...")
-    try:
-        # El archivo tiene un formato diferente, con filas iniciales de metadatos
-        # Vamos a leer el archivo como texto y procesarlo manualmente
-        temp_file = 'Temperatura Mensual/Temperatura Minima Mensual/Temperatura Minima Mensual.csv'
-        
-        # Leer y parsear manualmente el archivo
-        temp_data = []
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            # Encontrar dónde comienzan los datos reales
-            data_start = 0
-            for i, line in enumerate(lines):
-                if line.startswith('Fecha'):
-                    data_start = i + 2  # Saltar la fila de encabezado y la siguiente línea en blanco
-                    break
-            
-            # Extraer datos
-            for i in range(data_start, len(lines)):
-                line = lines[i].strip()
-                if line and ',' in line:
-                    parts = line.split(',')
-                    if len(parts) >= 3 and parts[0] and parts[2]:
-                        fecha = parts[0].strip()
-                        # El valor está en la 3ra columna (índice 2)
-                        valor_str = parts[2].strip()
-                        if valor_str:
-                            try:
-                                valor = float(valor_str)
-                                temp_data.append({'Fecha': fecha, 'Valor': valor})
-                            except ValueError:
-                                pass  # Ignorar valores no convertibles
-        
-        # Convertir a DataFrame
-        if not temp_data:
-            raise ValueError("No se pudieron extraer datos de temperatura del archivo")
-        
-        temp_min_df = pd.DataFrame(temp_data)
-        temp_min_df['Fecha'] = pd.to_datetime(temp_min_df['Fecha'])
-        
-        # Análisis mensual
-        temp_mensual = agregar_por_periodo(temp_min_df, 'Fecha', 'Valor', 'mensual')
-        crear_grafico(temp_mensual, 'mes', 'Valor', 
-                     'Régimen Mensual de Temperatura Mínima', 
-                     'Mes', 'Temperatura (°C)', 
-                     'figuras/temperatura_mensual.png', 'barras', '#ED7D31')
-        
-        # Análisis trimestral
-        temp_trimestral = agregar_por_periodo(temp_min_df, 'Fecha', 'Valor', 'trimestral')
-        crear_grafico(temp_trimestral, 'trimestre', 'Valor', 
-                     'Régimen Trimestral de Temperatura Mínima', 
-                     'Trimestre', 'Temperatura (°C)', 
-                     'figuras/temperatura_trimestral.png', 'barras', '#ED7D31')
-        
-        # Análisis anual
-        temp_anual = agregar_por_periodo(temp_min_df, 'Fecha', 'Valor', 'anual')
-        crear_grafico(temp_anual, 'año', 'Valor', 
-                     'Régimen Anual de Temperatura Mínima', 
-                     'Año', 'Temperatura (°C)', 
-                     'figuras/temperatura_anual.png', 'lineas', '#ED7D31')
-        
-        print("Análisis de temperatura completado.")
-    except Exception as e:
-        print(f"Error en el análisis de temperatura: {e}")
+def activar_graficos_interactivos():
+    """
+    Los regímenes, diagramas de cajas y gráficos de frecuencia se exportan
+    como paquetes de datos para script.js en lugar de dibujarse.
+    """
+    _graficos_interactivos['activo'] = True
+
+def _compactar(valores, decimales=4):
+    # Lista de números redondeados (None para los faltantes) para el JSON
+    return [None if np.isnan(v) else round(float(v), decimales) for v in np.asarray(valores, dtype=float)]
+
+def grafico_interactivo(df, x_col, y_col, titulo, xlabel, ylabel, tipo='barras', color='#4472C4'):
+    """
+    Especificación de un gráfico de crear_grafico para dibujarlo en el
+    navegador: textos, color, etiquetas del eje x y valores.
+    """
+    etiquetas = {'mes': meses, 'trimestre': trimestres}.get(x_col)
+    x = [etiquetas[int(v) - 1] for v in df[x_col]] if etiquetas else [int(v) for v in df[x_col]]
+    return {'tipo': tipo, 'titulo': titulo, 'xlabel': xlabel, 'ylabel': ylabel, 'color': color,
+            'x': x, 'y': _compactar(df[y_col])}
+
+def grafico_cajas_interactivo(cajas, titulo, xlabel, ylabel, color='#4472C4'):
+    """
+    Especificación de un diagrama de cajas a partir de tabla_cajas_mensuales.
+    """
+    columnas = ('q1', 'mediana', 'q3', 'bigote_inferior', 'bigote_superior', 'media')
+    return {'tipo': 'cajas', 'titulo': titulo, 'xlabel': xlabel, 'ylabel': ylabel, 'color': color,
+            'x': list(cajas['mes']), **{columna: _compactar(cajas[columna]) for columna in columnas}}
+
+def registrar_grafico_interactivo(prefijo, nombre, grafico):
+    _graficos_interactivos['paquetes'].setdefault(prefijo, {})[nombre] = grafico
+
+def programar_grafico(df, x_col, y_col, titulo, xlabel, ylabel, prefijo, nombre, tipo='barras', color='#4472C4'):
+    """
+    Programa el gráfico <prefijo>_<nombre> con crear_grafico o, con los
+    gráficos interactivos activos, lo agrega al paquete de su variable.
+    """
+    if _graficos_interactivos['activo']:
+        registrar_grafico_interactivo(prefijo, nombre, grafico_interactivo(
+            df, x_col, y_col, titulo, xlabel, ylabel, tipo, color))
+    else:
+        programar_render(crear_grafico, df, x_col, y_col, titulo, xlabel, ylabel,
+                         ruta_figura(prefijo, nombre), tipo, color)
+
+def guardar_graficos_interactivos():
+    """
+    Escribe un paquete <prefijo>_graficos.json por variable y, si se va a
+    generar el informe HTML, registra un lienzo por gráfico en lugar de su
+    imagen. Devuelve las rutas de los paquetes.
+    """
+    rutas = []
+    for prefijo, graficos in _graficos_interactivos['paquetes'].items():
+        ruta = f'{prefijo}_graficos.json'
+        carpeta = os.path.dirname(ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with etapa('guardado', archivo=os.path.basename(ruta)) as registro:
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump(graficos, f, ensure_ascii=False, separators=(',', ':'))
+            registro['bytes'] = os.path.getsize(ruta)
+        rutas.append(ruta)
+        if _informe['activo']:
+            _informe['paquetes'][ruta] = graficos
+            for nombre, grafico in graficos.items():
+                _informe['graficos'][f'{prefijo}_{nombre}'] = (ruta, nombre, grafico['titulo'])
+    print(f"Paquetes de gráficos interactivos: {len(rutas)}")
+    return rutas
+
+# Grafo de tareas: cada nodo es un cálculo intermedio (datos, regímenes,
+# estadísticas...) o un artefacto (una figura, tabla o archivo de datos) y
+# declara los nodos de los que depende. Como cada nodo se declara después
+# de sus entradas, el orden de declaración es un orden de ejecución válido.
+_grafo = {'nodos': {}}
+
+def agregar_nodo(nombre, funcion, entradas=(), salidas=()):
+    """
+    Declara un nodo del grafo de tareas y devuelve su nombre.
+    
+    `funcion` recibe los resultados de los nodos de `entradas` (ya
+    declarados), en ese orden. `salidas` son los archivos que escribe: al
+    reanudar (ver ejecutar_grafo), un nodo que terminó bien se da por
+    completo si existen todas sus salidas.
+    """
+    faltantes = [entrada for entrada in entradas if entrada not in _grafo['nodos']]
+    if faltantes:
+        raise KeyError(f"El nodo {nombre} depende de nodos no declarados: {', '.join(faltantes)}")
+    _grafo['nodos'][nombre] = {'funcion': funcion, 'entradas': tuple(entradas), 'salidas': list(salidas)}
+    return nombre
+
+def salidas_artefacto(prefijo, nombre, interactivo=False, tabla=False):
+    """
+    Archivos que escribe el artefacto <prefijo>_<nombre> en el modo actual: el
+    archivo de datos, la figura, o ninguno si se agrega a un paquete de
+    gráficos interactivos (`interactivo`) o al informe HTML (`tabla`), que
+    se escriben al final de la ejecución.
+    """
+    if _modo_datos['activo']:
+        return [f"{prefijo}_{nombre}.{_modo_datos['formato']}"]
+    if (interactivo and _graficos_interactivos['activo']) or (tabla and _informe['activo']):
+        return []
+    return [ruta_figura(prefijo, nombre)]
+
+def _estado_tareas_anterior():
+    if not os.path.exists(RUTA_ESTADO_TAREAS):
+        return {}
+    with open(RUTA_ESTADO_TAREAS, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def ejecutar_grafo(reanudar=False):
+    """
+    Ejecuta los nodos declarados, en orden, y vacía el grafo.
+    
+    Un error en un nodo se registra con su mensaje y no detiene a los demás;
+    los nodos que dependen de él (directa o indirectamente) se omiten. Con
+    `reanudar` solo se ejecutan los artefactos que en la ejecución anterior
+    (ver guardar_estado_tareas) fallaron, se omitieron o no se declararon, o
+    a los que les falta alguna salida, y los cálculos que necesitan.
+    
+    Devuelve el estado de cada nodo: un diccionario con 'estado' ('ok',
+    'error', 'omitido' o 'reutilizado'), 'entradas', 'salidas' y, si no
+    terminó, 'error'.
+    """
+    nodos, _grafo['nodos'] = _grafo['nodos'], {}
+    anterior = _estado_tareas_anterior() if reanudar else {}
+    
+    # 1. Nodos necesarios: los artefactos (nodos de los que no depende ningún
+    # otro) pendientes y, recursivamente, sus entradas
+    def completo(nombre):
+        salidas = nodos[nombre]['salidas']
+        return (anterior.get(nombre, {}).get('estado') in ('ok', 'reutilizado') and len(salidas) > 0
+                and all(os.path.exists(ruta) for ruta in salidas))
+    usados = {entrada for nodo in nodos.values() for entrada in nodo['entradas']}
+    pendientes = [nombre for nombre in nodos if nombre not in usados and not completo(nombre)]
+    necesarios = set()
+    while pendientes:
+        nombre = pendientes.pop()
+        if nombre not in necesarios:
+            necesarios.add(nombre)
+            pendientes.extend(nodos[nombre]['entradas'])
+    
+    # Usos pendientes de cada resultado, para liberarlo después del último
+    usos = {nombre: 0 for nombre in necesarios}
+    for nombre in necesarios:
+        for entrada in nodos[nombre]['entradas']:
+            usos[entrada] += 1
+    
+    # 2. Ejecución en orden de declaración
+    resultados, estados = {}, {}
+    ejecutados = 0
+    for nombre, nodo in nodos.items():
+        estado = estados[nombre] = {'entradas': list(nodo['entradas']), 'salidas': nodo['salidas']}
+        if nombre not in necesarios:
+            estado['estado'] = 'reutilizado'
+            continue
+        ejecutados += 1
+        print(f"  [{ejecutados}/{len(necesarios)}] {nombre}")
+        
+        fallidas = [entrada for entrada in nodo['entradas'] if estados[entrada]['estado'] != 'ok']
+        if fallidas:
+            estado.update(estado='omitido', error=f"Entradas sin resultado: {', '.join(fallidas)}")
+        else:
+            try:
+                with etapa(nombre):
+                    resultados[nombre] = nodo['funcion'](*(resultados[entrada] for entrada in nodo['entradas']))
+                estado['estado'] = 'ok'
+            except Exception as e:
+                estado.update(estado='error', error=f'{type(e).__name__}: {e}')
+                print(f"  Error en {nombre}: {e}")
+        
+        # Liberar los resultados que ya no se van a usar
+        for entrada in nodo['entradas']:
+            usos[entrada] -= 1
+            if usos[entrada] == 0:
+                resultados.pop(entrada, None)
+        if usos[nombre] == 0:
+            resultados.pop(nombre, None)
+    
+    conteo = {}
+    for estado in estados.values():
+        conteo[estado['estado']] = conteo.get(estado['estado'], 0) + 1
+    print('Tareas: ' + ', '.join(f'{n} {clave}' for clave, n in sorted(conteo.items())))
+    return estados
+
+def marcar_fallos_render(estados, fallos):
+    """
+    Marca con error los nodos cuyas figuras fallaron en el pool de procesos
+    (`fallos`: ruta -> mensaje, ver ejecutar_renders_en_paralelo).
+    """
+    for estado in estados.values():
+        errores = [fallos[ruta] for ruta in estado['salidas'] if ruta in fallos]
+        if errores:
+            estado.update(estado='error', error=errores[0])
+
+def guardar_estado_tareas(estados):
+    """
+    Guarda el estado de cada nodo en RUTA_ESTADO_TAREAS para reanudar la
+    siguiente ejecución. Los nodos que no se declararon en esta ejecución
+    conservan su estado anterior. Devuelve los nombres de los nodos que
+    fallaron o se omitieron.
+    """
+    todos = _estado_tareas_anterior()
+    todos.update(estados)
+    os.makedirs(os.path.dirname(RUTA_ESTADO_TAREAS) or '.', exist_ok=True)
+    _guardar_atomico(RUTA_ESTADO_TAREAS,
+                     lambda f: f.write(json.dumps(todos, ensure_ascii=False, indent=2).encode('utf-8')))
+    return [nombre for nombre, estado in estados.items() if estado['estado'] in ('error', 'omitido')]
+
+def nodo_datos(variable):
+    """
+    Declara (una sola vez) el nodo que carga los datos de una variable y
+    devuelve su nombre.
+    """
+    nombre = f'datos:{variable}'
+    if nombre not in _grafo['nodos']:
+        agregar_nodo(nombre, functools.partial(obtener_datos, variable))
+    return nombre
+
+def nodo_sketches(variable):
+    """
+    Declara (una sola vez) el nodo que calcula los sketches mensuales de una
+    variable leyendo su archivo por bloques (modo de cuantiles aproximados)
+    y devuelve su nombre.
+    """
+    nombre = f'sketches:{variable}'
+    if nombre not in _grafo['nodos']:
+        agregar_nodo(nombre, functools.partial(cargar_sketches_mensuales, variable))
+    return nombre
+
+# Gráficos de regímenes: (columna, periodo, etiqueta del eje x, tipo)
+PERIODOS_REGIMEN = [
+    ('mes', 'Mensual', 'Mes', 'barras'),
+    ('trimestre', 'Trimestral', 'Trimestre', 'barras'),
+    ('año', 'Anual', 'Año', 'lineas'),
+]
+
+def programar_regimen(spec, indice, prefijo, sufijo_titulo, regimenes):
+    """
+    Programa el gráfico del régimen PERIODOS_REGIMEN[indice] de una variable,
+    con la paleta y los textos de su entrada en VARIABLES, o exporta su
+    tabla en modo de solo datos. `regimenes`: tablas mensual, trimestral y anual.
+    """
+    periodo_col, periodo, xlabel, tipo = PERIODOS_REGIMEN[indice]
+    if _modo_datos['activo']:
+        exportar_tabla(regimenes[indice], prefijo, periodo.lower())
+        return
+    programar_grafico(regimenes[indice], periodo_col, 'Valor', 
+                      f"Régimen {periodo} de {spec['regimen']}{sufijo_titulo}", 
+                      xlabel, spec['ylabel'], 
+                      prefijo, periodo.lower(), tipo, spec['color'])
+
+def nodos_figuras_regimenes(spec, regimenes, prefijo, sufijo_titulo=''):
+    """
+    Declara un nodo por gráfico de régimen (mensual, trimestral y anual) de
+    una variable. `regimenes` es el nodo que calcula las tres tablas.
+    """
+    for indice, (_, periodo, _, _) in enumerate(PERIODOS_REGIMEN):
+        agregar_nodo(f'{prefijo}_{periodo.lower()}',
+                     functools.partial(programar_regimen, spec, indice, prefijo, sufijo_titulo),
+                     [regimenes], salidas_artefacto(prefijo, periodo.lower(), interactivo=True))
+
+def nodos_regimenes(variable):
+    """
+    Declara los nodos de los regímenes de una variable registrada en VARIABLES.
+    """
+    spec = VARIABLES[variable]
+    regimenes = agregar_nodo(f'regimenes:{variable}',
+                             functools.partial(calcular_regimenes, variable,
+                                               promedio_de_promedios=spec['promedio_de_promedios']),
+                             [nodo_datos(variable)])
+    nodos_figuras_regimenes(spec, regimenes, os.path.join(DIR_FIGURAS, spec['prefijo']))
+
+def analizar_regimenes(variable):
+    """
+    Calcula y grafica los regímenes mensual, trimestral y anual de una
+    variable registrada en VARIABLES. Devuelve el estado de cada nodo (ver
+    ejecutar_grafo).
+    """
+    print(f"Analizando datos de {VARIABLES[variable]['nombre']}...")
+    nodos_regimenes(variable)
+    return ejecutar_grafo()
+
+def analizar_caudal():
+    analizar_regimenes('caudal')
+
+def analizar_temperatura():
+    analizar_regimenes('temperatura')
 
-# Cargar los datos de humedad
 def analizar_humedad():
-    print("Analizando datos de humedad...")
-    try:
-        humedad_df = pd.read_csv('Húmeda relativa calculada máxima diaria/Húmeda relativa calculada máxima diaria.csv')
-        humedad_df['Fecha'] = pd.to_datetime(humedad_df['Fecha'])
-        
-        # Análisis mensual
-        humedad_mensual = agregar_por_periodo(humedad_df, 'Fecha', 'Valor', 'mensual')
-        crear_grafico(humedad_mensual, 'mes', 'Valor', 
-                     'Régimen Mensual de Humedad Relativa Máxima', 
-                     'Mes', 'Humedad Relativa (%)', 
-                     'figuras/humedad_mensual.png', 'barras', '#70AD47')
-        
-        # Análisis trimestral
-        humedad_trimestral = agregar_por_periodo(humedad_df, 'Fecha', 'Valor', 'trimestral')
-        crear_grafico(humedad_trimestral, 'trimestre', 'Valor', 
-                     'Régimen Trimestral de Humedad Relativa Máxima', 
-                     'Trimestre', 'Humedad Relativa (%)', 
-                     'figuras/humedad_trimestral.png', 'barras', '#70AD47')
-        
-        # Análisis anual
-        humedad_anual = agregar_por_periodo(humedad_df, 'Fecha', 'Valor', 'anual')
-        crear_grafico(humedad_anual, 'año', 'Valor', 
-                     'Régimen Anual de Humedad Relativa Máxima', 
-                     'Año', 'Humedad Relativa (%)', 
-                     'figuras/humedad_anual.png', 'lineas', '#70AD47')
-        
-        print("Análisis de humedad completado.")
-    except Exception as e:
-        print(f"Error en el análisis de humedad: {e}")
+    analizar_regimenes('humedad')
 
-# Cargar los datos de evaporación
 def analizar_evaporacion():
-    print("Analizando datos de evaporación...")
-    try:
-        evaporacion_df = pd.read_csv('Evaporación total diaria SUM [EVTE_CON]/Evaporación total diaria SUM.csv')
-        evaporacion_df['Fecha'] = pd.to_datetime(evaporacion_df['Fecha'])
-        
-        # Análisis mensual
-        # Para la evaporación, primero obtenemos el mes de la fecha
-        evaporacion_df['mes'] = evaporacion_df['Fecha'].dt.month
-        evaporacion_mensual = evaporacion_df.groupby('mes')['Valor'].mean().reset_index()
-        
-        crear_grafico(evaporacion_mensual, 'mes', 'Valor', 
-                     'Régimen Mensual de Evaporación', 
-                     'Mes', 'Evaporación (mm)', 
-                     'figuras/evaporacion_mensual.png', 'barras', '#5B9BD5')
-        
-        # Análisis trimestral
-        evaporacion_df['trimestre'] = ((evaporacion_df['mes'] - 1) // 3) + 1
-        evaporacion_trimestral = evaporacion_df.groupby('trimestre')['Valor'].mean().reset_index()
-        
-        crear_grafico(evaporacion_trimestral, 'trimestre', 'Valor', 
-                     'Régimen Trimestral de Evaporación', 
-                     'Trimestre', 'Evaporación (mm)', 
-                     'figuras/evaporacion_trimestral.png', 'barras', '#5B9BD5')
-        
-        # Análisis anual
-        evaporacion_df['año'] = evaporacion_df['Fecha'].dt.year
-        evaporacion_anual = evaporacion_df.groupby('año')['Valor'].mean().reset_index()
-        
-        crear_grafico(evaporacion_anual, 'año', 'Valor', 
-                     'Régimen Anual de Evaporación', 
-                     'Año', 'Evaporación (mm)', 
-                     'figuras/evaporacion_anual.png', 'lineas', '#5B9BD5')
-        
-        print("Análisis de evaporación completado.")
-    except Exception as e:
-        print(f"Error en el análisis de evaporación: {e}")
+    analizar_regimenes('evaporacion')
 
-# Cargar los datos de precipitación
 def analizar_precipitacion():
-    print("Analizando datos de precipitación...")
-    try:
-        precipitacion_df = pd.read_csv('Datos/Precipitacion Mensual.csv')
-        # Convertir la columna de fecha a formato datetime
-        precipitacion_df['system:time_start'] = pd.to_datetime(precipitacion_df['system:time_start'])
-        
-        # Renombrar columnas para mantener consistencia con otras funciones
-        precipitacion_df = precipitacion_df.rename(columns={'system:time_start': 'Fecha', 'precipitation': 'Valor'})
-        
-        # Análisis mensual
-        precipitacion_mensual = agregar_por_periodo(precipitacion_df, 'Fecha', 'Valor', 'mensual')
-        crear_grafico(precipitacion_mensual, 'mes', 'Valor', 
-                     'Régimen Mensual de Precipitación', 
-                     'Mes', 'Precipitación (mm)', 
-                     'figuras/precipitacion_mensual.png', 'barras', '#9B59B6')
-        
-        # Análisis trimestral
-        precipitacion_trimestral = agregar_por_periodo(precipitacion_df, 'Fecha', 'Valor', 'trimestral')
-        crear_grafico(precipitacion_trimestral, 'trimestre', 'Valor', 
-                     'Régimen Trimestral de Precipitación', 
-                     'Trimestre', 'Precipitación (mm)', 
-                     'figuras/precipitacion_trimestral.png', 'barras', '#9B59B6')
-        
-        # Análisis anual
-        precipitacion_anual = agregar_por_periodo(precipitacion_df, 'Fecha', 'Valor', 'anual')
-        crear_grafico(precipitacion_anual, 'año', 'Valor', 
-                     'Régimen Anual de Precipitación', 
-                     'Año', 'Precipitación (mm)', 
-                     'figuras/precipitacion_anual.png', 'lineas', '#9B59B6')
-        
-        print("Análisis de precipitación completado.")
-    except Exception as e:
-        print(f"Error en el análisis de precipitación: {e}")
+    analizar_regimenes('precipitacion')
+
+@figura_con_tema
+def crear_figura_comparativa(paneles, ruta_guardado):
+    """
+    Dibuja los regímenes mensuales de varias variables en una cuadrícula de 3x2.
+    
+    paneles: lista de tuplas (df mensual, color, título, etiqueta del eje y)
+    """
+    import matplotlib.pyplot as plt
+    
+    fig, axes = plt.subplots(3, 2, figsize=(16, 18))
+    
+    for ax, (df_mensual, color, titulo, ylabel) in zip(axes.flat, paneles):
+        _seaborn().barplot(x='mes', y='Valor', data=df_mensual, color=color, ax=ax)
+        ax.set_title(titulo)
+        ax.set_xlabel('Mes')
+        ax.set_ylabel(ylabel)
+        ax.set_xticks(range(len(meses)))
+        ax.set_xticklabels(meses)
+    
+    # Desactivar los subplots que quedan vacíos
+    for ax in axes.flat[len(paneles):]:
+        ax.axis('off')
+    
+    plt.tight_layout()
+    plt.suptitle('Comparación de Regímenes Mensuales', fontsize=20, y=1.02)
+    
+    # Guardar figura
+    guardar_figura(plt.gcf(), ruta_guardado)
+    plt.close()
 
 # Función para crear un gráfico comparativo de los promedios mensuales
+def regimen_mensual(variable, df=None):
+    """
+    Régimen mensual de una variable registrada, con el mismo criterio de
+    promedio que usan sus gráficos de regímenes. Sin `df` se usan los datos
+    de la variable.
+    """
+    df = obtener_datos(variable) if df is None else df
+    if VARIABLES[variable]['promedio_de_promedios']:
+        return agregar_por_periodo(df, 'Fecha', 'Valor', 'mensual')
+    return df.groupby(df['Fecha'].dt.month.rename('mes'))['Valor'].mean().reset_index()
+
+def programar_grafico_comparativo(variables, nombre, *mensuales):
+    """
+    Programa el gráfico comparativo <DIR_FIGURAS>/comparacion_<nombre> con un
+    panel por variable (`mensuales`: su régimen mensual) o, en modo de solo
+    datos, exporta la tabla comparativa.
+    """
+    prefijo = os.path.join(DIR_FIGURAS, 'comparacion')
+    if _modo_datos['activo']:
+        tabla = pd.concat([mensual.assign(variable=variable)[['variable', 'mes', 'Valor']]
+                           for variable, mensual in zip(variables, mensuales)], ignore_index=True)
+        exportar_tabla(tabla, prefijo, nombre)
+        return
+    paneles = [(mensual, VARIABLES[variable]['color'], f"Régimen Mensual de {VARIABLES[variable]['regimen']}",
+                VARIABLES[variable]['ylabel']) for variable, mensual in zip(variables, mensuales)]
+    programar_render(crear_figura_comparativa, paneles, ruta_figura(prefijo, nombre))
+
+def nodos_grafico_comparativo(variables=None):
+    """
+    Declara los nodos del gráfico comparativo: el régimen mensual de cada
+    variable marcada como comparativa (de `variables`, o de todas si no se
+    indica) y la figura. Sin variables comparativas no se declara nada.
+    
+    Con todas las variables comparativas la figura es comparacion_regimenes,
+    la que enlaza el informe; con solo una parte se escribe aparte, como
+    comparacion_regimenes_<variable>_<variable>..., para no reemplazarla.
+    """
+    comparativas = [variable for variable, spec in VARIABLES.items() if spec['comparativo']]
+    variables = [variable for variable in (variables or VARIABLES) if variable in comparativas]
+    if not variables:
+        return
+    nombre = 'regimenes' if set(variables) == set(comparativas) else '_'.join(['regimenes'] + variables)
+    mensuales = [agregar_nodo(f'regimen_mensual:{variable}', functools.partial(regimen_mensual, variable),
+                              [nodo_datos(variable)])
+                 for variable in variables]
+    prefijo = os.path.join(DIR_FIGURAS, 'comparacion')
+    agregar_nodo(f'{prefijo}_{nombre}', functools.partial(programar_grafico_comparativo, variables, nombre),
+                 mensuales, salidas_artefacto(prefijo, nombre))
+
 def crear_grafico_comparativo():
     print("Creando gráfico comparativo de variables...")
-    try:
-        # Cargamos los datos de cada variable para obtener sus promedios mensuales
-        caudal_df = pd.read_csv('Caudal medio mensual/Caudal medio mensual.csv')
-        caudal_df['Fecha'] = pd.to_datetime(caudal_df['Fecha'])
-        caudal_mensual = agregar_por_periodo(caudal_df, 'Fecha', 'Valor', 'mensual')
-        
-        # Temperatura - usando la misma lógica de parseo que en la función analizar_temperatura
-        temp_file = 'Temperatura Mensual/Temperatura Minima Mensual/Temperatura Minima Mensual.csv'
-        temp_data = []
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            data_start = 0
-            for i, line in enumerate(lines):
-                if line.startswith('Fecha'):
-                    data_start = i + 2
-                    break
-            
-            for i in range(data_start, len(lines)):
-                line = lines[i].strip()
-                if line and ',' in line:
-                    parts = line.split(',')
-                    if len(parts) >= 3 and parts[0] and parts[2]:
-                        fecha = parts[0].strip()
-                        valor_str = parts[2].strip()
-                        if valor_str:
-                            try:
-                                valor = float(valor_str)
-                                temp_data.append({'Fecha': fecha, 'Valor': valor})
-                            except ValueError:
-                                pass
-        
-        if not temp_data:
-            raise ValueError("No se pudieron extraer datos de temperatura del archivo")
-        
-        temp_min_df = pd.DataFrame(temp_data)
-        temp_min_df['Fecha'] = pd.to_datetime(temp_min_df['Fecha'])
-        temp_mensual = agregar_por_periodo(temp_min_df, 'Fecha', 'Valor', 'mensual')
-        
-        # Humedad
-        humedad_df = pd.read_csv('Húmeda relativa calculada máxima diaria/Húmeda relativa calculada máxima diaria.csv')
-        humedad_df['Fecha'] = pd.to_datetime(humedad_df['Fecha'])
-        humedad_mensual = agregar_por_periodo(humedad_df, 'Fecha', 'Valor', 'mensual')
-        
-        # Evaporación
-        evaporacion_df = pd.read_csv('Evaporación total diaria SUM [EVTE_CON]/Evaporación total diaria SUM.csv')
-        evaporacion_df['Fecha'] = pd.to_datetime(evaporacion_df['Fecha'])
-        evaporacion_df['mes'] = evaporacion_df['Fecha'].dt.month
-        evaporacion_mensual = evaporacion_df.groupby('mes')['Valor'].mean().reset_index()
-        
-        # Precipitación
-        precipitacion_df = pd.read_csv('Datos/Precipitacion Mensual.csv')
-        precipitacion_df['system:time_start'] = pd.to_datetime(precipitacion_df['system:time_start'])
-        precipitacion_df = precipitacion_df.rename(columns={'system:time_start': 'Fecha', 'precipitation': 'Valor'})
-        precipitacion_mensual = agregar_por_periodo(precipitacion_df, 'Fecha', 'Valor', 'mensual')
-        
-        # Gráfico comparativo - Ahora con 6 subplots (3x2)
-        fig, axes = plt.subplots(3, 2, figsize=(16, 18))
-        
-        # Caudal (arriba a la izquierda)
-        sns.barplot(x='mes', y='Valor', data=caudal_mensual, color='#4472C4', ax=axes[0, 0])
-        axes[0, 0].set_title('Régimen Mensual de Caudal')
-        axes[0, 0].set_xlabel('Mes')
-        axes[0, 0].set_ylabel('Caudal (m³/s)')
-        axes[0, 0].set_xticks(range(len(meses)))
-        axes[0, 0].set_xticklabels(meses)
-        
-        # Temperatura (arriba a la derecha)
-        sns.barplot(x='mes', y='Valor', data=temp_mensual, color='#ED7D31', ax=axes[0, 1])
-        axes[0, 1].set_title('Régimen Mensual de Temperatura Mínima')
-        axes[0, 1].set_xlabel('Mes')
-        axes[0, 1].set_ylabel('Temperatura (°C)')
-        axes[0, 1].set_xticks(range(len(meses)))
-        axes[0, 1].set_xticklabels(meses)
-        
-        # Humedad (en medio a la izquierda)
-        sns.barplot(x='mes', y='Valor', data=humedad_mensual, color='#70AD47', ax=axes[1, 0])
-        axes[1, 0].set_title('Régimen Mensual de Humedad Relativa Máxima')
-        axes[1, 0].set_xlabel('Mes')
-        axes[1, 0].set_ylabel('Humedad Relativa (%)')
-        axes[1, 0].set_xticks(range(len(meses)))
-        axes[1, 0].set_xticklabels(meses)
-        
-        # Evaporación (en medio a la derecha)
-        sns.barplot(x='mes', y='Valor', data=evaporacion_mensual, color='#5B9BD5', ax=axes[1, 1])
-        axes[1, 1].set_title('Régimen Mensual de Evaporación')
-        axes[1, 1].set_xlabel('Mes')
-        axes[1, 1].set_ylabel('Evaporación (mm)')
-        axes[1, 1].set_xticks(range(len(meses)))
-        axes[1, 1].set_xticklabels(meses)
-        
-        # Precipitación (abajo a la izquierda)
-        sns.barplot(x='mes', y='Valor', data=precipitacion_mensual, color='#9B59B6', ax=axes[2, 0])
-        axes[2, 0].set_title('Régimen Mensual de Precipitación')
-        axes[2, 0].set_xlabel('Mes')
-        axes[2, 0].set_ylabel('Precipitación (mm)')
-        axes[2, 0].set_xticks(range(len(meses)))
-        axes[2, 0].set_xticklabels(meses)
-        
-        # Dejar el último subplot vacío o usar para información adicional
-        axes[2, 1].axis('off')  # Desactivar el subplot vacío
-        
-        plt.tight_layout()
-        plt.suptitle('Comparación de Regímenes Mensuales', fontsize=20, y=1.02)
-        
-        # Guardar figura
-        plt.savefig('figuras/comparacion_regimenes.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print("Gráfico comparativo completado.")
-    except Exception as e:
-        print(f"Error en la creación del gráfico comparativo: {e}")
+    nodos_grafico_comparativo()
+    return ejecutar_grafo()
 
 # Nuevas funciones para análisis estadístico y gráficos avanzados
 
-def calcular_estadisticas(df, valor_col):
+def calcular_estadisticas_agrupadas(df, valor_col, por):
     """
-    Calcula estadísticas descriptivas para una serie de datos.
+    Calcula las estadísticas descriptivas de cada grupo en una sola pasada.
+    
+    por: nombre o lista de nombres de columnas de agrupación (por ejemplo
+    'mes', o ['estacion', 'mes']).
+    
+    Devuelve una tabla con una fila por grupo y las columnas n, minimo,
+    maximo, rango, media, mediana, moda, varianza, desviacion_estandar,
+    coef_variacion, num_clases y ancho_clase. La moda es el valor más
+    frecuente del grupo (el menor, en caso de empate).
     """
-    valores = df[valor_col].dropna()
-    n = len(valores)
-    minimo = valores.min()
-    maximo = valores.max()
-    rango = maximo - minimo
-    media = valores.mean()
-    mediana = valores.median()
+    with etapa('estadisticas', filas=len(df)):
+        return _calcular_estadisticas_agrupadas(df, valor_col, por)
+
+def _calcular_estadisticas_agrupadas(df, valor_col, por):
+    por = [por] if isinstance(por, str) else list(por)
+    datos = df.loc[df[valor_col].notna(), por + [valor_col]]
     
-    # Cálculo de la moda
-    try:
-        moda = stats.mode(valores, keepdims=True)[0][0]
-    except:
-        moda = valores.value_counts().idxmax()
+    tabla = datos.groupby(por)[valor_col].agg(
+        n='size', minimo='min', maximo='max', media='mean',
+        mediana='median', varianza='var', desviacion_estandar='std')
+    tabla['rango'] = tabla['maximo'] - tabla['minimo']
     
-    varianza = valores.var()
-    desviacion_estandar = valores.std()
-    coef_variacion = (desviacion_estandar / media) * 100 if media != 0 else 0
+    # Moda: frecuencia de cada (grupo, valor), ordenada para quedarse con el
+    # valor más frecuente y, entre empates, el menor
+    conteos = datos.groupby(por + [valor_col]).size().rename('frecuencia').reset_index()
+    conteos = conteos.sort_values(por + ['frecuencia', valor_col],
+                                  ascending=[True] * len(por) + [False, True])
+    modas = conteos.drop_duplicates(subset=por).set_index(por)[valor_col]
+    tabla['moda'] = modas.reindex(tabla.index)
     
-    # Cálculo de número de clases (Sturges)
-    if n > 0:
-        num_clases = int(1 + 3.322 * np.log10(n))
-        ancho_clase = rango / num_clases if num_clases > 0 else 0
-    else:
-        num_clases = 0
-        ancho_clase = 0
+    media = tabla['media']
+    tabla['coef_variacion'] = np.where(media != 0, tabla['desviacion_estandar'] / media * 100, 0)
+    
+    # Número de clases (Sturges) y ancho de clase
+    tabla['num_clases'] = (1 + 3.322 * np.log10(tabla['n'])).astype('int64')
+    tabla['ancho_clase'] = np.where(tabla['num_clases'] > 0,
+                                    tabla['rango'] / tabla['num_clases'].clip(lower=1), 0)
+    
+    columnas = ['n', 'minimo', 'maximo', 'rango', 'media', 'mediana', 'moda', 'varianza',
+                'desviacion_estandar', 'coef_variacion', 'num_clases', 'ancho_clase']
+    return tabla[columnas]
+
+def _fila_a_estadisticas(fila):
+    estadisticas = fila.to_dict()
+    estadisticas['n'] = int(estadisticas['n'])
+    estadisticas['num_clases'] = int(estadisticas['num_clases'])
+    return estadisticas
+
+def calcular_estadisticas(df, valor_col, por=None):
+    """
+    Calcula estadísticas descriptivas para una serie de datos.
     
+    Sin `por` devuelve un diccionario; con `por` (por ejemplo 'estacion')
+    devuelve una tabla con una fila por grupo, calculada en una sola pasada.
+    """
+    if por is not None:
+        return calcular_estadisticas_agrupadas(df, valor_col, por).reset_index()
+    tabla = calcular_estadisticas_agrupadas(df.assign(_grupo=0), valor_col, '_grupo')
+    if tabla.empty:
+        return {
+            'n': 0, 'minimo': np.nan, 'maximo': np.nan, 'rango': np.nan,
+            'media': np.nan, 'mediana': np.nan, 'moda': np.nan, 'varianza': np.nan,
+            'desviacion_estandar': np.nan, 'coef_variacion': 0,
+            'num_clases': 0, 'ancho_clase': 0
+        }
+    return _fila_a_estadisticas(tabla.iloc[0])
+
+def estadisticas_por_mes(df, fecha_col, valor_col):
+    """
+    Estadísticas descriptivas de cada mes del año, como diccionario indexado
+    por la abreviatura del mes (solo meses con datos).
+    """
+    tabla = calcular_estadisticas_agrupadas(df.assign(mes=df[fecha_col].dt.month), valor_col, 'mes')
+    return {meses[mes - 1]: _fila_a_estadisticas(fila) for mes, fila in tabla.iterrows()}
+
+# Cuantiles aproximados (modo streaming) para series muy largas
+
+# Parámetros del modo de cuantiles aproximados. Con 'activo' en False las
+# estadísticas descriptivas, las mensuales y los diagramas de cajas usan
+# todos los valores.
+_cuantiles_aproximados = {'activo': False, 'k': 200}
+
+def activar_cuantiles_aproximados(k=200):
+    """
+    Calcula las estadísticas descriptivas, las mensuales y los diagramas de
+    cajas a partir de sketches de cuantiles de memoria acotada (ver
+    SketchCuantiles), leyendo los archivos por bloques sin cargar las series
+    completas.
+    """
+    _cuantiles_aproximados['activo'] = True
+    _cuantiles_aproximados['k'] = k
+
+class SketchCuantiles:
+    """
+    Resumen de memoria acotada de una serie de valores, al estilo KLL.
+
+    Los valores se guardan en niveles; un valor del nivel h representa 2**h
+    valores originales. Cuando un nivel supera su capacidad se ordena y se
+    promueve al siguiente uno de cada dos valores (con desplazamiento
+    aleatorio), de modo que el sketch conserva del orden de 3*k valores sin
+    importar el tamaño de la serie. El error de rango de los cuantiles es
+    del orden de 1.7/k.
+
+    El número de datos, mínimo, máximo, suma y suma de cuadrados se llevan de
+    forma exacta, por lo que la media y la varianza no son aproximadas. Dos
+    sketches se pueden fusionar (archivos o estaciones distintas) sin volver
+    a leer los datos.
+    """
+
+    def __init__(self, k=200, semilla=0):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.suma = 0.0
+        self.suma_cuadrados = 0.0
+        self._aleatorio = np.random.default_rng(semilla)
+
+    def _capacidad(self, nivel):
+        profundidad = len(self.niveles) - nivel - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** profundidad)))
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveles):
+            items = self.niveles[nivel]
+            if len(items) > self._capacidad(nivel):
+                if nivel + 1 == len(self.niveles):
+                    self.niveles.append(np.empty(0))
+                items = np.sort(items)
+                # Con un número impar de valores el mayor se queda en el nivel
+                resto = items[len(items) - len(items) % 2:]
+                pares = items[:len(items) - len(resto)]
+                desplazamiento = self._aleatorio.integers(2)
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1],
+                                                          pares[desplazamiento::2]])
+                self.niveles[nivel] = resto
+            nivel += 1
+
+    def agregar(self, valores):
+        """
+        Incorpora un bloque de valores (los NaN se ignoran).
+        """
+        valores = np.asarray(valores, dtype='float64').ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self.suma += valores.sum()
+        self.suma_cuadrados += np.dot(valores, valores)
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    def fusionar(self, otro):
+        """
+        Incorpora otro sketch al actual, como si sus datos se hubieran
+        agregado aquí.
+        """
+        while len(self.niveles) < len(otro.niveles):
+            self.niveles.append(np.empty(0))
+        for nivel, items in enumerate(otro.niveles):
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], items])
+
+        self.n += otro.n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self.suma += otro.suma
+        self.suma_cuadrados += otro.suma_cuadrados
+        self._compactar()
+        return self
+
+    def _items_ponderados(self):
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(items), 2.0 ** nivel)
+                                for nivel, items in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind='stable')
+        return valores[orden], pesos[orden]
+
+    def cuantiles(self, q):
+        """
+        Cuantiles aproximados para las probabilidades `q` (escalar o arreglo).
+        """
+        q = np.asarray(q, dtype='float64')
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        valores, pesos = self._items_ponderados()
+
+        # Probabilidad acumulada en el centro de cada valor, acotada por el
+        # mínimo y el máximo exactos
+        acumulado = (np.cumsum(pesos) - pesos / 2) / pesos.sum()
+        puntos = np.concatenate([[0.0], acumulado, [1.0]])
+        referencias = np.concatenate([[self.minimo], valores, [self.maximo]])
+        return np.interp(q, puntos, referencias)
+
+    def moda(self):
+        """
+        Moda aproximada: el valor retenido con mayor peso (el menor, en caso
+        de empate). Es representativa para datos discretizados, como las
+        lecturas redondeadas de las estaciones.
+        """
+        if self.n == 0:
+            return np.nan
+        valores, pesos = self._items_ponderados()
+        unicos, inverso = np.unique(valores, return_inverse=True)
+        return unicos[np.argmax(np.bincount(inverso, weights=pesos))]
+
+    def media(self):
+        return self.suma / self.n if self.n else np.nan
+
+    def varianza(self):
+        if self.n < 2:
+            return np.nan
+        return max(self.suma_cuadrados - self.suma * self.media(), 0.0) / (self.n - 1)
+
+    def estado(self):
+        """
+        Contenido del sketch como diccionario (para huellas y serialización).
+        """
+        return {'k': self.k, 'niveles': list(self.niveles), 'n': self.n,
+                'minimo': self.minimo, 'maximo': self.maximo,
+                'suma': self.suma, 'suma_cuadrados': self.suma_cuadrados}
+
+def sketches_por_mes(fechas, valores, sketches=None, k=None):
+    """
+    Agrega un bloque de datos a los sketches de cada mes del año (1-12).
+    Si se pasa `sketches`, los actualiza en lugar de crear unos nuevos.
+    """
+    k = _cuantiles_aproximados['k'] if k is None else k
+    sketches = {} if sketches is None else sketches
+    valores = np.asarray(valores, dtype='float64')
+    mes = pd.DatetimeIndex(fechas).month.to_numpy()
+    for m in np.unique(mes):
+        sketches.setdefault(int(m), SketchCuantiles(k)).agregar(valores[mes == m])
+    return sketches
+
+def sketches_mensuales(df, fecha_col, valor_col, k=None):
+    """
+    Sketches de cuantiles por mes del año para los datos de un DataFrame.
+    """
+    return sketches_por_mes(df[fecha_col], df[valor_col].to_numpy(), k=k)
+
+def sketches_mensuales_desde_fuente(fuente, k=None, tamano_bloque=100000, periodo=None):
+    """
+    Sketches de cuantiles por mes del año leyendo la fuente por bloques; la
+    memoria usada no depende del largo del archivo. Si se pasa `periodo` (un
+    diccionario) se guardan en él la fecha inicial y final de la serie.
+    """
+    sketches = {}
+    for fechas, valores in iterar_bloques_serie(fuente, tamano_bloque):
+        sketches_por_mes(fechas, valores, sketches, k)
+        if periodo is not None:
+            periodo['fecha_inicial'] = min(periodo.get('fecha_inicial', fechas.min()), fechas.min())
+            periodo['fecha_final'] = max(periodo.get('fecha_final', fechas.max()), fechas.max())
+    return sketches
+
+def cargar_sketches_mensuales(variable):
+    """
+    Sketches mensuales de una variable registrada, leyendo su archivo por
+    bloques sin cargar la serie completa.
+    """
+    with etapa('carga', variable=variable) as registro:
+        sketches = sketches_mensuales_desde_fuente(fuente_variable(variable))
+        registro['filas'] = sum(sketch.n for sketch in sketches.values())
+    return sketches
+
+def fusionar_sketches_mensuales(*conjuntos):
+    """
+    Fusiona los sketches mensuales de varios archivos o estaciones.
+    """
+    fusionados = {}
+    for sketches in conjuntos:
+        for mes, sketch in sketches.items():
+            if mes not in fusionados:
+                fusionados[mes] = SketchCuantiles(sketch.k)
+            fusionados[mes].fusionar(sketch)
+    return fusionados
+
+def estadisticas_desde_sketch(sketch):
+    """
+    Estadísticas descriptivas a partir de un sketch, con las mismas claves
+    que calcular_estadisticas. Mediana y moda son aproximadas.
+    """
+    if sketch.n == 0:
+        return calcular_estadisticas(pd.DataFrame({'Valor': []}), 'Valor')
+
+    media = sketch.media()
+    desviacion = np.sqrt(sketch.varianza())
+    rango = sketch.maximo - sketch.minimo
+    num_clases = int(1 + 3.322 * np.log10(sketch.n))
     return {
-        'n': n,
-        'minimo': minimo,
-        'maximo': maximo,
-        'rango': rango,
-        'media': media,
-        'mediana': mediana,
-        'moda': moda,
-        'varianza': varianza,
-        'desviacion_estandar': desviacion_estandar,
-        'coef_variacion': coef_variacion,
-        'num_clases': num_clases,
-        'ancho_clase': ancho_clase
+        'n': sketch.n, 'minimo': sketch.minimo, 'maximo': sketch.maximo, 'rango': rango,
+        'media': media, 'mediana': float(sketch.cuantiles(0.5)), 'moda': sketch.moda(),
+        'varianza': sketch.varianza(), 'desviacion_estandar': desviacion,
+        'coef_variacion': desviacion / media * 100 if media != 0 else 0,
+        'num_clases': num_clases, 'ancho_clase': rango / num_clases if num_clases > 0 else 0
     }
 
-def crear_tabla_estadisticas(estadisticas, titulo, ruta_guardado):
+def estadisticas_desde_sketches_mensuales(sketches):
     """
-    Crea una imagen con una tabla de estadísticas descriptivas.
+    Estadísticas descriptivas de toda la serie, fusionando sus sketches mensuales.
     """
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.axis('off')
-    ax.axis('tight')
-    
-    # Preparar datos para la tabla
-    datos = [
+    total = SketchCuantiles(_cuantiles_aproximados['k'])
+    for sketch in sketches.values():
+        total.fusionar(sketch)
+    return estadisticas_desde_sketch(total)
+
+def estadisticas_por_mes_desde_sketches(sketches):
+    """
+    Equivalente a estadisticas_por_mes a partir de sketches mensuales.
+    """
+    return {meses[mes - 1]: estadisticas_desde_sketch(sketches[mes]) for mes in sorted(sketches)}
+
+def resumen_caja_desde_sketch(sketch, etiqueta=None):
+    """
+    Estadísticas de un diagrama de cajas (cuartiles y bigotes a 1.5 veces el
+    rango intercuartílico) en el formato de Axes.bxp.
+    """
+    q1, mediana, q3 = sketch.cuantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    valores, _ = sketch._items_ponderados()
+    candidatos = np.concatenate([[sketch.minimo], valores, [sketch.maximo]])
+    dentro = candidatos[(candidatos >= q1 - 1.5 * iqr) & (candidatos <= q3 + 1.5 * iqr)]
+    return {'med': mediana, 'q1': q1, 'q3': q3,
+            'whislo': dentro.min() if len(dentro) else q1,
+            'whishi': dentro.max() if len(dentro) else q3,
+            'mean': sketch.media(), 'fliers': [], 'label': etiqueta}
+
+def resumen_caja(valores, etiqueta=None):
+    """
+    Estadísticas exactas de un diagrama de cajas, con el mismo criterio y
+    formato que resumen_caja_desde_sketch (los atípicos en 'fliers').
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = (valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)
+    return {'med': mediana, 'q1': q1, 'q3': q3,
+            'whislo': valores[dentro].min() if dentro.any() else q1,
+            'whishi': valores[dentro].max() if dentro.any() else q3,
+            'mean': valores.mean(), 'fliers': valores[~dentro], 'label': etiqueta}
+
+def tabla_cajas_mensuales(df, fecha_col, valor_col, sketches=None):
+    """
+    Tabla con los cuartiles, bigotes, media y número de atípicos de cada mes,
+    es decir, los números que dibuja crear_diagrama_cajas (desde los
+    sketches mensuales si se pasan).
+    """
+    if sketches is not None:
+        cajas = [resumen_caja_desde_sketch(sketches[mes], meses[mes - 1]) for mes in sorted(sketches)]
+    else:
+        por_mes = df.groupby(df[fecha_col].dt.month)[valor_col]
+        cajas = [resumen_caja(grupo.to_numpy(), meses[mes - 1]) for mes, grupo in por_mes]
+    return pd.DataFrame({
+        'mes': [caja['label'] for caja in cajas],
+        'q1': [caja['q1'] for caja in cajas],
+        'mediana': [caja['med'] for caja in cajas],
+        'q3': [caja['q3'] for caja in cajas],
+        'bigote_inferior': [caja['whislo'] for caja in cajas],
+        'bigote_superior': [caja['whishi'] for caja in cajas],
+        'media': [caja['mean'] for caja in cajas],
+        'atipicos': [len(caja['fliers']) for caja in cajas],
+    })
+
+def resumen_mensual(df, fecha_col, valor_col):
+    """
+    Estadísticas por mes y, en modo de cuantiles aproximados, los sketches
+    mensuales con los que se dibuja el diagrama de cajas (None en otro caso).
+    """
+    if not _cuantiles_aproximados['activo']:
+        return estadisticas_por_mes(df, fecha_col, valor_col), None
+    return resumen_desde_sketches(sketches_mensuales(df, fecha_col, valor_col))
+
+def resumen_desde_sketches(sketches):
+    """
+    Equivalente a resumen_mensual a partir de sketches mensuales ya calculados.
+    """
+    return estadisticas_por_mes_desde_sketches(sketches), sketches
+
+def filas_tabla_estadisticas(estadisticas):
+    """
+    Filas (estadística, valor) de la tabla de estadísticas descriptivas, ya
+    formateadas; las comparten la imagen y el informe HTML.
+    """
+    return [
         ['N', f"{estadisticas['n']}"],
         ['Mínimo', f"{estadisticas['minimo']:.3f}"],
         ['Máximo', f"{estadisticas['maximo']:.3f}"],
@@ -500,6 +2158,20 @@ def crear_tabla_estadisticas(estadisticas, titulo, ruta_guardado):
         ['Número de Clases', f"{estadisticas['num_clases']}"],
         ['Ancho de Clase', f"{estadisticas['ancho_clase']:.3f}"]
     ]
+
+@figura_con_tema
+def crear_tabla_estadisticas(estadisticas, titulo, ruta_guardado):
+    """
+    Crea una imagen con una tabla de estadísticas descriptivas.
+    """
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.axis('off')
+    ax.axis('tight')
+    
+    # Preparar datos para la tabla
+    datos = filas_tabla_estadisticas(estadisticas)
     
     tabla = ax.table(
         cellText=datos,
@@ -524,133 +2196,354 @@ def crear_tabla_estadisticas(estadisticas, titulo, ruta_guardado):
     
     plt.title(titulo, fontsize=16, pad=20)
     plt.tight_layout()
-    plt.savefig(ruta_guardado, dpi=300, bbox_inches='tight')
+    guardar_figura(plt.gcf(), ruta_guardado)
     plt.close()
 
-def calcular_intervalos_clase(df, valor_col, num_clases=None):
+def _numero_de_clases_por_grupo(n, minimo, maximo, desviacion, q1, q3, regla, ancho=None):
     """
-    Calcula los intervalos de clase y estadísticas de frecuencia.
+    Versión vectorizada de numero_de_clases: recibe un arreglo por estadística
+    (uno por grupo) y devuelve el número de clases de cada grupo.
     """
-    valores = df[valor_col].dropna()
+    n = np.asarray(n, dtype='int64')
+    rango = np.asarray(maximo, dtype='float64') - np.asarray(minimo, dtype='float64')
     
+    if regla == 'sturges':
+        clases = np.maximum((1 + 3.322 * np.log10(np.maximum(n, 1))).astype('int64'), 1)
+        return np.where(n > 0, clases, 0)
+    if regla == 'scott':
+        anchos = np.where(n > 1, 3.49 * np.nan_to_num(desviacion) * np.maximum(n, 1) ** (-1 / 3), 0.0)
+    elif regla == 'freedman_diaconis':
+        anchos = 2 * (np.asarray(q3) - np.asarray(q1)) * np.maximum(n, 1) ** (-1 / 3)
+    elif regla == 'ancho_fijo':
+        if ancho is None or ancho <= 0:
+            raise ValueError("La regla 'ancho_fijo' requiere un ancho de clase positivo")
+        anchos = np.full(len(n), float(ancho))
+    else:
+        raise ValueError(f"Regla de clases desconocida: {regla}")
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        clases = np.maximum(np.ceil(rango / anchos), 1)
+    clases = np.where((rango == 0) | (anchos == 0), 1, np.nan_to_num(clases, nan=1))
+    return np.where(n > 0, clases, 0).astype('int64')
+
+def numero_de_clases(valores, regla='sturges', ancho=None):
+    """
+    Número de clases para un histograma de `valores` (arreglo sin NaN) según
+    la regla indicada: 'sturges', 'scott', 'freedman_diaconis' o
+    'ancho_fijo' (requiere `ancho`).
+    """
+    n = len(valores)
+    if n == 0:
+        return 0
+    desviacion = np.std(valores, ddof=1) if n > 1 else 0.0
+    q1, q3 = np.percentile(valores, [25, 75]) if regla == 'freedman_diaconis' else (0.0, 0.0)
+    return int(_numero_de_clases_por_grupo([n], [valores.min()], [valores.max()], [desviacion],
+                                           [q1], [q3], regla, ancho)[0])
+
+def calcular_histograma_agrupado(valores, grupos, n_grupos, num_clases=None, regla='sturges', ancho=None):
+    """
+    Tablas de frecuencias de varios grupos a la vez (grupos: código entero
+    de 0 a n_grupos-1 para cada valor), sin recorrer los grupos uno a uno.
+    
+    Las clases de cada grupo se construyen como en calcular_histograma y se
+    concatenan; la clave 'grupo' indica a qué grupo pertenece cada clase.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    grupos = np.asarray(grupos, dtype='int64')
+    validos = ~np.isnan(valores)
+    valores, grupos = valores[validos], grupos[validos]
+    
+    # Estadísticas por grupo necesarias para las reglas de clases
+    serie = pd.Series(valores).groupby(grupos)
+    indice = np.arange(n_grupos)
+    n = serie.size().reindex(indice, fill_value=0).to_numpy()
+    minimo = serie.min().reindex(indice).to_numpy()
+    maximo = serie.max().reindex(indice).to_numpy()
     if num_clases is None:
-        num_clases = int(1 + 3.322 * np.log10(len(valores)))  # Regla de Sturges
-    
-    # Crear los intervalos
-    minimo = valores.min()
-    maximo = valores.max()
-    ancho = (maximo - minimo) / num_clases
-    
-    intervalos = []
-    for i in range(num_clases):
-        limite_inferior = minimo + i * ancho
-        limite_superior = limite_inferior + ancho
-        # Para el último intervalo, asegurarse de incluir el valor máximo
-        if i == num_clases - 1:
-            limite_superior = maximo * 1.0001  # Pequeño margen para incluir el máximo
-        
-        # Etiqueta del intervalo
-        etiqueta = f"[{limite_inferior:.2f}, {limite_superior:.2f})"
-        
-        # Contar valores en este intervalo
-        if i == num_clases - 1:  # Último intervalo
-            mascara = (valores >= limite_inferior) & (valores <= limite_superior)
+        desviacion = serie.std().reindex(indice).to_numpy() if regla == 'scott' else np.zeros(n_grupos)
+        if regla == 'freedman_diaconis':
+            q1 = serie.quantile(0.25).reindex(indice).to_numpy()
+            q3 = serie.quantile(0.75).reindex(indice).to_numpy()
         else:
-            mascara = (valores >= limite_inferior) & (valores < limite_superior)
-        
-        frec_absoluta = mascara.sum()
-        
-        # Marca de clase (punto medio del intervalo)
-        marca_clase = (limite_inferior + limite_superior) / 2
-        
-        intervalos.append({
-            'intervalo': etiqueta,
-            'limite_inferior': limite_inferior,
-            'limite_superior': limite_superior,
-            'marca_clase': marca_clase,
-            'frec_absoluta': frec_absoluta
-        })
+            q1 = q3 = np.zeros(n_grupos)
+        clases = _numero_de_clases_por_grupo(n, minimo, maximo, desviacion, q1, q3, regla, ancho)
+    else:
+        clases = np.where(n > 0, num_clases, 0)
+    constantes = (n > 0) & (maximo == minimo)
+    clases = np.where(constantes, 1, clases)
+    
+    # Ancho de clase de cada grupo
+    fijo = regla == 'ancho_fijo' and ancho is not None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        anchos = np.full(n_grupos, float(ancho)) if fijo else (maximo - minimo) / clases
+    
+    # Clases de todos los grupos concatenadas: grupo y posición dentro del grupo
+    inicio = np.concatenate([[0], np.cumsum(clases)])
+    grupo_clase = np.repeat(indice, clases)
+    posicion = np.arange(inicio[-1]) - inicio[grupo_clase]
+    inferior = minimo[grupo_clase] + anchos[grupo_clase] * posicion
+    superior = minimo[grupo_clase] + anchos[grupo_clase] * (posicion + 1)
+    ultima = inicio[1:][clases > 0] - 1
+    maximo_clase = maximo[grupo_clase[ultima]]
+    superior[ultima] = np.maximum(superior[ultima], maximo_clase) if fijo else maximo_clase
+    superior[inicio[:-1][constantes]] = maximo[constantes]
+    
+    # Clase de cada valor: estimación directa corregida contra los bordes
+    # exactos, equivalente a buscar el último borde inferior <= valor
+    with np.errstate(invalid='ignore', divide='ignore'):
+        estimada = np.floor((valores - minimo[grupos]) / anchos[grupos])
+    posiciones = np.clip(np.nan_to_num(estimada), 0, clases[grupos] - 1).astype('int64')
+    borde = minimo[grupos] + anchos[grupos] * posiciones
+    posiciones = np.where((posiciones > 0) & (borde > valores), posiciones - 1, posiciones)
+    siguiente = minimo[grupos] + anchos[grupos] * (posiciones + 1)
+    posiciones = np.where((posiciones < clases[grupos] - 1) & (siguiente <= valores),
+                          posiciones + 1, posiciones)
+    frec_absoluta = np.bincount(inicio[grupos] + posiciones, minlength=inicio[-1])
+    
+    # Frecuencias relativas y acumuladas dentro de cada grupo
+    n_clase = n[grupo_clase]
+    frec_abs_acum = np.cumsum(frec_absoluta) - np.concatenate([[0], np.cumsum(frec_absoluta)])[inicio[grupo_clase]]
+    return {
+        'grupo': grupo_clase,
+        'limite_inferior': inferior,
+        'limite_superior': superior,
+        'marca_clase': (inferior + superior) / 2,
+        'frec_absoluta': frec_absoluta,
+        'frec_relativa': frec_absoluta / n_clase,
+        'frec_abs_acum': frec_abs_acum,
+        'frec_rel_acum': frec_abs_acum / n_clase,
+    }
+
+def calcular_histograma(valores, num_clases=None, regla='sturges', ancho=None):
+    """
+    Tabla de frecuencias de `valores` calculada en una sola pasada.
+    
+    Las clases son [a, b) excepto la última, que es cerrada [a, b] e incluye
+    exactamente el valor máximo. Con regla='ancho_fijo' todas las clases
+    miden `ancho` a partir del mínimo; con las demás reglas el rango se
+    divide en `num_clases` clases iguales (o las que indique la regla).
+    
+    Devuelve un diccionario de arreglos: limite_inferior, limite_superior,
+    marca_clase, frec_absoluta, frec_relativa, frec_abs_acum y frec_rel_acum.
+    """
+    valores = np.asarray(valores, dtype='float64')
+    histograma = calcular_histograma_agrupado(valores, np.zeros(len(valores), dtype='int64'), 1,
+                                              num_clases, regla, ancho)
+    del histograma['grupo']
+    return histograma
+
+def _etiquetas_intervalos(inferiores, superiores, ultima):
+    # La última clase de cada tabla es cerrada
+    etiquetas = np.array([f"[{a:.2f}, {b:.2f})" for a, b in zip(inferiores, superiores)], dtype=object)
+    etiquetas[ultima] = [etiqueta[:-1] + ']' for etiqueta in etiquetas[ultima]]
+    return etiquetas
+
+def calcular_intervalos_clase(df, valor_col, num_clases=None, regla='sturges', ancho=None, por=None):
+    """
+    Calcula los intervalos de clase y estadísticas de frecuencia.
+    
+    Ver calcular_histograma() para las reglas disponibles. Con `por` (por
+    ejemplo 'estacion') se calcula una tabla por grupo en una sola pasada,
+    con la columna de grupo al inicio.
+    """
+    with etapa('intervalos', filas=len(df)):
+        return _calcular_intervalos_clase(df, valor_col, num_clases, regla, ancho, por)
+
+def _calcular_intervalos_clase(df, valor_col, num_clases=None, regla='sturges', ancho=None, por=None):
+    valores = df[valor_col].to_numpy(dtype='float64')
+    if por is None:
+        grupos, etiquetas_grupo = np.zeros(len(df), dtype='int64'), None
+    else:
+        grupos, etiquetas_grupo = pd.factorize(df[por], sort=True)
+    n_grupos = 1 if por is None else len(etiquetas_grupo)
+    histograma = calcular_histograma_agrupado(valores, grupos, n_grupos, num_clases, regla, ancho)
+    
+    grupo_clase = histograma.pop('grupo')
+    ultima = np.flatnonzero(np.diff(np.append(grupo_clase, -1)) != 0)
+    etiquetas = _etiquetas_intervalos(histograma['limite_inferior'], histograma['limite_superior'], ultima)
+    tabla = pd.DataFrame({'intervalo': etiquetas, **histograma})
+    return _con_grupo(tabla, por, etiquetas_grupo, grupo_clase)
+
+ENCABEZADOS_INTERVALOS = ['Intervalo de Clase', 'Marca de Clase', 'Frec. Absoluta', 
+                          'Frec. Relativa', 'Frec. Abs. Acum.', 'Frec. Rel. Acum.']
+
+def filas_tabla_intervalos(df_intervalos):
+    """
+    Filas formateadas de la tabla de intervalos de clase y frecuencias.
+    """
+    return [
+        [intervalo, f"{marca:.2f}", f"{int(fa)}", f"{fr:.3f}", f"{int(faa)}", f"{fra:.3f}"]
+        for intervalo, marca, fa, fr, faa, fra in zip(
+            df_intervalos['intervalo'], df_intervalos['marca_clase'],
+            df_intervalos['frec_absoluta'], df_intervalos['frec_relativa'],
+            df_intervalos['frec_abs_acum'], df_intervalos['frec_rel_acum'])
+    ]
+
+@figura_con_tema
+def crear_tabla_intervalos(df_intervalos, titulo, ruta_guardado):
+    """
+    Crea una imagen con la tabla de intervalos de clase y frecuencias.
+    """
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(14, 8))
+    ax.axis('off')
+    ax.axis('tight')
+    
+    # Preparar datos para la tabla
+    datos = filas_tabla_intervalos(df_intervalos)
+    
+    tabla = ax.table(
+        cellText=datos,
+        colLabels=ENCABEZADOS_INTERVALOS,
+        loc='center',
+        cellLoc='center'
+    )
+    
+    tabla.auto_set_font_size(False)
+    tabla.set_fontsize(11)
+    tabla.scale(1.2, 1.5)
     
-    # Crear DataFrame con los resultados
-    df_intervalos = pd.DataFrame(intervalos)
+    # Personalizar la tabla
+    for (i, j), cell in tabla.get_celld().items():
+        if i == 0:  # Encabezados
+            cell.set_text_props(weight='bold', color='white')
+            cell.set_facecolor('#4472C4')
+        elif i % 2 == 1:  # Filas impares
+            cell.set_facecolor('#D9E1F2')
+        else:  # Filas pares
+            cell.set_facecolor('#E9EDF4')
     
-    # Calcular frecuencias relativas y acumuladas
-    n_total = len(valores)
-    df_intervalos['frec_relativa'] = df_intervalos['frec_absoluta'] / n_total if n_total > 0 else 0
-    df_intervalos['frec_abs_acum'] = df_intervalos['frec_absoluta'].cumsum()
-    df_intervalos['frec_rel_acum'] = df_intervalos['frec_relativa'].cumsum()
+    plt.title(titulo, fontsize=16, pad=20)
+    plt.tight_layout()
+    guardar_figura(plt.gcf(), ruta_guardado)
+    plt.close()
+
+def filas_tabla_estadisticas_mensuales(stats_boxplot):
+    """
+    Filas formateadas de la tabla de estadísticas por mes: una por
+    estadística, con una columna por mes ('N/A' en meses sin datos).
+    """
+    filas = [
+        ['Media'],
+        ['Mediana'],
+        ['Moda'],
+        ['Rango'],
+        ['Varianza'],
+        ['Desv. Est.'],
+        ['Coef. Var. (%)'],
+        ['Mínimo'],
+        ['Máximo'],
+        ['n']
+    ]
     
-    return df_intervalos
+    # Llenar los valores
+    for mes in meses:
+        if mes in stats_boxplot:
+            s = stats_boxplot[mes]
+            filas[0].append(f"{s['media']:.2f}")
+            filas[1].append(f"{s['mediana']:.2f}")
+            filas[2].append(f"{s['moda']:.2f}")
+            filas[3].append(f"{s['rango']:.2f}")
+            filas[4].append(f"{s['varianza']:.2f}")
+            filas[5].append(f"{s['desviacion_estandar']:.2f}")
+            filas[6].append(f"{s['coef_variacion']:.2f}")
+            filas[7].append(f"{s['minimo']:.2f}")
+            filas[8].append(f"{s['maximo']:.2f}")
+            filas[9].append(f"{s['n']}")
+        else:
+            for i in range(10):
+                filas[i].append("N/A")
+    return filas
 
-def crear_tabla_intervalos(df_intervalos, titulo, ruta_guardado):
+@figura_con_tema
+def crear_tabla_estadisticas_mensuales(stats_boxplot, titulo, ruta_guardado, colores):
     """
-    Crea una imagen con la tabla de intervalos de clase y frecuencias.
+    Crea una imagen con la tabla de estadísticas de cada mes (boxplot).
+    
+    colores: (encabezado, primera columna, filas impares, filas pares)
     """
-    fig, ax = plt.subplots(figsize=(14, 8))
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(18, 10))
     ax.axis('off')
     ax.axis('tight')
     
     # Preparar datos para la tabla
-    datos = []
-    for _, row in df_intervalos.iterrows():
-        datos.append([
-            row['intervalo'],
-            f"{row['marca_clase']:.2f}",
-            f"{int(row['frec_absoluta'])}",
-            f"{row['frec_relativa']:.3f}",
-            f"{int(row['frec_abs_acum'])}",
-            f"{row['frec_rel_acum']:.3f}"
-        ])
+    headers = ['Estadística'] + meses
+    filas = filas_tabla_estadisticas_mensuales(stats_boxplot)
     
     tabla = ax.table(
-        cellText=datos,
-        colLabels=['Intervalo de Clase', 'Marca de Clase', 'Frec. Absoluta', 
-                   'Frec. Relativa', 'Frec. Abs. Acum.', 'Frec. Rel. Acum.'],
+        cellText=[f for f in filas],
+        colLabels=headers,
         loc='center',
         cellLoc='center'
     )
     
     tabla.auto_set_font_size(False)
-    tabla.set_fontsize(11)
+    tabla.set_fontsize(10)
     tabla.scale(1.2, 1.5)
     
     # Personalizar la tabla
+    color_encabezado, color_primera_col, color_impar, color_par = colores
     for (i, j), cell in tabla.get_celld().items():
         if i == 0:  # Encabezados
             cell.set_text_props(weight='bold', color='white')
-            cell.set_facecolor('#4472C4')
+            cell.set_facecolor(color_encabezado)
+        elif j == 0:  # Primera columna
+            cell.set_text_props(weight='bold')
+            cell.set_facecolor(color_primera_col)
         elif i % 2 == 1:  # Filas impares
-            cell.set_facecolor('#D9E1F2')
+            cell.set_facecolor(color_impar)
         else:  # Filas pares
-            cell.set_facecolor('#E9EDF4')
+            cell.set_facecolor(color_par)
     
     plt.title(titulo, fontsize=16, pad=20)
     plt.tight_layout()
-    plt.savefig(ruta_guardado, dpi=300, bbox_inches='tight')
+    guardar_figura(plt.gcf(), ruta_guardado)
     plt.close()
 
-def crear_diagrama_cajas(df, fecha_col, valor_col, titulo, xlabel, ylabel, ruta_guardado, color='#4472C4'):
+@figura_con_tema
+def crear_diagrama_cajas(df, fecha_col, valor_col, titulo, xlabel, ylabel, ruta_guardado, color='#4472C4',
+                         sketches=None):
     """
     Crea un diagrama de cajas y bigotes para los datos mensuales multianuales.
-    """
-    # Preparar los datos
-    df = df.copy()
-    if isinstance(df[fecha_col].iloc[0], str):
-        df[fecha_col] = pd.to_datetime(df[fecha_col])
     
-    df['mes'] = df[fecha_col].dt.month
-    df['año'] = df[fecha_col].dt.year
+    Si se pasan `sketches` (mes -> SketchCuantiles) las cajas se dibujan con
+    sus cuartiles aproximados y `df` no se usa, de modo que no hace falta
+    tener la serie completa en memoria.
+    """
+    import matplotlib.pyplot as plt
     
     plt.figure(figsize=(14, 8))
     
-    # Crear el diagrama de cajas
-    ax = sns.boxplot(x='mes', y=valor_col, data=df, palette='Blues')
+    if sketches is not None:
+        # Crear el diagrama de cajas desde los sketches
+        ax = plt.gca()
+        cajas = [resumen_caja_desde_sketch(sketches[mes], meses[mes - 1]) for mes in sorted(sketches)]
+        artistas = ax.bxp(cajas, positions=range(len(cajas)), widths=0.8, patch_artist=True,
+                          showfliers=False, medianprops={'color': 'black'})
+        for caja, color_caja in zip(artistas['boxes'], _seaborn().color_palette('Blues', len(cajas), desat=0.75)):
+            caja.set_facecolor(color_caja)
+        ax.set_xlim(-0.5, len(cajas) - 0.5)
+        medias_mensuales = pd.Series([caja['mean'] for caja in cajas])
+    else:
+        # Preparar los datos
+        df = df.copy()
+        if isinstance(df[fecha_col].iloc[0], str):
+            df[fecha_col] = parsear_fechas(df[fecha_col])
+        
+        df['mes'] = df[fecha_col].dt.month
+        df['año'] = df[fecha_col].dt.year
+        
+        # Crear el diagrama de cajas
+        ax = _seaborn().boxplot(x='mes', y=valor_col, data=df, palette='Blues')
+        medias_mensuales = df.groupby('mes')[valor_col].mean()
     
     # Ajustar etiquetas del eje x
     plt.xticks(range(len(meses)), meses)
     
-    # Calcular y mostrar la media para cada mes
-    medias_mensuales = df.groupby('mes')[valor_col].mean()
+    # Mostrar la media de cada mes
     plt.plot(range(len(medias_mensuales)), medias_mensuales.values, 'ro-', linewidth=2, 
              label=f'Media: {medias_mensuales.mean():.2f}')
     
@@ -663,748 +2556,866 @@ def crear_diagrama_cajas(df, fecha_col, valor_col, titulo, xlabel, ylabel, ruta_
     plt.ylabel(ylabel, fontsize=14)
     
     plt.tight_layout()
-    plt.savefig(ruta_guardado, dpi=300, bbox_inches='tight')
+    guardar_figura(plt.gcf(), ruta_guardado)
     plt.close()
 
-def crear_graficos_frecuencia(df, fecha_col, valor_col, titulo_base, ylabel, ruta_base, color='#4472C4'):
+def frecuencias_mensuales(df, fecha_col):
     """
-    Crea gráficos de frecuencias mensuales multianuales.
+    Frecuencias absolutas, relativas y acumuladas de registros por mes.
     """
     # Preparar los datos
     df = df.copy()
     if isinstance(df[fecha_col].iloc[0], str):
-        df[fecha_col] = pd.to_datetime(df[fecha_col])
+        df[fecha_col] = parsear_fechas(df[fecha_col])
     
     df['mes'] = df[fecha_col].dt.month
     df['año'] = df[fecha_col].dt.year
     
-    # 1. Frecuencia absoluta mensual multianual
+    # Frecuencias absolutas, relativas y acumuladas por mes
     frec_abs_mensual = df.groupby('mes').size().reset_index(name='frecuencia')
-    crear_grafico(frec_abs_mensual, 'mes', 'frecuencia', 
-                 f'Frecuencia Absoluta Mensual Multianual - {titulo_base}', 
-                 'Mes', 'Frecuencia Absoluta', 
-                 f'{ruta_base}_frec_abs_mensual.png', 'barras', color)
-    
-    # 2. Frecuencia absoluta acumulada
     frec_abs_mensual['frec_acumulada'] = frec_abs_mensual['frecuencia'].cumsum()
-    crear_grafico(frec_abs_mensual, 'mes', 'frec_acumulada', 
-                 f'Frecuencia Absoluta Acumulada - {titulo_base}', 
-                 'Mes', 'Frecuencia Absoluta Acumulada', 
-                 f'{ruta_base}_frec_abs_acum.png', 'lineas', color)
-    
-    # 3. Frecuencia relativa mensual multianual
     total = frec_abs_mensual['frecuencia'].sum()
     frec_abs_mensual['frec_relativa'] = frec_abs_mensual['frecuencia'] / total if total > 0 else 0
-    crear_grafico(frec_abs_mensual, 'mes', 'frec_relativa', 
-                 f'Frecuencia Relativa Mensual Multianual - {titulo_base}', 
-                 'Mes', 'Frecuencia Relativa', 
-                 f'{ruta_base}_frec_rel_mensual.png', 'barras', color)
-    
-    # 4. Frecuencia relativa acumulada
     frec_abs_mensual['frec_rel_acumulada'] = frec_abs_mensual['frec_relativa'].cumsum()
-    crear_grafico(frec_abs_mensual, 'mes', 'frec_rel_acumulada', 
-                 f'Frecuencia Relativa Acumulada - {titulo_base}', 
-                 'Mes', 'Frecuencia Relativa Acumulada', 
-                 f'{ruta_base}_frec_rel_acum.png', 'lineas', color)
+    return frec_abs_mensual
 
-def analizar_estadisticas_caudal():
+# Gráficos de frecuencias mensuales multianuales: (columna, nombre, tipo, título, etiqueta del eje y)
+GRAFICOS_FRECUENCIA = [
+    ('frecuencia', 'frec_abs_mensual', 'barras', 'Frecuencia Absoluta Mensual Multianual', 'Frecuencia Absoluta'),
+    ('frec_acumulada', 'frec_abs_acum', 'lineas', 'Frecuencia Absoluta Acumulada', 'Frecuencia Absoluta Acumulada'),
+    ('frec_relativa', 'frec_rel_mensual', 'barras', 'Frecuencia Relativa Mensual Multianual', 'Frecuencia Relativa'),
+    ('frec_rel_acumulada', 'frec_rel_acum', 'lineas', 'Frecuencia Relativa Acumulada',
+     'Frecuencia Relativa Acumulada'),
+]
+
+def programar_grafico_frecuencia(spec, indice, prefijo, titulo, frecuencias):
     """
-    Realiza un análisis estadístico completo de los datos de caudal.
+    Programa el gráfico de frecuencias GRAFICOS_FRECUENCIA[indice] a partir
+    de la tabla de frecuencias_mensuales().
     """
-    print("Analizando estadísticas de caudal...")
-    try:
-        print("  Cargando datos de caudal...")
-        caudal_df = pd.read_csv('Caudal medio mensual/Caudal medio mensual.csv')
-        caudal_df['Fecha'] = pd.to_datetime(caudal_df['Fecha'])
-        print(f"  Datos cargados: {len(caudal_df)} registros")
-        
-        # 1. Calcular estadísticas descriptivas
-        print("  Calculando estadísticas descriptivas...")
-        stats_caudal = calcular_estadisticas(caudal_df, 'Valor')
-        print(f"  Media: {stats_caudal['media']:.2f}, Mediana: {stats_caudal['mediana']:.2f}, Moda: {stats_caudal['moda']:.2f}")
-        crear_tabla_estadisticas(stats_caudal, 'Estadísticas Descriptivas - Caudal Medio Mensual', 
-                               'figuras/caudal_estadisticas.png')
-        print("  Tabla de estadísticas generada")
-        
-        # 2. Calcular tabla de intervalos de clase
-        print("  Calculando intervalos de clase...")
-        intervalos_caudal = calcular_intervalos_clase(caudal_df, 'Valor')
-        print(f"  Se generaron {len(intervalos_caudal)} intervalos")
-        crear_tabla_intervalos(intervalos_caudal, 'Intervalos de Clase - Caudal Medio Mensual', 
-                             'figuras/caudal_intervalos.png')
-        print("  Tabla de intervalos generada")
-        
-        # 3. Crear diagrama de cajas y bigotes
-        print("  Creando diagrama de cajas y bigotes...")
-        crear_diagrama_cajas(caudal_df, 'Fecha', 'Valor', 
-                           'Diagrama de Cajas y Bigotes - Caudal Medio Mensual', 
-                           'Mes', 'Caudal (m³/s)', 
-                           'figuras/caudal_boxplot.png', '#4472C4')
-        print("  Diagrama de cajas y bigotes generado")
-        
-        # 4. Crear gráficos de frecuencia
-        print("  Creando gráficos de frecuencia...")
-        crear_graficos_frecuencia(caudal_df, 'Fecha', 'Valor', 
-                                'Caudal Medio Mensual', 'Caudal (m³/s)', 
-                                'figuras/caudal', '#4472C4')
-        print("  Gráficos de frecuencia generados")
-        
-        # 5. Estadísticas específicas para el diagrama de cajas y bigotes
-        print("  Calculando estadísticas por mes para el boxplot...")
-        df_mensual = caudal_df.copy()
-        df_mensual['mes'] = df_mensual['Fecha'].dt.month
-        stats_boxplot = {}
-        for mes in range(1, 13):
-            valores_mes = df_mensual[df_mensual['mes'] == mes]['Valor']
-            if not valores_mes.empty:
-                stats_mes = calcular_estadisticas(pd.DataFrame({'Valor': valores_mes}), 'Valor')
-                stats_boxplot[meses[mes-1]] = stats_mes
-        
-        print("  Creando tabla de estadísticas del boxplot...")
-        # Crear tabla con estadísticas del boxplot
-        fig, ax = plt.subplots(figsize=(18, 10))
-        ax.axis('off')
-        ax.axis('tight')
-        
-        # Preparar datos para la tabla
-        headers = ['Estadística'] + meses
-        filas = [
-            ['Media'],
-            ['Mediana'],
-            ['Moda'],
-            ['Rango'],
-            ['Varianza'],
-            ['Desv. Est.'],
-            ['Coef. Var. (%)'],
-            ['Mínimo'],
-            ['Máximo'],
-            ['n']
-        ]
-        
-        # Llenar los valores
-        for mes in meses:
-            if mes in stats_boxplot:
-                s = stats_boxplot[mes]
-                filas[0].append(f"{s['media']:.2f}")
-                filas[1].append(f"{s['mediana']:.2f}")
-                filas[2].append(f"{s['moda']:.2f}")
-                filas[3].append(f"{s['rango']:.2f}")
-                filas[4].append(f"{s['varianza']:.2f}")
-                filas[5].append(f"{s['desviacion_estandar']:.2f}")
-                filas[6].append(f"{s['coef_variacion']:.2f}")
-                filas[7].append(f"{s['minimo']:.2f}")
-                filas[8].append(f"{s['maximo']:.2f}")
-                filas[9].append(f"{s['n']}")
-            else:
-                for i in range(10):
-                    filas[i].append("N/A")
-        
-        tabla = ax.table(
-            cellText=[f for f in filas],
-            colLabels=headers,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(10)
-        tabla.scale(1.2, 1.5)
-        
-        # Personalizar la tabla
-        for (i, j), cell in tabla.get_celld().items():
-            if i == 0:  # Encabezados
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor('#4472C4')
-            elif j == 0:  # Primera columna
-                cell.set_text_props(weight='bold')
-                cell.set_facecolor('#D9E1F2')
-            elif i % 2 == 1:  # Filas impares
-                cell.set_facecolor('#E9EDF4')
-            else:  # Filas pares
-                cell.set_facecolor('#D9E1F2')
-        
-        plt.title('Estadísticas por Mes - Caudal Medio Mensual', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig('figuras/caudal_boxplot_stats.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  Tabla de estadísticas del boxplot generada")
-        
-        print("Análisis estadístico de caudal completado.")
-    except Exception as e:
-        print(f"Error en el análisis estadístico de caudal: {e}")
-        import traceback
-        print(traceback.format_exc())
+    columna, nombre, tipo, titulo_grafico, ylabel = GRAFICOS_FRECUENCIA[indice]
+    programar_grafico(frecuencias, 'mes', columna, f'{titulo_grafico} - {titulo}', 'Mes', ylabel,
+                      prefijo, nombre, tipo, spec['color'])
 
-# Función para analizar estadísticas de temperatura
-def analizar_estadisticas_temperatura():
+def programar_tabla_estadisticas(prefijo, titulo, estadisticas):
     """
-    Realiza un análisis estadístico completo de los datos de temperatura.
+    Tabla de estadísticas descriptivas: tabla del informe HTML, archivo de
+    datos o figura, según el modo.
     """
-    print("Analizando estadísticas de temperatura...")
-    try:
-        print("  Cargando datos de temperatura...")
-        
-        # El archivo tiene un formato diferente, con filas iniciales de metadatos
-        # Vamos a leer el archivo como texto y procesarlo manualmente
-        temp_file = 'Temperatura Mensual/Temperatura Minima Mensual/Temperatura Minima Mensual.csv'
-        
-        # Leer y parsear manualmente el archivo
-        temp_data = []
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            # Encontrar dónde comienzan los datos reales
-            data_start = 0
-            for i, line in enumerate(lines):
-                if line.startswith('Fecha'):
-                    data_start = i + 2  # Saltar la fila de encabezado y la siguiente línea en blanco
-                    break
-            
-            # Extraer datos
-            for i in range(data_start, len(lines)):
-                line = lines[i].strip()
-                if line and ',' in line:
-                    parts = line.split(',')
-                    if len(parts) >= 3 and parts[0] and parts[2]:
-                        fecha = parts[0].strip()
-                        # El valor está en la 3ra columna (índice 2)
-                        valor_str = parts[2].strip()
-                        if valor_str:
-                            try:
-                                valor = float(valor_str)
-                                temp_data.append({'Fecha': fecha, 'Valor': valor})
-                            except ValueError:
-                                pass  # Ignorar valores no convertibles
-        
-        # Convertir a DataFrame
-        if not temp_data:
-            raise ValueError("No se pudieron extraer datos de temperatura del archivo")
-        
-        temp_min_df = pd.DataFrame(temp_data)
-        temp_min_df['Fecha'] = pd.to_datetime(temp_min_df['Fecha'])
-        print(f"  Datos cargados: {len(temp_min_df)} registros")
-        
-        # 1. Calcular estadísticas descriptivas
-        print("  Calculando estadísticas descriptivas...")
-        stats_temperatura = calcular_estadisticas(temp_min_df, 'Valor')
-        print(f"  Media: {stats_temperatura['media']:.2f}, Mediana: {stats_temperatura['mediana']:.2f}, Moda: {stats_temperatura['moda']:.2f}")
-        crear_tabla_estadisticas(stats_temperatura, 'Estadísticas Descriptivas - Temperatura Mínima Mensual', 
-                               'figuras/temperatura_estadisticas.png')
-        print("  Tabla de estadísticas generada")
-        
-        # 2. Calcular tabla de intervalos de clase
-        print("  Calculando intervalos de clase...")
-        intervalos_temperatura = calcular_intervalos_clase(temp_min_df, 'Valor')
-        print(f"  Se generaron {len(intervalos_temperatura)} intervalos")
-        crear_tabla_intervalos(intervalos_temperatura, 'Intervalos de Clase - Temperatura Mínima Mensual', 
-                             'figuras/temperatura_intervalos.png')
-        print("  Tabla de intervalos generada")
-        
-        # 3. Crear diagrama de cajas y bigotes
-        print("  Creando diagrama de cajas y bigotes...")
-        crear_diagrama_cajas(temp_min_df, 'Fecha', 'Valor', 
-                           'Diagrama de Cajas y Bigotes - Temperatura Mínima Mensual', 
-                           'Mes', 'Temperatura (°C)', 
-                           'figuras/temperatura_boxplot.png', '#ED7D31')
-        print("  Diagrama de cajas y bigotes generado")
-        
-        # 4. Crear gráficos de frecuencia
-        print("  Creando gráficos de frecuencia...")
-        crear_graficos_frecuencia(temp_min_df, 'Fecha', 'Valor', 
-                                'Temperatura Mínima Mensual', 'Temperatura (°C)', 
-                                'figuras/temperatura', '#ED7D31')
-        print("  Gráficos de frecuencia generados")
-        
-        # 5. Estadísticas específicas para el diagrama de cajas y bigotes
-        print("  Calculando estadísticas por mes para el boxplot...")
-        df_mensual = temp_min_df.copy()
-        df_mensual['mes'] = df_mensual['Fecha'].dt.month
-        stats_boxplot = {}
-        for mes in range(1, 13):
-            valores_mes = df_mensual[df_mensual['mes'] == mes]['Valor']
-            if not valores_mes.empty:
-                stats_mes = calcular_estadisticas(pd.DataFrame({'Valor': valores_mes}), 'Valor')
-                stats_boxplot[meses[mes-1]] = stats_mes
-        
-        print("  Creando tabla de estadísticas del boxplot...")
-        # Crear tabla con estadísticas del boxplot
-        fig, ax = plt.subplots(figsize=(18, 10))
-        ax.axis('off')
-        ax.axis('tight')
-        
-        # Preparar datos para la tabla
-        headers = ['Estadística'] + meses
-        filas = [
-            ['Media'],
-            ['Mediana'],
-            ['Moda'],
-            ['Rango'],
-            ['Varianza'],
-            ['Desv. Est.'],
-            ['Coef. Var. (%)'],
-            ['Mínimo'],
-            ['Máximo'],
-            ['n']
-        ]
-        
-        # Llenar los valores
-        for mes in meses:
-            if mes in stats_boxplot:
-                s = stats_boxplot[mes]
-                filas[0].append(f"{s['media']:.2f}")
-                filas[1].append(f"{s['mediana']:.2f}")
-                filas[2].append(f"{s['moda']:.2f}")
-                filas[3].append(f"{s['rango']:.2f}")
-                filas[4].append(f"{s['varianza']:.2f}")
-                filas[5].append(f"{s['desviacion_estandar']:.2f}")
-                filas[6].append(f"{s['coef_variacion']:.2f}")
-                filas[7].append(f"{s['minimo']:.2f}")
-                filas[8].append(f"{s['maximo']:.2f}")
-                filas[9].append(f"{s['n']}")
-            else:
-                for i in range(10):
-                    filas[i].append("N/A")
-        
-        tabla = ax.table(
-            cellText=[f for f in filas],
-            colLabels=headers,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(10)
-        tabla.scale(1.2, 1.5)
-        
-        # Personalizar la tabla
-        for (i, j), cell in tabla.get_celld().items():
-            if i == 0:  # Encabezados
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor('#ED7D31')
-            elif j == 0:  # Primera columna
-                cell.set_text_props(weight='bold')
-                cell.set_facecolor('#FBE5D6')
-            elif i % 2 == 1:  # Filas impares
-                cell.set_facecolor('#FDF1E9')
-            else:  # Filas pares
-                cell.set_facecolor('#FBE5D6')
-        
-        plt.title('Estadísticas por Mes - Temperatura Mínima Mensual', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig('figuras/temperatura_boxplot_stats.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  Tabla de estadísticas del boxplot generada")
-        
-        print("Análisis estadístico de temperatura completado.")
-    except Exception as e:
-        print(f"Error en el análisis estadístico de temperatura: {e}")
-        import traceback
-        print(traceback.format_exc())
+    if _informe['activo']:
+        _informe['tablas'][prefijo + '_estadisticas'] = tabla_html(
+            ['Estadística', 'Valor'], filas_tabla_estadisticas(estadisticas),
+            f'Estadísticas Descriptivas - {titulo}')
+    if _modo_datos['activo']:
+        exportar_tabla(estadisticas, prefijo, 'estadisticas')
+    elif not _informe['activo']:
+        programar_render(crear_tabla_estadisticas, estadisticas, f'Estadísticas Descriptivas - {titulo}', 
+                         ruta_figura(prefijo, 'estadisticas'))
 
-# Función para analizar estadísticas de humedad
-def analizar_estadisticas_humedad():
+def programar_tabla_intervalos(prefijo, titulo, intervalos):
     """
-    Realiza un análisis estadístico completo de los datos de humedad relativa.
+    Tabla de intervalos de clase: tabla del informe HTML, archivo de datos o
+    figura, según el modo.
     """
-    print("Analizando estadísticas de humedad...")
-    try:
-        print("  Cargando datos de humedad...")
-        humedad_df = pd.read_csv('Húmeda relativa calculada máxima diaria/Húmeda relativa calculada máxima diaria.csv')
-        humedad_df['Fecha'] = pd.to_datetime(humedad_df['Fecha'])
-        print(f"  Datos cargados: {len(humedad_df)} registros")
-        
-        # 1. Calcular estadísticas descriptivas
-        print("  Calculando estadísticas descriptivas...")
-        stats_humedad = calcular_estadisticas(humedad_df, 'Valor')
-        print(f"  Media: {stats_humedad['media']:.2f}, Mediana: {stats_humedad['mediana']:.2f}, Moda: {stats_humedad['moda']:.2f}")
-        crear_tabla_estadisticas(stats_humedad, 'Estadísticas Descriptivas - Humedad Relativa Máxima Diaria', 
-                               'figuras/humedad_estadisticas.png')
-        print("  Tabla de estadísticas generada")
-        
-        # 2. Calcular tabla de intervalos de clase
-        print("  Calculando intervalos de clase...")
-        intervalos_humedad = calcular_intervalos_clase(humedad_df, 'Valor')
-        print(f"  Se generaron {len(intervalos_humedad)} intervalos")
-        crear_tabla_intervalos(intervalos_humedad, 'Intervalos de Clase - Humedad Relativa Máxima Diaria', 
-                             'figuras/humedad_intervalos.png')
-        print("  Tabla de intervalos generada")
-        
-        # 3. Crear diagrama de cajas y bigotes
-        print("  Creando diagrama de cajas y bigotes...")
-        crear_diagrama_cajas(humedad_df, 'Fecha', 'Valor', 
-                           'Diagrama de Cajas y Bigotes - Humedad Relativa Máxima Diaria', 
-                           'Mes', 'Humedad Relativa (%)', 
-                           'figuras/humedad_boxplot.png', '#70AD47')
-        print("  Diagrama de cajas y bigotes generado")
-        
-        # 4. Crear gráficos de frecuencia
-        print("  Creando gráficos de frecuencia...")
-        crear_graficos_frecuencia(humedad_df, 'Fecha', 'Valor', 
-                                'Humedad Relativa Máxima Diaria', 'Humedad Relativa (%)', 
-                                'figuras/humedad', '#70AD47')
-        print("  Gráficos de frecuencia generados")
-        
-        # 5. Estadísticas específicas para el diagrama de cajas y bigotes
-        print("  Calculando estadísticas por mes para el boxplot...")
-        df_mensual = humedad_df.copy()
-        df_mensual['mes'] = df_mensual['Fecha'].dt.month
-        stats_boxplot = {}
-        for mes in range(1, 13):
-            valores_mes = df_mensual[df_mensual['mes'] == mes]['Valor']
-            if not valores_mes.empty:
-                stats_mes = calcular_estadisticas(pd.DataFrame({'Valor': valores_mes}), 'Valor')
-                stats_boxplot[meses[mes-1]] = stats_mes
-        
-        print("  Creando tabla de estadísticas del boxplot...")
-        # Crear tabla con estadísticas del boxplot
-        fig, ax = plt.subplots(figsize=(18, 10))
-        ax.axis('off')
-        ax.axis('tight')
-        
-        # Preparar datos para la tabla
-        headers = ['Estadística'] + meses
-        filas = [
-            ['Media'],
-            ['Mediana'],
-            ['Moda'],
-            ['Rango'],
-            ['Varianza'],
-            ['Desv. Est.'],
-            ['Coef. Var. (%)'],
-            ['Mínimo'],
-            ['Máximo'],
-            ['n']
-        ]
-        
-        # Llenar los valores
-        for mes in meses:
-            if mes in stats_boxplot:
-                s = stats_boxplot[mes]
-                filas[0].append(f"{s['media']:.2f}")
-                filas[1].append(f"{s['mediana']:.2f}")
-                filas[2].append(f"{s['moda']:.2f}")
-                filas[3].append(f"{s['rango']:.2f}")
-                filas[4].append(f"{s['varianza']:.2f}")
-                filas[5].append(f"{s['desviacion_estandar']:.2f}")
-                filas[6].append(f"{s['coef_variacion']:.2f}")
-                filas[7].append(f"{s['minimo']:.2f}")
-                filas[8].append(f"{s['maximo']:.2f}")
-                filas[9].append(f"{s['n']}")
-            else:
-                for i in range(10):
-                    filas[i].append("N/A")
-        
-        tabla = ax.table(
-            cellText=[f for f in filas],
-            colLabels=headers,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(10)
-        tabla.scale(1.2, 1.5)
-        
-        # Personalizar la tabla
-        for (i, j), cell in tabla.get_celld().items():
-            if i == 0:  # Encabezados
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor('#70AD47')
-            elif j == 0:  # Primera columna
-                cell.set_text_props(weight='bold')
-                cell.set_facecolor('#E2F0D9')
-            elif i % 2 == 1:  # Filas impares
-                cell.set_facecolor('#F0F7EC')
-            else:  # Filas pares
-                cell.set_facecolor('#E2F0D9')
-        
-        plt.title('Estadísticas por Mes - Humedad Relativa Máxima Diaria', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig('figuras/humedad_boxplot_stats.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  Tabla de estadísticas del boxplot generada")
-        
-        print("Análisis estadístico de humedad completado.")
-    except Exception as e:
-        print(f"Error en el análisis estadístico de humedad: {e}")
-        import traceback
-        print(traceback.format_exc())
+    if _informe['activo']:
+        _informe['tablas'][prefijo + '_intervalos'] = tabla_html(
+            ENCABEZADOS_INTERVALOS, filas_tabla_intervalos(intervalos), f'Intervalos de Clase - {titulo}')
+    if _modo_datos['activo']:
+        exportar_tabla(intervalos, prefijo, 'intervalos')
+    elif not _informe['activo']:
+        programar_render(crear_tabla_intervalos, intervalos, f'Intervalos de Clase - {titulo}', 
+                         ruta_figura(prefijo, 'intervalos'))
 
-# Función para analizar estadísticas de evaporación
-def analizar_estadisticas_evaporacion():
+def programar_diagrama_cajas(spec, prefijo, titulo, resumen, df=None):
     """
-    Realiza un análisis estadístico completo de los datos de evaporación.
+    Diagrama de cajas: cuartiles y bigotes de cada mes (modo de solo datos),
+    gráfico interactivo o figura. `resumen` es el par (estadísticas por mes,
+    sketches) de resumen_mensual(); `df`, la serie, solo hace falta sin sketches.
     """
-    print("Analizando estadísticas de evaporación...")
-    try:
-        print("  Cargando datos de evaporación...")
-        evaporacion_df = pd.read_csv('Evaporación total diaria SUM [EVTE_CON]/Evaporación total diaria SUM.csv')
-        evaporacion_df['Fecha'] = pd.to_datetime(evaporacion_df['Fecha'])
-        print(f"  Datos cargados: {len(evaporacion_df)} registros")
-        
-        # 1. Calcular estadísticas descriptivas
-        print("  Calculando estadísticas descriptivas...")
-        stats_evaporacion = calcular_estadisticas(evaporacion_df, 'Valor')
-        print(f"  Media: {stats_evaporacion['media']:.2f}, Mediana: {stats_evaporacion['mediana']:.2f}, Moda: {stats_evaporacion['moda']:.2f}")
-        crear_tabla_estadisticas(stats_evaporacion, 'Estadísticas Descriptivas - Evaporación Total Diaria', 
-                               'figuras/evaporacion_estadisticas.png')
-        print("  Tabla de estadísticas generada")
-        
-        # 2. Calcular tabla de intervalos de clase
-        print("  Calculando intervalos de clase...")
-        intervalos_evaporacion = calcular_intervalos_clase(evaporacion_df, 'Valor')
-        print(f"  Se generaron {len(intervalos_evaporacion)} intervalos")
-        crear_tabla_intervalos(intervalos_evaporacion, 'Intervalos de Clase - Evaporación Total Diaria', 
-                             'figuras/evaporacion_intervalos.png')
-        print("  Tabla de intervalos generada")
-        
-        # 3. Crear diagrama de cajas y bigotes
-        print("  Creando diagrama de cajas y bigotes...")
-        crear_diagrama_cajas(evaporacion_df, 'Fecha', 'Valor', 
-                           'Diagrama de Cajas y Bigotes - Evaporación Total Diaria', 
-                           'Mes', 'Evaporación (mm)', 
-                           'figuras/evaporacion_boxplot.png', '#5B9BD5')
-        print("  Diagrama de cajas y bigotes generado")
-        
-        # 4. Crear gráficos de frecuencia
-        print("  Creando gráficos de frecuencia...")
-        crear_graficos_frecuencia(evaporacion_df, 'Fecha', 'Valor', 
-                                'Evaporación Total Diaria', 'Evaporación (mm)', 
-                                'figuras/evaporacion', '#5B9BD5')
-        print("  Gráficos de frecuencia generados")
-        
-        # 5. Estadísticas específicas para el diagrama de cajas y bigotes
-        print("  Calculando estadísticas por mes para el boxplot...")
-        df_mensual = evaporacion_df.copy()
-        df_mensual['mes'] = df_mensual['Fecha'].dt.month
-        stats_boxplot = {}
-        for mes in range(1, 13):
-            valores_mes = df_mensual[df_mensual['mes'] == mes]['Valor']
-            if not valores_mes.empty:
-                stats_mes = calcular_estadisticas(pd.DataFrame({'Valor': valores_mes}), 'Valor')
-                stats_boxplot[meses[mes-1]] = stats_mes
-        
-        print("  Creando tabla de estadísticas del boxplot...")
-        # Crear tabla con estadísticas del boxplot
-        fig, ax = plt.subplots(figsize=(18, 10))
-        ax.axis('off')
-        ax.axis('tight')
-        
-        # Preparar datos para la tabla
-        headers = ['Estadística'] + meses
-        filas = [
-            ['Media'],
-            ['Mediana'],
-            ['Moda'],
-            ['Rango'],
-            ['Varianza'],
-            ['Desv. Est.'],
-            ['Coef. Var. (%)'],
-            ['Mínimo'],
-            ['Máximo'],
-            ['n']
-        ]
-        
-        # Llenar los valores
-        for mes in meses:
-            if mes in stats_boxplot:
-                s = stats_boxplot[mes]
-                filas[0].append(f"{s['media']:.2f}")
-                filas[1].append(f"{s['mediana']:.2f}")
-                filas[2].append(f"{s['moda']:.2f}")
-                filas[3].append(f"{s['rango']:.2f}")
-                filas[4].append(f"{s['varianza']:.2f}")
-                filas[5].append(f"{s['desviacion_estandar']:.2f}")
-                filas[6].append(f"{s['coef_variacion']:.2f}")
-                filas[7].append(f"{s['minimo']:.2f}")
-                filas[8].append(f"{s['maximo']:.2f}")
-                filas[9].append(f"{s['n']}")
-            else:
-                for i in range(10):
-                    filas[i].append("N/A")
-        
-        tabla = ax.table(
-            cellText=[f for f in filas],
-            colLabels=headers,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(10)
-        tabla.scale(1.2, 1.5)
-        
-        # Personalizar la tabla
-        for (i, j), cell in tabla.get_celld().items():
-            if i == 0:  # Encabezados
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor('#5B9BD5')
-            elif j == 0:  # Primera columna
-                cell.set_text_props(weight='bold')
-                cell.set_facecolor('#DEEAF6')
-            elif i % 2 == 1:  # Filas impares
-                cell.set_facecolor('#EFF4FB')
-            else:  # Filas pares
-                cell.set_facecolor('#DEEAF6')
-        
-        plt.title('Estadísticas por Mes - Evaporación Total Diaria', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig('figuras/evaporacion_boxplot_stats.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  Tabla de estadísticas del boxplot generada")
-        
-        print("Análisis estadístico de evaporación completado.")
-    except Exception as e:
-        print(f"Error en el análisis estadístico de evaporación: {e}")
-        import traceback
-        print(traceback.format_exc())
+    sketches = resumen[1]
+    if _modo_datos['activo']:
+        exportar_tabla(tabla_cajas_mensuales(df, 'Fecha', 'Valor', sketches), prefijo, 'boxplot')
+    elif _graficos_interactivos['activo']:
+        registrar_grafico_interactivo(prefijo, 'boxplot', grafico_cajas_interactivo(
+            tabla_cajas_mensuales(df, 'Fecha', 'Valor', sketches), f'Diagrama de Cajas y Bigotes - {titulo}',
+            'Mes', spec['ylabel'], spec['color']))
+    else:
+        programar_render(crear_diagrama_cajas, df if sketches is None else None, 'Fecha', 'Valor', 
+                         f'Diagrama de Cajas y Bigotes - {titulo}', 
+                         'Mes', spec['ylabel'], 
+                         ruta_figura(prefijo, 'boxplot'), spec['color'], sketches=sketches)
+
+def programar_tabla_estadisticas_mensuales(spec, prefijo, titulo, resumen):
+    """
+    Tabla de estadísticas por mes: tabla del informe HTML, archivo de datos
+    o figura, según el modo.
+    """
+    stats_boxplot = resumen[0]
+    if _informe['activo']:
+        _informe['tablas'][prefijo + '_boxplot_stats'] = tabla_html(
+            ['Estadística'] + meses, filas_tabla_estadisticas_mensuales(stats_boxplot),
+            f'Estadísticas por Mes - {titulo}', spec['colores_tabla'], primera_columna=True)
+    if _modo_datos['activo']:
+        exportar_tabla(pd.DataFrame.from_dict(stats_boxplot, orient='index').rename_axis('mes').reset_index(),
+                       prefijo, 'boxplot_stats')
+    elif not _informe['activo']:
+        programar_render(crear_tabla_estadisticas_mensuales, stats_boxplot,
+                         f'Estadísticas por Mes - {titulo}',
+                         ruta_figura(prefijo, 'boxplot_stats'),
+                         spec['colores_tabla'])
+
+def nodos_figuras_estadisticas(spec, prefijo, titulo, etapas, datos, estadisticas=None, intervalos=None,
+                               resumen=None):
+    """
+    Declara un nodo por artefacto del análisis estadístico de una variable
+    según las etapas indicadas: 'descriptivas' (tabla de estadísticas),
+    'intervalos' (tabla de intervalos de clase), 'cajas' (diagrama de cajas
+    y tabla de estadísticas por mes) y 'frecuencia' (gráficos de frecuencia,
+    o su tabla en modo de solo datos).
+    
+    datos, estadisticas, intervalos y resumen son los nodos de la serie
+    (Fecha, Valor), sus estadísticas descriptivas, sus intervalos de clase y
+    su resumen por mes (ver resumen_mensual). En modo de cuantiles
+    aproximados el diagrama de cajas se dibuja solo con el resumen, sin la serie.
+    """
+    parcial = functools.partial
+    if 'descriptivas' in etapas:
+        agregar_nodo(f'{prefijo}_estadisticas', parcial(programar_tabla_estadisticas, prefijo, titulo),
+                     [estadisticas], salidas_artefacto(prefijo, 'estadisticas', tabla=True))
+    if 'intervalos' in etapas:
+        agregar_nodo(f'{prefijo}_intervalos', parcial(programar_tabla_intervalos, prefijo, titulo),
+                     [intervalos], salidas_artefacto(prefijo, 'intervalos', tabla=True))
+    if 'cajas' in etapas:
+        agregar_nodo(f'{prefijo}_boxplot', parcial(programar_diagrama_cajas, spec, prefijo, titulo),
+                     [resumen] if _cuantiles_aproximados['activo'] else [resumen, datos],
+                     salidas_artefacto(prefijo, 'boxplot', interactivo=True))
+    if 'frecuencia' in etapas and _modo_datos['activo']:
+        agregar_nodo(f'{prefijo}_frecuencias',
+                     lambda df: exportar_tabla(frecuencias_mensuales(df, 'Fecha'), prefijo, 'frecuencias'),
+                     [datos], salidas_artefacto(prefijo, 'frecuencias'))
+    elif 'frecuencia' in etapas:
+        frecuencias = agregar_nodo(f'{prefijo}_frecuencias', parcial(frecuencias_mensuales, fecha_col='Fecha'),
+                                   [datos])
+        for indice, (_, nombre, *_) in enumerate(GRAFICOS_FRECUENCIA):
+            agregar_nodo(f'{prefijo}_{nombre}', parcial(programar_grafico_frecuencia, spec, indice, prefijo, titulo),
+                         [frecuencias], salidas_artefacto(prefijo, nombre, interactivo=True))
+    if 'cajas' in etapas:
+        agregar_nodo(f'{prefijo}_boxplot_stats',
+                     parcial(programar_tabla_estadisticas_mensuales, spec, prefijo, titulo),
+                     [resumen], salidas_artefacto(prefijo, 'boxplot_stats', tabla=True))
+
+def nodos_estadisticas(variable, etapas=ETAPAS):
+    """
+    Declara los nodos del análisis estadístico de una variable registrada en
+    VARIABLES: estadísticas descriptivas, intervalos de clase, estadísticas
+    por mes y sus figuras. Solo se declara lo que necesitan las etapas indicadas.
+    
+    En modo de cuantiles aproximados las estadísticas descriptivas y por mes
+    salen de los sketches mensuales (ver nodo_sketches), de modo que con las
+    etapas 'descriptivas' y 'cajas' la serie nunca se carga completa.
+    """
+    spec = VARIABLES[variable]
+    parcial = functools.partial
+    aproximados = _cuantiles_aproximados['activo']
+    datos = estadisticas = intervalos = resumen = None
+    if not aproximados or set(etapas) & {'intervalos', 'frecuencia'}:
+        datos = nodo_datos(variable)
+    
+    # 1. Estadísticas descriptivas
+    if 'descriptivas' in etapas and aproximados:
+        estadisticas = agregar_nodo(f'estadisticas:{variable}', estadisticas_desde_sketches_mensuales,
+                                    [nodo_sketches(variable)])
+    elif 'descriptivas' in etapas and _modo_incremental['activo']:
+        estadisticas = agregar_nodo(f'estadisticas:{variable}', parcial(estadisticas_incrementales, variable),
+                                    [datos])
+    elif 'descriptivas' in etapas:
+        estadisticas = agregar_nodo(f'estadisticas:{variable}', parcial(calcular_estadisticas, valor_col='Valor'),
+                                    [datos])
+    
+    # 2. Tabla de intervalos de clase
+    if 'intervalos' in etapas:
+        intervalos = agregar_nodo(f'intervalos:{variable}', parcial(calcular_intervalos_clase, valor_col='Valor'),
+                                  [datos])
+    
+    # 3. Estadísticas por mes para el diagrama de cajas y bigotes
+    if 'cajas' in etapas and aproximados:
+        resumen = agregar_nodo(f'resumen_mensual:{variable}', resumen_desde_sketches, [nodo_sketches(variable)])
+    elif 'cajas' in etapas:
+        resumen = agregar_nodo(f'resumen_mensual:{variable}',
+                               parcial(resumen_mensual, fecha_col='Fecha', valor_col='Valor'), [datos])
+    
+    # 4. Tablas, diagrama de cajas y gráficos de frecuencia
+    nodos_figuras_estadisticas(spec, os.path.join(DIR_FIGURAS, spec['prefijo']), spec['titulo'], etapas,
+                               datos, estadisticas, intervalos, resumen)
+
+def analizar_estadisticas(variable, etapas=ETAPAS):
+    """
+    Realiza un análisis estadístico completo de una variable registrada en
+    VARIABLES (ver nodos_estadisticas). Devuelve el estado de cada nodo (ver
+    ejecutar_grafo).
+    """
+    print(f"Analizando estadísticas de {VARIABLES[variable]['nombre']}...")
+    nodos_estadisticas(variable, etapas)
+    return ejecutar_grafo()
+
+def analizar_estadisticas_caudal():
+    analizar_estadisticas('caudal')
+
+def analizar_estadisticas_temperatura():
+    analizar_estadisticas('temperatura')
+
+def analizar_estadisticas_humedad():
+    analizar_estadisticas('humedad')
+
+def analizar_estadisticas_evaporacion():
+    analizar_estadisticas('evaporacion')
 
-# Función para analizar estadísticas de precipitación
 def analizar_estadisticas_precipitacion():
+    analizar_estadisticas('precipitacion')
+
+# Informe HTML con tablas nativas
+
+# Tablas pendientes de escribir en el informe, por ruta de su figura (sin
+# extensión): ruta -> código HTML de la tabla. Del mismo modo, los gráficos
+# interactivos (ruta -> (paquete, nombre, título)) y los paquetes de datos que
+# se incrustan en el informe (ruta del paquete -> gráficos)
+_informe = {'activo': False, 'tablas': {}, 'graficos': {}, 'paquetes': {}}
+
+def activar_informe_html():
     """
-    Realiza un análisis estadístico completo de los datos de precipitación.
+    Las tablas de estadísticas, intervalos de clase y estadísticas por mes se
+    guardan para escribirlas en el informe HTML en lugar de dibujarse.
     """
-    print("Analizando estadísticas de precipitación...")
-    try:
-        print("  Cargando datos de precipitación...")
-        precipitacion_df = pd.read_csv('Datos/Precipitacion Mensual.csv')
-        precipitacion_df['Fecha'] = pd.to_datetime(precipitacion_df['system:time_start'])
-        precipitacion_df = precipitacion_df.rename(columns={'precipitation': 'Valor'})
-        print(f"  Datos cargados: {len(precipitacion_df)} registros")
-        
-        # 1. Calcular estadísticas descriptivas
-        print("  Calculando estadísticas descriptivas...")
-        stats_precipitacion = calcular_estadisticas(precipitacion_df, 'Valor')
-        print(f"  Media: {stats_precipitacion['media']:.2f}, Mediana: {stats_precipitacion['mediana']:.2f}, Moda: {stats_precipitacion['moda']:.2f}")
-        crear_tabla_estadisticas(stats_precipitacion, 'Estadísticas Descriptivas - Precipitación Mensual', 
-                               'figuras/precipitacion_estadisticas.png')
-        print("  Tabla de estadísticas generada")
-        
-        # 2. Calcular tabla de intervalos de clase
-        print("  Calculando intervalos de clase...")
-        intervalos_precipitacion = calcular_intervalos_clase(precipitacion_df, 'Valor')
-        print(f"  Se generaron {len(intervalos_precipitacion)} intervalos")
-        crear_tabla_intervalos(intervalos_precipitacion, 'Intervalos de Clase - Precipitación Mensual', 
-                             'figuras/precipitacion_intervalos.png')
-        print("  Tabla de intervalos generada")
-        
-        # 3. Crear diagrama de cajas y bigotes
-        print("  Creando diagrama de cajas y bigotes...")
-        crear_diagrama_cajas(precipitacion_df, 'Fecha', 'Valor', 
-                           'Diagrama de Cajas y Bigotes - Precipitación Mensual', 
-                           'Mes', 'Precipitación (mm)', 
-                           'figuras/precipitacion_boxplot.png', '#9B59B6')
-        print("  Diagrama de cajas y bigotes generado")
-        
-        # 4. Crear gráficos de frecuencia
-        print("  Creando gráficos de frecuencia...")
-        crear_graficos_frecuencia(precipitacion_df, 'Fecha', 'Valor', 
-                                'Precipitación Mensual', 'Precipitación (mm)', 
-                                'figuras/precipitacion', '#9B59B6')
-        print("  Gráficos de frecuencia generados")
-        
-        # 5. Estadísticas específicas para el diagrama de cajas y bigotes
-        print("  Calculando estadísticas por mes para el boxplot...")
-        df_mensual = precipitacion_df.copy()
-        df_mensual['mes'] = df_mensual['Fecha'].dt.month
-        stats_boxplot = {}
-        for mes in range(1, 13):
-            valores_mes = df_mensual[df_mensual['mes'] == mes]['Valor']
-            if not valores_mes.empty:
-                stats_mes = calcular_estadisticas(pd.DataFrame({'Valor': valores_mes}), 'Valor')
-                stats_boxplot[meses[mes-1]] = stats_mes
-        
-        print("  Creando tabla de estadísticas del boxplot...")
-        # Crear tabla con estadísticas del boxplot
-        fig, ax = plt.subplots(figsize=(18, 10))
-        ax.axis('off')
-        ax.axis('tight')
-        
-        # Preparar datos para la tabla
-        headers = ['Estadística'] + meses
-        filas = [
-            ['Media'],
-            ['Mediana'],
-            ['Moda'],
-            ['Rango'],
-            ['Varianza'],
-            ['Desv. Est.'],
-            ['Coef. Var. (%)'],
-            ['Mínimo'],
-            ['Máximo'],
-            ['n']
-        ]
-        
-        # Llenar los valores
-        for mes in meses:
-            if mes in stats_boxplot:
-                s = stats_boxplot[mes]
-                filas[0].append(f"{s['media']:.2f}")
-                filas[1].append(f"{s['mediana']:.2f}")
-                filas[2].append(f"{s['moda']:.2f}")
-                filas[3].append(f"{s['rango']:.2f}")
-                filas[4].append(f"{s['varianza']:.2f}")
-                filas[5].append(f"{s['desviacion_estandar']:.2f}")
-                filas[6].append(f"{s['coef_variacion']:.2f}")
-                filas[7].append(f"{s['minimo']:.2f}")
-                filas[8].append(f"{s['maximo']:.2f}")
-                filas[9].append(f"{s['n']}")
-            else:
-                for i in range(10):
-                    filas[i].append("N/A")
-        
-        tabla = ax.table(
-            cellText=[f for f in filas],
-            colLabels=headers,
-            loc='center',
-            cellLoc='center'
-        )
-        
-        tabla.auto_set_font_size(False)
-        tabla.set_fontsize(10)
-        tabla.scale(1.2, 1.5)
-        
-        # Personalizar la tabla
-        for (i, j), cell in tabla.get_celld().items():
-            if i == 0:  # Encabezados
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor('#9B59B6')
-            elif j == 0:  # Primera columna
-                cell.set_text_props(weight='bold')
-                cell.set_facecolor('#E8DAEF')
-            elif i % 2 == 1:  # Filas impares
-                cell.set_facecolor('#F4ECF7')
-            else:  # Filas pares
-                cell.set_facecolor('#E8DAEF')
-        
-        plt.title('Estadísticas por Mes - Precipitación Mensual', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.savefig('figuras/precipitacion_boxplot_stats.png', dpi=300, bbox_inches='tight')
-        plt.close()
-        print("  Tabla de estadísticas del boxplot generada")
-        
-        print("Análisis estadístico de precipitación completado.")
-    except Exception as e:
-        print(f"Error en el análisis estadístico de precipitación: {e}")
-        import traceback
-        print(traceback.format_exc())
+    _informe['activo'] = True
+
+def tabla_html(encabezados, filas, titulo, colores=None, primera_columna=False):
+    """
+    Código HTML de una tabla con los estilos 'tabla-informe' de styles.css.
+    
+    colores: (encabezado, primera columna, filas impares, filas pares), como
+    en crear_tabla_estadisticas_mensuales; por defecto la paleta azul de las
+    tablas de estadísticas.
+    """
+    from html import escape
+    clases = 'table table-sm tabla-informe' + (' tabla-primera-columna' if primera_columna else '')
+    estilo = ''
+    if colores is not None:
+        variables_css = ('--tabla-encabezado', '--tabla-primera-columna', '--tabla-impar', '--tabla-par')
+        estilo = ' style="' + '; '.join(f'{v}: {c}' for v, c in zip(variables_css, colores)) + '"'
+    lineas = [f'<div class="table-responsive"><table class="{clases}"{estilo}>',
+              f'<caption>{escape(titulo)}</caption>',
+              '<thead><tr>' + ''.join(f'<th scope="col">{escape(str(e))}</th>' for e in encabezados) + '</tr></thead>',
+              '<tbody>']
+    for fila in filas:
+        lineas.append('<tr>' + ''.join(f'<td>{escape(str(celda))}</td>' for celda in fila) + '</tr>')
+    lineas.append('</tbody></table></div>')
+    return '\n'.join(lineas)
+
+# Variantes de cada imagen del informe: ancho en píxeles de la miniatura, la
+# versión de pantalla y la de impresión (sin superar el ancho original)
+ANCHOS_IMAGENES = {'miniatura': 480, 'pantalla': 1200, 'impresion': 2400}
+TAMANOS_IMAGENES = '(min-width: 768px) 50vw, 100vw'
+CALIDAD_IMAGENES = {'avif': {'quality': 60, 'speed': 8}, 'webp': {'quality': 80, 'method': 4},
+                    'png': {'optimize': True}, 'jpeg': {'quality': 82, 'optimize': True, 'progressive': True}}
+
+def variantes_imagen(ruta):
+    """
+    Genera en <carpeta de la imagen>/web/ las variantes de una imagen del
+    informe: cada ancho de ANCHOS_IMAGENES en WebP y AVIF (si Pillow lo
+    soporta), más una versión de pantalla en el formato original como
+    respaldo. Las variantes más recientes que la imagen no se regeneran.
+    
+    Devuelve ({formato: [(ruta, ancho), ...]}, ruta de respaldo, (ancho, alto)
+    de la versión de pantalla).
+    """
+    from PIL import Image, features
+    
+    base, extension = os.path.splitext(ruta)
+    carpeta = os.path.join(os.path.dirname(ruta), 'web')
+    nombre = os.path.basename(base)
+    formato_respaldo = 'jpeg' if extension.lower() in ('.jpg', '.jpeg') else 'png'
+    formatos = (['avif'] if features.check('avif') else []) + ['webp']
+    
+    with Image.open(ruta) as imagen:
+        ancho_original, alto_original = imagen.size
+        anchos = sorted({min(ancho, ancho_original) for ancho in ANCHOS_IMAGENES.values()})
+        ancho_pantalla = min(ANCHOS_IMAGENES['pantalla'], ancho_original)
+        
+        # Tareas (ruta de la variante, formato, ancho) que faltan o están desactualizadas
+        variantes = {formato: [(os.path.join(carpeta, f'{nombre}-{ancho}.{formato}'), ancho) for ancho in anchos]
+                     for formato in formatos}
+        respaldo = os.path.join(carpeta, f"{nombre}-{ancho_pantalla}.{'jpg' if formato_respaldo == 'jpeg' else 'png'}")
+        tareas = [(destino, formato, ancho) for formato in formatos for destino, ancho in variantes[formato]]
+        tareas.append((respaldo, formato_respaldo, ancho_pantalla))
+        modificacion = os.path.getmtime(ruta)
+        tareas = [tarea for tarea in tareas
+                  if not os.path.exists(tarea[0]) or os.path.getmtime(tarea[0]) < modificacion]
+        
+        if tareas:
+            os.makedirs(carpeta, exist_ok=True)
+            if formato_respaldo == 'jpeg' and imagen.mode != 'RGB':
+                imagen = imagen.convert('RGB')
+            reducidas = {}
+            for destino, formato, ancho in tareas:
+                if ancho not in reducidas:
+                    reducidas[ancho] = imagen if ancho == ancho_original else imagen.resize(
+                        (ancho, round(alto_original * ancho / ancho_original)), Image.LANCZOS)
+                _guardar_atomico(destino, lambda f: reducidas[ancho].save(f, formato.upper(),
+                                                                          **CALIDAD_IMAGENES[formato]))
+    
+    return variantes, respaldo, (ancho_pantalla, round(alto_original * ancho_pantalla / ancho_original))
+
+def imagen_responsiva_html(src, atributos, carpeta):
+    """
+    Código HTML de un <picture> con las variantes de la imagen `src`
+    (relativa a `carpeta`): srcset por formato, dimensiones explícitas y
+    carga diferida. Conserva los demás atributos de la etiqueta <img>
+    original y guarda su ruta en data-original.
+    """
+    variantes, respaldo, (ancho, alto) = variantes_imagen(os.path.join(carpeta, src))
+    
+    def relativa(ruta):
+        # Codificada como URL: los espacios separarían las entradas de srcset
+        from urllib.parse import quote
+        return quote(os.path.relpath(ruta, carpeta).replace(os.sep, '/'))
+    
+    lineas = ['<picture class="imagen-informe">']
+    for formato, rutas in variantes.items():
+        srcset = ', '.join(f'{relativa(ruta)} {ancho_variante}w' for ruta, ancho_variante in rutas)
+        lineas.append(f'<source type="image/{formato}" srcset="{srcset}" sizes="{TAMANOS_IMAGENES}">')
+    ampliada = relativa(variantes['webp'][-1][0])
+    lineas.append(f'<img src="{relativa(respaldo)}" width="{ancho}" height="{alto}" loading="lazy" '
+                  f'decoding="async" data-ampliada="{ampliada}" data-original="{src}"{atributos}>')
+    lineas.append('</picture>')
+    return '\n'.join(lineas)
+
+def grafico_interactivo_html(paquete, nombre, titulo):
+    """
+    Código HTML del lienzo donde script.js dibuja el gráfico `nombre` del
+    paquete `paquete` (ruta relativa al informe).
+    """
+    from html import escape
+    return (f'<figure class="grafico-interactivo" data-paquete="{escape(paquete)}" data-grafico="{escape(nombre)}">'
+            f'<canvas role="img" aria-label="{escape(titulo)}"></canvas></figure>')
+
+def paquetes_html(paquetes):
+    """
+    Paquetes de datos de los gráficos interactivos incrustados en el informe,
+    para que se dibujen también al abrirlo como archivo local.
+    """
+    from html import escape
+    bloques = []
+    for ruta, graficos in paquetes.items():
+        # '</' se escapa para que el JSON no pueda cerrar la etiqueta <script>
+        datos = json.dumps(graficos, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        bloques.append(f'<script type="application/json" class="paquete-graficos" '
+                       f'data-paquete="{escape(ruta)}">{datos}</script>')
+    return '\n'.join(bloques)
+
+def generar_informe_html(plantilla='informe_hidrologico.html', ruta_salida=None, imagenes=True):
+    """
+    Escribe las tablas registradas y las imágenes optimizadas directamente en
+    el informe HTML.
+    
+    Cada <img> de la plantilla cuya ruta (sin extensión, relativa a la carpeta
+    del informe) corresponde a una tabla registrada se reemplaza por la tabla
+    HTML, entre comentarios <!-- tabla: ruta --> y <!-- /tabla --> que
+    conservan también la etiqueta <img> original para que las siguientes
+    ejecuciones la actualicen o la restauren. Con `imagenes`, las demás
+    imágenes locales se reemplazan por un <picture> con variantes de varios
+    tamaños (ver imagen_responsiva_html). Las tablas, gráficos interactivos
+    y <picture> que no se generan en esta ejecución vuelven a su <img>
+    original, de modo que el informe solo depende de las opciones actuales.
+    Por defecto el informe se reescribe en el mismo archivo. Devuelve el
+    número de tablas e imágenes escritas.
+    """
+    import re
+    ruta_salida = plantilla if ruta_salida is None else ruta_salida
+    carpeta = os.path.dirname(os.path.abspath(plantilla))
+    def relativa(ruta):
+        return os.path.relpath(os.path.abspath(ruta), carpeta).replace(os.sep, '/')
+    
+    tablas = {relativa(ruta): codigo for ruta, codigo in _informe['tablas'].items()}
+    graficos = {relativa(ruta): grafico_interactivo_html(relativa(paquete), nombre, titulo)
+                for ruta, (paquete, nombre, titulo) in _informe['graficos'].items()}
+    
+    with open(plantilla, encoding='utf-8') as f:
+        contenido = f.read()
+    
+    escritas = {'tablas': 0, 'graficos': 0, 'imagenes': 0}
+    def reemplazar(coincidencia):
+        if coincidencia.group('paquetes') is not None:
+            return coincidencia.group(0)
+        # Etiqueta <img> original: la de la plantilla, la guardada en el bloque
+        # de una tabla o gráfico, o la reconstruida desde un <picture>
+        if coincidencia.group('tabla'):
+            original = coincidencia.group('img_tabla')
+            if original is None:
+                return coincidencia.group(0)  # Bloque sin la etiqueta original: se conserva
+        elif coincidencia.group('original'):
+            original = f'<img src="{coincidencia.group("original")}"{coincidencia.group("atributos_original")}>'
+        else:
+            original = coincidencia.group(0)
+        img = re.match(r'<img src="(?P<src>[^"]+)"(?P<atributos>[^>]*)>', original)
+        src = img.group('src')
+        clave = os.path.splitext(src)[0]
+        
+        if clave in tablas or clave in graficos:
+            escritas['tablas' if clave in tablas else 'graficos'] += 1
+            codigo = tablas[clave] if clave in tablas else graficos[clave]
+            return f'<!-- tabla: {clave} -->\n<!-- original: {original} -->\n{codigo}\n<!-- /tabla -->'
+        if not imagenes or not os.path.isfile(os.path.join(carpeta, src)):
+            return original
+        escritas['imagenes'] += 1
+        return imagen_responsiva_html(src, img.group('atributos'), carpeta)
+    
+    patron = re.compile(r'<!-- paquetes -->(?P<paquetes>.*?)<!-- /paquetes -->'
+                        r'|<!-- tabla: (?P<tabla>[^ ]+) -->(?:\s*<!-- original: (?P<img_tabla><img [^>]*>) -->)?'
+                        r'.*?<!-- /tabla -->'
+                        r'|<picture class="imagen-informe">.*?<img [^>]*?data-original="(?P<original>[^"]+)"'
+                        r'(?P<atributos_original>[^>]*)>\s*</picture>'
+                        r'|<img src="(?P<src>[^"]+)"(?P<atributos>[^>]*)>', re.S)
+    contenido = patron.sub(reemplazar, contenido)
+    
+    # Paquetes de los gráficos interactivos, al final del cuerpo del informe
+    # (sin gráficos interactivos en esta ejecución se quitan los anteriores)
+    if _informe['paquetes']:
+        paquetes = {relativa(ruta): graficos for ruta, graficos in _informe['paquetes'].items()}
+        bloque = f'<!-- paquetes -->\n{paquetes_html(paquetes)}\n<!-- /paquetes -->'
+        if '<!-- paquetes -->' in contenido:
+            contenido = re.sub(r'<!-- paquetes -->.*?<!-- /paquetes -->', lambda _: bloque, contenido, flags=re.S)
+        else:
+            contenido = contenido.replace('</body>', f'{bloque}\n</body>', 1)
+    else:
+        contenido = re.sub(r'<!-- paquetes -->.*?<!-- /paquetes -->\n?', '', contenido, flags=re.S)
+    
+    _guardar_atomico(ruta_salida, lambda f: f.write(contenido.encode('utf-8')))
+    print(f"Informe HTML: {escritas['tablas']} tablas, {escritas['graficos']} gráficos interactivos y "
+          f"{escritas['imagenes']} imágenes escritas en {ruta_salida}")
+    return sum(escritas.values())
+
+# Análisis por lotes de varias estaciones
+
+def manifiesto_estaciones(entrada):
+    """
+    Tabla de las estaciones de `entrada` (ver leer_estaciones), con columnas
+    'estacion' y 'ruta' y las opcionales del manifiesto.
+    """
+    if os.path.isdir(entrada):
+        archivos = sorted(f for f in os.listdir(entrada) if f.lower().endswith('.csv'))
+        return pd.DataFrame({'estacion': [os.path.splitext(f)[0] for f in archivos],
+                             'ruta': [os.path.join(entrada, f) for f in archivos]})
+    manifiesto = pd.read_csv(entrada, dtype=str)
+    base = os.path.dirname(entrada)
+    manifiesto['ruta'] = [ruta if os.path.isabs(ruta) else os.path.join(base, ruta)
+                          for ruta in manifiesto['ruta']]
+    return manifiesto
+
+def leer_estaciones(entrada, variable, errores=None):
+    """
+    Lee las series de varias estaciones de una variable como una tabla larga
+    con columnas 'estacion', 'Fecha' y 'Valor'.
+    
+    entrada: un directorio (cada .csv es una estación, identificada por el
+    nombre del archivo) o un manifiesto CSV con columnas 'estacion' y 'ruta'
+    y, opcionalmente, 'formato', 'col_fecha' y 'col_valor'. Lo que no indique
+    el manifiesto se toma de la entrada de la variable en VARIABLES. Las
+    rutas relativas del manifiesto se resuelven desde su carpeta.
+    
+    Las estaciones que no se pueden leer se omiten; si se pasa `errores`
+    (un diccionario) se registra en él el mensaje de cada una.
+    """
+    partes = []
+    for estacion, fuente in fuentes_estaciones(entrada, variable):
+        try:
+            serie = leer_serie(fuente)
+        except Exception as e:
+            _error_estacion(estacion, fuente, e, errores)
+            continue
+        partes.append(pd.DataFrame({'estacion': estacion, 'Fecha': serie.index, 'Valor': serie.to_numpy()}))
+    
+    if not partes:
+        raise ValueError(f"No se pudo leer ninguna estación de {entrada}")
+    return pd.concat(partes, ignore_index=True)
+
+def sketches_estaciones(entrada, variable, errores=None):
+    """
+    Sketches mensuales de cada estación de `entrada` (ver leer_estaciones)
+    leyendo cada archivo por bloques, sin cargar ninguna serie completa
+    (modo de cuantiles aproximados).
+    
+    Devuelve el diccionario estación -> sketches y la tabla del periodo de
+    registro de cada estación (como periodo_estaciones).
+    """
+    sketches, periodos = {}, []
+    for estacion, fuente in fuentes_estaciones(entrada, variable):
+        periodo = {'estacion': estacion}
+        try:
+            sketches[estacion] = sketches_mensuales_desde_fuente(fuente, periodo=periodo)
+        except Exception as e:
+            _error_estacion(estacion, fuente, e, errores)
+            continue
+        periodos.append(periodo)
+    
+    if not sketches:
+        raise ValueError(f"No se pudo leer ninguna estación de {entrada}")
+    return sketches, pd.DataFrame(periodos, columns=['estacion', 'fecha_inicial', 'fecha_final'])
+
+def fuentes_estaciones(entrada, variable):
+    """
+    Pares (estación, fuente de datos) de las estaciones de `entrada` (ver
+    leer_estaciones).
+    """
+    for fila in manifiesto_estaciones(entrada).to_dict('records'):
+        fuente = dict(VARIABLES[variable])
+        fuente.update({clave: valor for clave, valor in fila.items()
+                       if clave in ('ruta', 'formato', 'col_fecha', 'col_valor') and pd.notna(valor)})
+        yield str(fila['estacion']), fuente
+
+def _error_estacion(estacion, fuente, error, errores):
+    print(f"  Error leyendo la estación {estacion} ({fuente['ruta']}): {error}")
+    if errores is not None:
+        errores[estacion] = f'{type(error).__name__}: {error}'
+
+def estadisticas_desde_sketches_estaciones(sketches):
+    """
+    Estadísticas descriptivas de cada estación a partir de sus sketches
+    mensuales, como la tabla de calcular_estadisticas(..., por='estacion').
+    """
+    return pd.DataFrame([{'estacion': estacion, **estadisticas_desde_sketches_mensuales(por_mes)}
+                         for estacion, por_mes in sketches.items()])
+
+def periodo_estaciones(datos):
+    """
+    Fecha inicial y final del registro de cada estación.
+    """
+    return datos.groupby('estacion')['Fecha'].agg(fecha_inicial='min', fecha_final='max').reset_index()
+
+def resumen_estaciones(periodo, estadisticas, errores=None):
+    """
+    Tabla resumen con una fila por estación: periodo de registro (ver
+    periodo_estaciones), estadísticas descriptivas y estado ('ok', o el
+    error de las estaciones de `errores` que no se pudieron leer, con el
+    resto de columnas vacías).
+    """
+    resumen = periodo.merge(estadisticas, on='estacion', how='left').assign(estado='ok')
+    if errores:
+        # Las columnas enteras admiten valores vacíos para no pasar a float
+        enteras = {col: 'Int64' for col, tipo in resumen.dtypes.items() if pd.api.types.is_integer_dtype(tipo)}
+        fallidas = pd.DataFrame({'estacion': list(errores), 'estado': list(errores.values())})
+        resumen = pd.concat([resumen, fallidas], ignore_index=True).astype(enteras)
+    return resumen
+
+def guardar_resumen_estaciones(ruta, periodo, estadisticas, errores=None):
+    """
+    Escribe la tabla resumen de las estaciones (ver resumen_estaciones) en `ruta`.
+    """
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    resumen_estaciones(periodo, estadisticas, errores).to_csv(ruta, index=False)
+    print(f"  Tabla resumen guardada en {ruta}")
+
+def regimenes_estaciones(datos, promedio_de_promedios=True):
+    """
+    Regímenes mensual, trimestral y anual de todas las estaciones, en una
+    sola pasada agrupada por 'estacion'.
+    """
+    return regimenes_desde_agregados(agregar_multiresolucion(datos, 'Fecha', 'Valor', por='estacion'),
+                                     promedio_de_promedios, por='estacion')
+
+def estadisticas_por_mes_estaciones(datos):
+    """
+    Estadísticas de cada (estación, mes), en una sola pasada.
+    """
+    return calcular_estadisticas_agrupadas(datos.assign(mes=datos['Fecha'].dt.month),
+                                           'Valor', ['estacion', 'mes'])
+
+def separar_por_estacion(tabla):
+    """
+    Separa en una sola pasada una tabla agrupada por 'estacion' (como
+    columna o como primer nivel del índice) en un diccionario estación ->
+    filas de esa estación, sin la columna o el nivel.
+    """
+    if 'estacion' in tabla.columns:
+        return {str(estacion): filas.drop(columns='estacion').reset_index(drop=True)
+                for estacion, filas in tabla.groupby('estacion', sort=False)}
+    return {str(estacion): filas.droplevel('estacion')
+            for estacion, filas in tabla.groupby(level='estacion', sort=False)}
+
+def _de_estacion(estacion, grupos):
+    """
+    Filas de una estación en un diccionario de separar_por_estacion. Si la
+    estación no tiene filas (por ejemplo, porque no se pudo leer su archivo)
+    se lanza ValueError.
+    """
+    if estacion not in grupos:
+        raise ValueError(f"La estación {estacion} no tiene datos")
+    return grupos[estacion]
+
+def _regimenes_de_estacion(estacion, regimenes):
+    return tuple(_de_estacion(estacion, grupos) for grupos in regimenes)
+
+def _estadisticas_de_estacion(estacion, estadisticas):
+    return _fila_a_estadisticas(_de_estacion(estacion, estadisticas).iloc[0])
+
+def _resumen_de_estacion(estacion, por_mes):
+    return {meses[mes - 1]: _fila_a_estadisticas(fila)
+            for mes, fila in _de_estacion(estacion, por_mes).iterrows()}, None
+
+def _resumen_sketches_de_estacion(estacion, sketches):
+    return resumen_desde_sketches(_de_estacion(estacion, sketches))
+
+def nodos_lote(variable, entrada, dir_salida=None, etapas=ETAPAS):
+    """
+    Declara los nodos del análisis de regímenes y estadístico de todas las
+    estaciones de un directorio o manifiesto (ver leer_estaciones).
+    
+    Los regímenes, estadísticas, intervalos de clase y estadísticas por mes
+    de todas las estaciones se calculan juntos con operaciones agrupadas por
+    'estacion', y cada tabla se separa una sola vez por estación (ver
+    separar_por_estacion). Cada estación tiene luego sus propios nodos (sus
+    resultados y un nodo por figura, según las etapas, en
+    <dir_salida>/<estacion>/), de modo que el error de una estación no
+    impide las figuras de las demás. También se declara la tabla resumen
+    <variable>_resumen_estaciones.csv, en la que las estaciones que no se
+    pudieron leer figuran con su error. Por defecto dir_salida es
+    <DIR_FIGURAS>/estaciones.
+    
+    En modo de cuantiles aproximados cada archivo se lee por bloques para
+    sus sketches mensuales (ver sketches_estaciones).
+    """
+    spec = VARIABLES[variable]
+    dir_salida = os.path.join(DIR_FIGURAS, 'estaciones') if dir_salida is None else dir_salida
+    parcial = functools.partial
+    clave = f'lote:{variable}'
+    aproximados = _cuantiles_aproximados['activo']
+    errores = {}
+    
+    def leer():
+        errores.clear()
+        datos = leer_estaciones(entrada, variable, errores)
+        print(f"  {datos['estacion'].nunique()} estaciones, {len(datos)} registros")
+        return datos
+    
+    def separar(nombre, entrada):
+        return agregar_nodo(f'{nombre}_por_estacion:{clave}', separar_por_estacion, [entrada])
+    
+    # 1. Cálculos de todas las estaciones en una sola pasada. En modo de
+    # cuantiles aproximados las estadísticas, el periodo de registro y las
+    # estadísticas por mes salen de los sketches de cada estación, y las
+    # series completas solo se leen si alguna etapa las necesita
+    datos = datos_por_estacion = None
+    if not aproximados or set(etapas) & {'regimenes', 'intervalos', 'frecuencia'}:
+        datos = agregar_nodo(f'datos:{clave}', leer)
+    if aproximados:
+        sketches = agregar_nodo(f'sketches:{clave}', lambda: sketches_estaciones(entrada, variable, errores))
+        estadisticas = agregar_nodo(f'estadisticas:{clave}',
+                                    lambda sketches: estadisticas_desde_sketches_estaciones(sketches[0]), [sketches])
+        periodo = agregar_nodo(f'periodo:{clave}', lambda sketches: sketches[1], [sketches])
+    else:
+        estadisticas = agregar_nodo(f'estadisticas:{clave}', parcial(calcular_estadisticas, valor_col='Valor',
+                                                                     por='estacion'), [datos])
+        periodo = agregar_nodo(f'periodo:{clave}', periodo_estaciones, [datos])
+    if 'frecuencia' in etapas or ('cajas' in etapas and not aproximados):
+        datos_por_estacion = separar('datos', datos)
+    if 'descriptivas' in etapas:
+        estadisticas_por_estacion = separar('estadisticas', estadisticas)
+    if 'regimenes' in etapas:
+        regimenes = agregar_nodo(f'regimenes:{clave}',
+                                 lambda datos: tuple(map(separar_por_estacion, regimenes_estaciones(
+                                     datos, spec['promedio_de_promedios']))),
+                                 [datos])
+    if 'intervalos' in etapas:
+        intervalos = separar('intervalos', agregar_nodo(
+            f'intervalos:{clave}', parcial(calcular_intervalos_clase, valor_col='Valor', por='estacion'), [datos]))
+    if 'cajas' in etapas and aproximados:
+        por_mes = agregar_nodo(f'sketches_por_estacion:{clave}', lambda sketches: sketches[0], [sketches])
+    elif 'cajas' in etapas:
+        por_mes = separar('por_mes', agregar_nodo(f'por_mes:{clave}', estadisticas_por_mes_estaciones, [datos]))
+    
+    # 2. Tabla resumen de todas las estaciones
+    ruta_resumen = os.path.join(dir_salida, f'{variable}_resumen_estaciones.csv')
+    agregar_nodo(os.path.splitext(ruta_resumen)[0],
+                 lambda periodo, estadisticas: guardar_resumen_estaciones(ruta_resumen, periodo, estadisticas,
+                                                                          errores),
+                 [periodo, estadisticas], [ruta_resumen])
+    
+    # 3. Resultados y figuras de cada estación a partir de los resultados agrupados
+    for estacion in manifiesto_estaciones(entrada)['estacion'].astype(str):
+        prefijo = os.path.join(dir_salida, estacion, variable)
+        sufijo = f' - Estación {estacion}'
+        clave_estacion = f'{clave}:{estacion}'
+        
+        datos_estacion = estadisticas_estacion = intervalos_estacion = resumen = None
+        if datos_por_estacion:
+            datos_estacion = agregar_nodo(f'datos:{clave_estacion}', parcial(_de_estacion, estacion),
+                                          [datos_por_estacion])
+        if 'regimenes' in etapas:
+            nodos_figuras_regimenes(spec, agregar_nodo(f'regimenes:{clave_estacion}',
+                                                       parcial(_regimenes_de_estacion, estacion), [regimenes]),
+                                    prefijo, sufijo)
+        
+        if 'descriptivas' in etapas:
+            estadisticas_estacion = agregar_nodo(f'estadisticas:{clave_estacion}',
+                                                 parcial(_estadisticas_de_estacion, estacion),
+                                                 [estadisticas_por_estacion])
+        if 'intervalos' in etapas:
+            intervalos_estacion = agregar_nodo(f'intervalos:{clave_estacion}', parcial(_de_estacion, estacion),
+                                               [intervalos])
+        if 'cajas' in etapas:
+            resumen = agregar_nodo(f'resumen_mensual:{clave_estacion}',
+                                   parcial(_resumen_sketches_de_estacion if aproximados else _resumen_de_estacion,
+                                           estacion), [por_mes])
+        nodos_figuras_estadisticas(spec, prefijo, spec['titulo'] + sufijo, etapas, datos_estacion,
+                                   estadisticas_estacion, intervalos_estacion, resumen)
+
+def analizar_lote(variable, entrada, dir_salida=None, etapas=ETAPAS):
+    """
+    Análisis de regímenes y estadístico de todas las estaciones de un
+    directorio o manifiesto (ver nodos_lote). Devuelve el estado de cada
+    nodo (ver ejecutar_grafo).
+    """
+    print(f"Analizando estaciones de {VARIABLES[variable]['nombre']} ({entrada})...")
+    nodos_lote(variable, entrada, dir_salida, etapas)
+    return ejecutar_grafo()
 
 # Función principal
 if __name__ == "__main__":
-    # Ejecutar las funciones de análisis básico
-    #analizar_caudal()
-    analizar_temperatura()
-    analizar_humedad()
-    analizar_evaporacion()
-    analizar_precipitacion()
-    
-    # Crear gráfico comparativo
-    crear_grafico_comparativo()
-    
-    # Ejecutar los análisis estadísticos
-    analizar_estadisticas_caudal()
-    analizar_estadisticas_temperatura()
-    analizar_estadisticas_humedad()
-    analizar_estadisticas_evaporacion()
-    analizar_estadisticas_precipitacion()
-    
-    print("Análisis hidrológico completado. Revise la carpeta 'figuras' para ver los resultados.") 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Análisis hidrológico de regímenes')
+    parser.add_argument('--variables', nargs='+', choices=list(VARIABLES), metavar='VARIABLE',
+                        help=f'Variables a analizar (por defecto todas): {", ".join(VARIABLES)}')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, metavar='ETAPA',
+                        help=f'Etapas a ejecutar (por defecto todas): {", ".join(ETAPAS)}')
+    parser.add_argument('--perfil', choices=list(PERFILES_SALIDA),
+                        help='Perfil de salida: borrador (100 dpi, layout rápido), pantalla (PNG de 150 dpi) '
+                             'o impresion (PDF vectorial con los puntos atípicos rasterizados)')
+    parser.add_argument('--dpi', type=int,
+                        help=f'Resolución de las figuras (por defecto {DPI_FIGURAS} o la del perfil)')
+    parser.add_argument('--formato', choices=('png', 'svg', 'pdf'),
+                        help=f'Formato de las figuras (por defecto {FORMATO_FIGURAS} o el del perfil)')
+    parser.add_argument('--compresion-png', type=int, choices=range(10), metavar='0-9',
+                        help=f'Nivel de compresión de los PNG (por defecto {COMPRESION_PNG} o el del perfil)')
+    parser.add_argument('--salida', default=DIR_FIGURAS,
+                        help=f'Carpeta de salida de las figuras (por defecto {DIR_FIGURAS})')
+    parser.add_argument('--datos', default=DIR_DATOS,
+                        help='Carpeta base de las rutas de datos de VARIABLES (por defecto la actual)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Número de procesos para generar las figuras en paralelo (por defecto 1)')
+    parser.add_argument('--layout-rapido', action='store_true',
+                        help='Guardar los gráficos de barras y líneas con márgenes fijos, sin recortar la figura')
+    parser.add_argument('--sin-cache', action='store_true',
+                        help='Volver a parsear los datos y regenerar todas las figuras aunque no hayan cambiado')
+    parser.add_argument('--reanudar', action='store_true',
+                        help='Repetir solo las figuras, tablas y archivos que fallaron o faltan en la ejecución anterior')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Calcular los regímenes procesando solo las filas nuevas de cada archivo')
+    parser.add_argument('--lote', metavar='ENTRADA',
+                        help='Analizar varias estaciones: directorio de archivos .csv o manifiesto CSV (estacion, ruta)')
+    parser.add_argument('--variable-lote', default='caudal', choices=list(VARIABLES),
+                        help='Variable registrada cuyas columnas, unidades y títulos usa el modo por lotes')
+    parser.add_argument('--salida-lote',
+                        help='Carpeta de salida del modo por lotes (por defecto <salida>/estaciones)')
+    parser.add_argument('--cuantiles-aproximados', action='store_true',
+                        help='Estadísticas descriptivas y mensuales y diagramas de cajas con sketches de cuantiles '
+                             'de memoria acotada, leyendo los archivos por bloques')
+    parser.add_argument('--informe', nargs='?', const='informe_hidrologico.html', metavar='HTML',
+                        help='Escribir las tablas como HTML en el informe (por defecto informe_hidrologico.html) '
+                             'en lugar de dibujarlas')
+    parser.add_argument('--informe-salida', metavar='HTML',
+                        help='Archivo donde escribir el informe generado (por defecto el mismo informe)')
+    parser.add_argument('--interactivo', action='store_true',
+                        help='Exportar regímenes, cajas y frecuencias como paquetes JSON que script.js dibuja '
+                             'en el navegador, en lugar de imágenes')
+    parser.add_argument('--informe-sin-imagenes', action='store_true',
+                        help='No generar las variantes optimizadas (WebP/AVIF, varios tamaños) de las imágenes del informe')
+    parser.add_argument('--solo-datos', nargs='?', const='csv', choices=FORMATOS_DATOS, metavar='FORMATO',
+                        help='Exportar los resultados como datos (csv, json o parquet; por defecto csv) sin generar figuras')
+    parser.add_argument('--reporte', nargs='?', const='', metavar='JSON',
+                        help='Medir cada etapa (tiempo, CPU, memoria, filas y bytes escritos) y escribir el reporte '
+                             'de la ejecución (por defecto <salida>/reporte_ejecucion.json)')
+    parser.add_argument('--flamegraph', metavar='ARCHIVO',
+                        help='Escribir además el tiempo de cada etapa como pilas colapsadas para flamegraph '
+                             '(implica --reporte)')
+    args = parser.parse_args()
+    
+    configurar_salida(args.salida, args.datos, args.dpi, args.formato, args.perfil, args.compresion_png)
+    variables = args.variables or list(VARIABLES)
+    etapas = args.etapas or ETAPAS
+    
+    if args.layout_rapido:
+        activar_layout_rapido()
+    if args.incremental:
+        activar_modo_incremental()
+    if args.cuantiles_aproximados:
+        activar_cuantiles_aproximados()
+    if args.informe:
+        activar_informe_html()
+    if args.interactivo:
+        activar_graficos_interactivos()
+    if args.solo_datos:
+        try:
+            activar_modo_datos(args.solo_datos)
+        except ImportError as e:
+            parser.error(str(e))
+    if args.reporte == '' or (args.flamegraph and args.reporte is None):
+        args.reporte = os.path.join(DIR_FIGURAS, 'reporte_ejecucion.json')
+    if args.reporte:
+        activar_instrumentacion()
+    
+    if args.sin_cache:
+        desactivar_cache_render()
+        desactivar_cache_series()
+    if args.jobs > 1:
+        iniciar_modo_paralelo()
+    
+    # Cada cálculo y cada figura, tabla o archivo de datos es un nodo del grafo
+    # de tareas: un error se registra en su nodo (y en los que dependen de él)
+    # sin detener a los demás
+    if args.lote:
+        # Análisis por lotes de varias estaciones de una variable
+        print(f"Analizando estaciones de {VARIABLES[args.variable_lote]['nombre']} ({args.lote})...")
+        nodos_lote(args.variable_lote, args.lote, args.salida_lote, etapas)
+    else:
+        # Regímenes: sin selección explícita, solo las variables con 'regimenes' activo
+        if 'regimenes' in etapas:
+            for variable in variables:
+                if args.variables or VARIABLES[variable]['regimenes']:
+                    nodos_regimenes(variable)
+        
+        # Gráfico comparativo: con una selección de variables solo si se pide
+        # la etapa explícitamente (y entonces en un archivo aparte)
+        if 'comparativo' in etapas and (not args.variables or args.etapas):
+            nodos_grafico_comparativo(variables)
+        
+        # Análisis estadísticos
+        if set(etapas) & {'descriptivas', 'intervalos', 'cajas', 'frecuencia'}:
+            for variable in variables:
+                nodos_estadisticas(variable, etapas)
+    
+    estados = ejecutar_grafo(args.reanudar)
+    
+    if args.jobs > 1:
+        # Cada proceso mide sus figuras y devuelve los registros con la pila de
+        # etapas en que se programaron (ver _ejecutar_tarea_render)
+        marcar_fallos_render(estados, ejecutar_renders_en_paralelo(args.jobs))
+    
+    guardar_cache_render()
+    fallidos = guardar_estado_tareas(estados)
+    
+    if args.interactivo:
+        with etapa('graficos_interactivos'):
+            guardar_graficos_interactivos()
+    if args.informe:
+        with etapa('informe'):
+            generar_informe_html(args.informe, args.informe_salida, not args.informe_sin_imagenes)
+    if args.reporte:
+        guardar_reporte_ejecucion(args.reporte, args.flamegraph)
+    
+    if fallidos:
+        print(f"Análisis hidrológico terminado con {len(fallidos)} tareas con error u omitidas "
+              f"(ver {RUTA_ESTADO_TAREAS}); use --reanudar para repetir solo esas:")
+        for nombre in fallidos:
+            print(f"  {nombre}: {estados[nombre]['error']}")
+        sys.exit(1)
+    print(f"Análisis hidrológico completado. Revise la carpeta '{DIR_FIGURAS}' para ver los resultados.")
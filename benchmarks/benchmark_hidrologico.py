@@ -0,0 +1,329 @@
+"""
+Benchmarks del análisis hidrológico con series sintéticas.
+
+Genera conjuntos de estaciones con el mismo esquema que los archivos reales
+(exportaciones de Google Earth Engine como Datos/*.csv, o archivos IDEAM con
+filas de metadatos como la temperatura mínima) y mide por separado cada etapa
+del proceso: lectura, parseo de fechas, agregación, estadísticas, intervalos
+de clase y render. De cada etapa se guardan el tiempo (mínimo y mediana de varias
+repeticiones) y el pico de memoria, en un JSON por revisión que se puede
+comparar con el de otra revisión para detectar regresiones.
+
+Uso:
+    python benchmarks/benchmark_hidrologico.py
+    python benchmarks/benchmark_hidrologico.py --escenarios grande --frecuencias diaria --formatos csv
+    python benchmarks/benchmark_hidrologico.py --comparar benchmarks/resultados/<revision>.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+import subprocess
+import statistics
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import analisis_hidrologico as ah
+
+# Escenarios: nombre -> (número de estaciones, años de registro)
+ESCENARIOS = {
+    'minimo': (1, 25),
+    'pequeno': (10, 30),
+    'mediano': (100, 40),
+    'grande': (1000, 50),
+}
+
+# Frecuencias de las series sintéticas (alias de pandas)
+FRECUENCIAS = {'mensual': 'MS', 'diaria': 'D', 'horaria': 'h'}
+
+# Formatos de archivo: variable de VARIABLES cuyas columnas se imitan
+FORMATOS = {'csv': 'precipitacion', 'ideam': 'temperatura'}
+
+ETAPAS_BENCHMARK = ('lectura', 'fechas', 'agregacion', 'estadisticas', 'intervalos', 'render')
+
+AÑO_INICIAL = 1970
+
+def generar_valores(rng, fechas, formato):
+    """
+    Valores sintéticos con ciclo anual: precipitación (gamma, con meses secos
+    y lluviosos) para el formato csv y temperatura mínima para el formato
+    IDEAM, este último con un 1 % de datos faltantes como en los archivos reales.
+    """
+    fase = 2 * np.pi * (fechas.month.to_numpy() - 1) / 12
+    if formato == 'csv':
+        return rng.gamma(2.0, 40.0 * (1.2 + np.sin(fase)))
+    valores = 7.5 + 1.5 * np.sin(fase) + rng.normal(0, 0.8, len(fechas))
+    valores[rng.random(len(fechas)) < 0.01] = np.nan
+    return valores
+
+def generar_conjunto(directorio, formato, frecuencia, estaciones, años, semilla=0):
+    """
+    Escribe un archivo por estación en <directorio>/<formato>_<frecuencia>_<estaciones>x<años>/
+    y devuelve esa carpeta. Si el conjunto ya fue generado se reutiliza.
+    """
+    carpeta = os.path.join(directorio, f'{formato}_{frecuencia}_{estaciones}x{años}')
+    marca = os.path.join(carpeta, '.completo')
+    if os.path.exists(marca):
+        return carpeta
+    os.makedirs(carpeta, exist_ok=True)
+
+    fechas = pd.date_range(f'{AÑO_INICIAL}-01-01', f'{AÑO_INICIAL + años}-01-01',
+                           freq=FRECUENCIAS[frecuencia], inclusive='left')
+    spec = ah.VARIABLES[FORMATOS[formato]]
+    if formato == 'csv':
+        # Fechas como en Google Earth Engine ("Jan 1, 2000"); con hora si la serie es horaria
+        formato_fecha = '%Y-%m-%d %H:%M:%S' if frecuencia == 'horaria' else '%b %d, %Y'
+        columnas = {spec['col_fecha']: fechas.strftime(formato_fecha)}
+    else:
+        columnas = {'Fecha': fechas.strftime('%Y-%m-%d'), 'Hora': fechas.strftime('%H:%M')}
+
+    rng = np.random.default_rng(semilla)
+    for i in range(estaciones):
+        valores = generar_valores(rng, fechas, formato)
+        ruta = os.path.join(carpeta, f'estacion_{i:04d}.csv')
+        if formato == 'csv':
+            tabla = pd.DataFrame({**columnas, spec['col_valor']: valores})
+            tabla.to_csv(ruta, index=False, float_format='%.3f')
+        else:
+            tabla = pd.DataFrame({**columnas, 'Valor': valores, 'Grado': 50})
+            with open(ruta, 'w', encoding='utf-8', newline='') as f:
+                f.write(f'Estacion,SINTETICA_{i:04d}\nVariable,TMN_CON\nUnidad,°C\n\n')
+                tabla.to_csv(f, index=False, float_format='%.1f')
+
+    open(marca, 'w').close()
+    return carpeta
+
+def medir(funcion, repeticiones=3, memoria=True):
+    """
+    Ejecuta `funcion` varias veces y devuelve su último resultado, los tiempos
+    de cada repetición y el pico de memoria (bytes, medido con tracemalloc en
+    una ejecución aparte para no alterar los tiempos).
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return resultado, tiempos, pico
+
+def fechas_crudas(fuente):
+    """
+    Columna de fechas de un archivo como texto, sin parsear.
+    """
+    encabezado = 0
+    if fuente['formato'] == 'ideam':
+        with open(fuente['ruta'], 'r', encoding='utf-8') as f:
+            for encabezado, linea in enumerate(f):
+                if linea.startswith(fuente['col_fecha']):
+                    break
+    return pd.read_csv(fuente['ruta'], skiprows=encabezado, usecols=[fuente['col_fecha']],
+                       dtype=str)[fuente['col_fecha']].str.strip()
+
+def etapas_conjunto(carpeta, variable, dir_figuras, etapas=ETAPAS_BENCHMARK):
+    """
+    Funciones de cada etapa sobre un conjunto de estaciones. La lectura parsea
+    siempre los archivos (sin la caché binaria de series), de modo que su
+    tiempo incluye el de la etapa de fechas, que parsea solo las columnas de
+    fechas (leídas como texto antes de medir); el render dibuja el diagrama
+    de cajas y el régimen mensual de la primera estación.
+    """
+    estado = {}
+    if 'fechas' in etapas:
+        estado['fechas'] = [fechas_crudas(fuente) for _, fuente in ah.fuentes_estaciones(carpeta, variable)]
+
+    def lectura():
+        estado['datos'] = ah.leer_estaciones(carpeta, variable)
+        return estado['datos']
+
+    def fechas():
+        return [ah.parsear_fechas(columna) for columna in estado['fechas']]
+
+    def agregacion():
+        return ah.agregar_multiresolucion(estado['datos'], 'Fecha', 'Valor', por='estacion')
+
+    def estadisticas():
+        return ah.calcular_estadisticas(estado['datos'], 'Valor', por='estacion')
+
+    def intervalos():
+        return ah.calcular_intervalos_clase(estado['datos'], 'Valor', por='estacion')
+
+    def render():
+        datos = estado['datos']
+        estacion = datos[datos['estacion'] == datos['estacion'].iloc[0]]
+        spec = ah.VARIABLES[variable]
+        mensual = ah.agregar_por_periodo(estacion, 'Fecha', 'Valor', 'mensual')
+        ah.crear_diagrama_cajas(estacion, 'Fecha', 'Valor', spec['titulo'], 'Mes', spec['ylabel'],
+                                os.path.join(dir_figuras, f'cajas.{ah.FORMATO_FIGURAS}'), spec['color'])
+        ah.crear_grafico(mensual, 'mes', 'Valor', spec['regimen'], 'Mes', spec['ylabel'],
+                         os.path.join(dir_figuras, f'mensual.{ah.FORMATO_FIGURAS}'), 'barras', spec['color'])
+
+    return {'lectura': lectura, 'fechas': fechas, 'agregacion': agregacion, 'estadisticas': estadisticas,
+            'intervalos': intervalos, 'render': render}
+
+def revision_actual():
+    """
+    Revisión de git del repositorio (con '-dirty' si hay cambios sin confirmar),
+    o 'sin-revision' fuera de un repositorio.
+    """
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        cambios = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'sin-revision'
+    return revision + '-dirty' if cambios else revision
+
+def memoria_maxima_proceso():
+    """
+    Memoria residente máxima del proceso en bytes (None si el sistema no la informa).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxima = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxima if sys.platform == 'darwin' else maxima * 1024
+
+def ejecutar(escenarios, frecuencias, formatos, etapas, directorio, repeticiones=3, memoria=True):
+    """
+    Ejecuta las etapas sobre todas las combinaciones de escenario, frecuencia y
+    formato. Devuelve una lista de resultados, uno por (conjunto, etapa).
+    """
+    ah.desactivar_cache_series()
+    ah.desactivar_cache_render()
+    dir_figuras = os.path.join(directorio, 'figuras')
+    os.makedirs(dir_figuras, exist_ok=True)
+
+    resultados = []
+    for escenario in escenarios:
+        estaciones, años = ESCENARIOS[escenario]
+        for frecuencia in frecuencias:
+            for formato in formatos:
+                conjunto = f'{escenario}/{frecuencia}/{formato}'
+                print(f'Generando {conjunto} ({estaciones} estaciones, {años} años)...')
+                carpeta = generar_conjunto(directorio, formato, frecuencia, estaciones, años)
+                funciones = etapas_conjunto(carpeta, FORMATOS[formato], dir_figuras, etapas)
+                # La lectura se ejecuta siempre: las demás etapas usan sus datos
+                filas = len(funciones['lectura']())
+                for etapa in etapas:
+                    _, tiempos, pico = medir(funciones[etapa], repeticiones, memoria)
+                    resultado = {
+                        'conjunto': conjunto, 'etapa': etapa, 'estaciones': estaciones, 'años': años,
+                        'frecuencia': frecuencia, 'formato': formato, 'filas': filas,
+                        'minimo_s': min(tiempos), 'mediana_s': statistics.median(tiempos),
+                        'memoria_pico_mb': None if pico is None else pico / 2**20,
+                    }
+                    resultados.append(resultado)
+                    memoria_texto = '' if pico is None else f'  {resultado["memoria_pico_mb"]:9.1f} MB'
+                    print(f'  {etapa:<13}{filas:>11,} filas  {resultado["mediana_s"]:9.3f} s{memoria_texto}')
+    return resultados
+
+def guardar_resultados(resultados, ruta):
+    """
+    Guarda los resultados con la revisión, la fecha y las versiones usadas.
+    """
+    datos = {
+        'revision': revision_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'versiones': {'numpy': np.__version__, 'pandas': pd.__version__},
+        'memoria_maxima_proceso_mb': (lambda m: None if m is None else m / 2**20)(memoria_maxima_proceso()),
+        'resultados': resultados,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    return datos
+
+def comparar_resultados(resultados, ruta_base, umbral=0.10, minimo_s=0.01):
+    """
+    Compara la mediana de cada (conjunto, etapa) con la de otro archivo de
+    resultados. Es una regresión si el tiempo crece más que `umbral` (fracción)
+    y más de `minimo_s` segundos. Devuelve la lista de regresiones.
+    """
+    with open(ruta_base, 'r', encoding='utf-8') as f:
+        base = json.load(f)
+    anteriores = {(r['conjunto'], r['etapa']): r for r in base['resultados']}
+
+    print(f"\nComparación con {base.get('revision', ruta_base)} (umbral {umbral:.0%}):")
+    regresiones = []
+    for resultado in resultados:
+        anterior = anteriores.get((resultado['conjunto'], resultado['etapa']))
+        if anterior is None:
+            continue
+        antes, ahora = anterior['mediana_s'], resultado['mediana_s']
+        razon = ahora / antes if antes > 0 else float('inf')
+        regresion = razon > 1 + umbral and ahora - antes > minimo_s
+        if regresion:
+            regresiones.append({**resultado, 'mediana_anterior_s': antes, 'razon': razon})
+        print(f"  {resultado['conjunto']:<26}{resultado['etapa']:<13}{antes:9.3f} s -> {ahora:9.3f} s"
+              f"  x{razon:5.2f}{'  REGRESIÓN' if regresion else ''}")
+    return regresiones
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks del análisis hidrológico con series sintéticas')
+    parser.add_argument('--escenarios', nargs='+', choices=list(ESCENARIOS), default=['minimo', 'pequeno'],
+                        help='Escenarios (estaciones x años): ' +
+                             ', '.join(f'{n} ({e}x{a})' for n, (e, a) in ESCENARIOS.items()))
+    parser.add_argument('--frecuencias', nargs='+', choices=list(FRECUENCIAS), default=['mensual', 'diaria'],
+                        help='Frecuencias de las series sintéticas (por defecto mensual y diaria)')
+    parser.add_argument('--formatos', nargs='+', choices=list(FORMATOS), default=list(FORMATOS),
+                        help='Formatos de archivo: csv (Google Earth Engine) e ideam (por defecto ambos)')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS_BENCHMARK, default=list(ETAPAS_BENCHMARK),
+                        help='Etapas a medir (por defecto todas)')
+    parser.add_argument('--repeticiones', type=int, default=3,
+                        help='Repeticiones por etapa; se informan el mínimo y la mediana (por defecto 3)')
+    parser.add_argument('--sin-memoria', action='store_true',
+                        help='No medir el pico de memoria (ahorra una ejecución por etapa)')
+    parser.add_argument('--perfil', choices=list(ah.PERFILES_SALIDA),
+                        help='Perfil de salida de las figuras en la etapa de render')
+    parser.add_argument('--datos-sinteticos',
+                        help='Carpeta donde generar (y reutilizar) los conjuntos sintéticos '
+                             '(por defecto una carpeta temporal)')
+    parser.add_argument('--salida',
+                        help='Archivo JSON de resultados (por defecto benchmarks/resultados/<revision>.json)')
+    parser.add_argument('--comparar', metavar='JSON',
+                        help='Resultados de otra revisión con los que comparar; '
+                             'termina con código 1 si hay regresiones')
+    parser.add_argument('--umbral', type=float, default=0.10,
+                        help='Aumento relativo de tiempo considerado regresión (por defecto 0.10)')
+    args = parser.parse_args()
+
+    if args.perfil:
+        ah.configurar_salida(perfil=args.perfil)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_hidrologico_') as temporal:
+        directorio = args.datos_sinteticos or temporal
+        resultados = ejecutar(args.escenarios, args.frecuencias, args.formatos, args.etapas,
+                              directorio, args.repeticiones, not args.sin_memoria)
+
+    salida = args.salida or os.path.join(RAIZ, 'benchmarks', 'resultados', f'{revision_actual()}.json')
+    guardar_resultados(resultados, salida)
+    print(f'\nResultados guardados en {salida}')
+
+    if args.comparar:
+        regresiones = comparar_resultados(resultados, args.comparar, args.umbral)
+        if regresiones:
+            print(f'\n{len(regresiones)} regresiones de tiempo')
+            sys.exit(1)
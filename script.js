@@ -17,6 +17,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Función para inicializar los eventos de las imágenes
     initImageEvents();
+    
+    // Dibujar los gráficos interactivos, si el informe los incluye
+    inicializarGraficosInteractivos();
 });
 
 // Establecer la fecha actual en formato local
@@ -103,7 +106,7 @@ function agregarEventosTarjetas() {
     tarjetasGraficos.forEach(img => {
         // Al hacer clic en la imagen, mostrarla en tamaño completo
         img.addEventListener('click', function() {
-            const modal = crearModal(this.src, this.alt);
+            const modal = crearModal(this.dataset.ampliada || this.currentSrc || this.src, this.alt);
             document.body.appendChild(modal);
             modalActivo = modal;
             
@@ -125,7 +128,7 @@ function agregarEventosTarjetas() {
             // Crear un retraso corto para evitar que se abra inmediatamente
             tiempoEspera = setTimeout(() => {
                 if (!modalActivo) {
-                    const modal = crearModal(this.src, this.alt);
+                    const modal = crearModal(this.dataset.ampliada || this.currentSrc || this.src, this.alt);
                     document.body.appendChild(modal);
                     modalActivo = modal;
                     
@@ -272,6 +275,248 @@ function marcarSeccionesActivas() {
 // Llamar a la función para marcar secciones activas
 document.addEventListener('DOMContentLoaded', marcarSeccionesActivas);
 
+// Gráficos interactivos: se dibujan en el navegador a partir de los paquetes de
+// datos que genera analisis_hidrologico.py con --interactivo
+const MARGENES_GRAFICO = { izquierda: 70, derecha: 20, arriba: 45, abajo: 60 };
+
+function inicializarGraficosInteractivos() {
+    const figuras = document.querySelectorAll('.grafico-interactivo');
+    if (figuras.length === 0) {
+        return;
+    }
+    
+    // Paquetes incrustados en el informe; los demás se descargan una sola vez
+    const paquetes = {};
+    document.querySelectorAll('script.paquete-graficos').forEach(script => {
+        paquetes[script.dataset.paquete] = Promise.resolve(JSON.parse(script.textContent));
+    });
+    
+    figuras.forEach(figura => {
+        const ruta = figura.dataset.paquete;
+        if (!paquetes[ruta]) {
+            paquetes[ruta] = fetch(ruta).then(respuesta => respuesta.json());
+        }
+        paquetes[ruta].then(graficos => {
+            const grafico = graficos[figura.dataset.grafico];
+            if (grafico) {
+                prepararGrafico(figura.querySelector('canvas'), grafico);
+            }
+        }).catch(error => console.error(`No se pudo cargar el paquete ${ruta}:`, error));
+    });
+}
+
+// Dibujar un gráfico y mostrar el valor bajo el cursor
+function prepararGrafico(lienzo, grafico) {
+    let indiceActivo = null;
+    const dibujar = () => dibujarGrafico(lienzo, grafico, indiceActivo);
+    
+    lienzo.addEventListener('mousemove', function(e) {
+        const indice = indiceEnPosicion(lienzo, grafico, e.offsetX);
+        if (indice !== indiceActivo) {
+            indiceActivo = indice;
+            dibujar();
+        }
+    });
+    lienzo.addEventListener('mouseleave', function() {
+        indiceActivo = null;
+        dibujar();
+    });
+    
+    // Volver a dibujar al cambiar el tamaño (también hace el primer dibujo)
+    new ResizeObserver(dibujar).observe(lienzo);
+}
+
+// Índice de la categoría del eje x en la posición horizontal indicada
+function indiceEnPosicion(lienzo, grafico, x) {
+    const anchoArea = lienzo.clientWidth - MARGENES_GRAFICO.izquierda - MARGENES_GRAFICO.derecha;
+    const indice = Math.floor((x - MARGENES_GRAFICO.izquierda) / (anchoArea / grafico.x.length));
+    return indice >= 0 && indice < grafico.x.length ? indice : null;
+}
+
+// Marcas "redondas" del eje y entre minimo y maximo
+function marcasEje(minimo, maximo, cantidad) {
+    const paso0 = (maximo - minimo) / cantidad || 1;
+    const magnitud = Math.pow(10, Math.floor(Math.log10(paso0)));
+    const paso = [1, 2, 2.5, 5, 10].map(f => f * magnitud).find(p => p >= paso0);
+    const marcas = [];
+    for (let v = Math.floor(minimo / paso) * paso; v <= maximo + paso * 1e-9; v += paso) {
+        marcas.push(Number(v.toFixed(10)));
+    }
+    return marcas;
+}
+
+function formatearValor(valor) {
+    return valor === null ? 'N/A' : valor.toLocaleString('es-ES', { maximumFractionDigits: 2 });
+}
+
+function dibujarGrafico(lienzo, grafico, indiceActivo) {
+    const escala = window.devicePixelRatio || 1;
+    const ancho = lienzo.clientWidth;
+    const alto = lienzo.clientHeight;
+    lienzo.width = Math.round(ancho * escala);
+    lienzo.height = Math.round(alto * escala);
+    const ctx = lienzo.getContext('2d');
+    ctx.setTransform(escala, 0, 0, escala, 0, 0);
+    ctx.clearRect(0, 0, ancho, alto);
+    
+    const m = MARGENES_GRAFICO;
+    const anchoArea = ancho - m.izquierda - m.derecha;
+    const altoArea = alto - m.arriba - m.abajo;
+    const n = grafico.x.length;
+    const anchoBanda = anchoArea / n;
+    const xCentro = i => m.izquierda + anchoBanda * (i + 0.5);
+    
+    // Rango del eje y (las barras parten de cero)
+    const valores = grafico.tipo === 'cajas'
+        ? grafico.bigote_inferior.concat(grafico.bigote_superior, grafico.media)
+        : grafico.y;
+    const validos = valores.filter(v => v !== null);
+    let minimo = Math.min(...validos);
+    let maximo = Math.max(...validos);
+    if (grafico.tipo === 'barras') {
+        minimo = Math.min(0, minimo);
+    }
+    const marcas = marcasEje(minimo, maximo, 5);
+    minimo = Math.min(minimo, marcas[0]);
+    maximo = Math.max(maximo, marcas[marcas.length - 1]);
+    const yPixel = v => m.arriba + altoArea * (1 - (v - minimo) / (maximo - minimo || 1));
+    
+    // Fondo, cuadrícula y marcas del eje y
+    ctx.font = '12px sans-serif';
+    ctx.fillStyle = '#f0f0f0';
+    ctx.fillRect(m.izquierda, m.arriba, anchoArea, altoArea);
+    ctx.strokeStyle = 'white';
+    ctx.fillStyle = '#555';
+    ctx.textAlign = 'right';
+    ctx.textBaseline = 'middle';
+    marcas.forEach(v => {
+        ctx.beginPath();
+        ctx.moveTo(m.izquierda, yPixel(v));
+        ctx.lineTo(m.izquierda + anchoArea, yPixel(v));
+        ctx.stroke();
+        ctx.fillText(formatearValor(v), m.izquierda - 6, yPixel(v));
+    });
+    
+    // Etiquetas del eje x, omitiendo algunas si no caben
+    const cadaCuantas = Math.ceil(n / Math.max(1, Math.floor(anchoArea / 45)));
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    grafico.x.forEach((etiqueta, i) => {
+        if (i % cadaCuantas === 0) {
+            ctx.fillText(String(etiqueta), xCentro(i), m.arriba + altoArea + 6);
+        }
+    });
+    
+    // Serie
+    ctx.fillStyle = grafico.color;
+    ctx.strokeStyle = grafico.color;
+    if (grafico.tipo === 'barras') {
+        grafico.y.forEach((v, i) => {
+            if (v === null) {
+                return;
+            }
+            ctx.globalAlpha = indiceActivo === null || indiceActivo === i ? 1 : 0.6;
+            const y0 = yPixel(Math.max(0, minimo));
+            ctx.fillRect(xCentro(i) - anchoBanda * 0.4, Math.min(y0, yPixel(v)), anchoBanda * 0.8, Math.abs(y0 - yPixel(v)));
+        });
+        ctx.globalAlpha = 1;
+    } else if (grafico.tipo === 'lineas') {
+        ctx.lineWidth = 2.5;
+        ctx.beginPath();
+        let enTramo = false;
+        grafico.y.forEach((v, i) => {
+            if (v === null) {
+                enTramo = false;
+                return;
+            }
+            enTramo ? ctx.lineTo(xCentro(i), yPixel(v)) : ctx.moveTo(xCentro(i), yPixel(v));
+            enTramo = true;
+        });
+        ctx.stroke();
+        grafico.y.forEach((v, i) => {
+            if (v !== null) {
+                ctx.beginPath();
+                ctx.arc(xCentro(i), yPixel(v), indiceActivo === i ? 6 : 3.5, 0, 2 * Math.PI);
+                ctx.fill();
+            }
+        });
+    } else if (grafico.tipo === 'cajas') {
+        ctx.lineWidth = 1.5;
+        grafico.x.forEach((_, i) => {
+            const x = xCentro(i);
+            const mitad = anchoBanda * 0.35;
+            ctx.strokeStyle = '#333';
+            ctx.beginPath();
+            ctx.moveTo(x, yPixel(grafico.bigote_inferior[i]));
+            ctx.lineTo(x, yPixel(grafico.q1[i]));
+            ctx.moveTo(x, yPixel(grafico.q3[i]));
+            ctx.lineTo(x, yPixel(grafico.bigote_superior[i]));
+            ctx.moveTo(x - mitad / 2, yPixel(grafico.bigote_inferior[i]));
+            ctx.lineTo(x + mitad / 2, yPixel(grafico.bigote_inferior[i]));
+            ctx.moveTo(x - mitad / 2, yPixel(grafico.bigote_superior[i]));
+            ctx.lineTo(x + mitad / 2, yPixel(grafico.bigote_superior[i]));
+            ctx.stroke();
+            ctx.globalAlpha = indiceActivo === null || indiceActivo === i ? 0.85 : 0.5;
+            ctx.fillStyle = grafico.color;
+            ctx.fillRect(x - mitad, yPixel(grafico.q3[i]), 2 * mitad, yPixel(grafico.q1[i]) - yPixel(grafico.q3[i]));
+            ctx.globalAlpha = 1;
+            ctx.strokeRect(x - mitad, yPixel(grafico.q3[i]), 2 * mitad, yPixel(grafico.q1[i]) - yPixel(grafico.q3[i]));
+            ctx.beginPath();
+            ctx.moveTo(x - mitad, yPixel(grafico.mediana[i]));
+            ctx.lineTo(x + mitad, yPixel(grafico.mediana[i]));
+            ctx.stroke();
+        });
+        // Media de cada mes, como en el diagrama de cajas de matplotlib
+        ctx.strokeStyle = 'red';
+        ctx.fillStyle = 'red';
+        ctx.lineWidth = 2;
+        ctx.beginPath();
+        grafico.media.forEach((v, i) => i === 0 ? ctx.moveTo(xCentro(i), yPixel(v)) : ctx.lineTo(xCentro(i), yPixel(v)));
+        ctx.stroke();
+        grafico.media.forEach((v, i) => {
+            ctx.beginPath();
+            ctx.arc(xCentro(i), yPixel(v), 4, 0, 2 * Math.PI);
+            ctx.fill();
+        });
+    }
+    
+    // Título y nombres de los ejes
+    ctx.fillStyle = '#222';
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'top';
+    ctx.font = 'bold 15px sans-serif';
+    ctx.fillText(grafico.titulo, ancho / 2, 10, ancho - 20);
+    ctx.font = '13px sans-serif';
+    ctx.textBaseline = 'bottom';
+    ctx.fillText(grafico.xlabel, m.izquierda + anchoArea / 2, alto - 8);
+    ctx.save();
+    ctx.translate(16, m.arriba + altoArea / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.textBaseline = 'middle';
+    ctx.fillText(grafico.ylabel, 0, 0);
+    ctx.restore();
+    
+    // Valor bajo el cursor
+    if (indiceActivo !== null) {
+        const i = indiceActivo;
+        const lineas = grafico.tipo === 'cajas'
+            ? [`${grafico.x[i]}`, `Media: ${formatearValor(grafico.media[i])}`, `Mediana: ${formatearValor(grafico.mediana[i])}`,
+               `Q1–Q3: ${formatearValor(grafico.q1[i])} – ${formatearValor(grafico.q3[i])}`,
+               `Bigotes: ${formatearValor(grafico.bigote_inferior[i])} – ${formatearValor(grafico.bigote_superior[i])}`]
+            : [`${grafico.x[i]}: ${formatearValor(grafico.y[i])}`];
+        ctx.font = '12px sans-serif';
+        const anchoCuadro = Math.max(...lineas.map(l => ctx.measureText(l).width)) + 16;
+        const altoCuadro = lineas.length * 16 + 10;
+        const x = Math.min(Math.max(xCentro(i) - anchoCuadro / 2, m.izquierda), ancho - m.derecha - anchoCuadro);
+        ctx.fillStyle = 'rgba(33, 37, 41, 0.85)';
+        ctx.fillRect(x, m.arriba + 4, anchoCuadro, altoCuadro);
+        ctx.fillStyle = 'white';
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'top';
+        lineas.forEach((linea, k) => ctx.fillText(linea, x + 8, m.arriba + 9 + k * 16));
+    }
+}
+
 // Definición de puntos y geometrías
 // Punto del nacimiento del río Bogotá en el Páramo de Guacheneque
 var puntoNacimiento = /* color: #98ff00 */ee.Geometry.Point([-73.52789, 5.23477]);
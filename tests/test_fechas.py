@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analisis_hidrologico as ah
+
+
+def test_fechas_ambiguas_conservan_la_interpretacion_de_pandas():
+    fechas = pd.Series(['01/01/2000', '02/01/2000', '03/01/2000', '12/01/2000'])
+    assert ah.detectar_formato_fecha(fechas) is None
+    assert (ah.parsear_fechas(fechas) == pd.to_datetime(fechas).to_numpy()).all()
+    assert list(pd.DatetimeIndex(ah.parsear_fechas(fechas)).month) == [1, 2, 3, 12]
+
+
+def test_dia_primero_con_algun_dia_mayor_que_12():
+    fechas = pd.Series(['01/01/2000', '13/01/2000', '02/02/2000'])
+    assert ah.detectar_formato_fecha(fechas) == '%d/%m/%Y'
+    assert list(pd.DatetimeIndex(ah.parsear_fechas(fechas)).day) == [1, 13, 2]
+
+
+def test_formatos_sin_ambiguedad():
+    assert ah.detectar_formato_fecha(pd.Series(['Jan 1, 2000', 'Feb 1, 2000'])) == '%b %d, %Y'
+    assert ah.detectar_formato_fecha(pd.Series(['2000-01-01', '2000-02-01'])) == '%Y-%m-%d'
+    assert ah.detectar_formato_fecha(pd.Series([946684800000])) == 'epoch_ms'